@@ -0,0 +1,75 @@
+"""Benchmark the LSH history index against exact brute-force similarity.
+
+For each history size, builds an index over random unit vectors, then queries with planted
+near-duplicates (cosine ~0.9 to a random history row) and with unrelated vectors. Reports
+build time, mean query latency for LSH and brute force, and recall on the planted queries.
+
+Run with: uv run python benchmarks/bench_ann.py [--dim 64] [--sizes 10000,100000,1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from crewx.ann_index import HistoryAnnIndex  # noqa: E402
+
+THRESHOLD = 0.85
+
+
+def _unit(rows: np.ndarray) -> np.ndarray:
+    return rows / np.linalg.norm(rows, axis=-1, keepdims=True)
+
+
+def run(size: int, dim: int, queries: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    data = _unit(rng.standard_normal((size, dim)).astype(np.float32))
+    targets = rng.integers(0, size, queries)
+    noise = _unit(rng.standard_normal((queries, dim)).astype(np.float32))
+    planted = _unit(data[targets] + 0.45 * noise)
+    unrelated = _unit(rng.standard_normal((queries, dim)).astype(np.float32))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        index = HistoryAnnIndex(tmp, model="bench")
+        for start in range(0, size, 100_000):
+            index.add(data[start : start + 100_000])
+        index.save()
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        found = sum(index.any_above(q, THRESHOLD) for q in planted)
+        false_hits = sum(index.any_above(q, THRESHOLD) for q in unrelated)
+        lsh_ms = (time.perf_counter() - started) * 1000 / (2 * queries)
+
+        started = time.perf_counter()
+        exact = sum(float(np.max(data @ q)) >= THRESHOLD for q in planted)
+        brute_ms = (time.perf_counter() - started) * 1000 / queries
+
+    recall = found / exact if exact else 1.0
+    print(
+        f"n={size:>9,d} dim={dim} build={build:7.2f}s lsh={lsh_ms:7.3f} ms/query "
+        f"brute={brute_ms:8.3f} ms/query recall={recall:.3f} false_hits={false_hits}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    for size in (int(s) for s in args.sizes.split(",")):
+        run(size, args.dim, args.queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Throughput of the offline ``local:ngram`` embedding backend on one core.
+
+Run with: uv run python benchmarks/bench_embeddings.py [--texts 5000] [--dim 512]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from crewx.embeddings import HashedNgramEmbeddingBackend  # noqa: E402
+
+WORDS = (
+    "wenn dein flug am gate verspätet ist frag nach betreuung koffer gepäckband streik "
+    "umbuchung hotel verpflegung boarding sitzplatz check-in wetter schnee nebel ersatz"
+).split()
+
+
+def synthetic_tweets(count: int, *, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(18, 32))) for _ in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=512)
+    args = parser.parse_args()
+
+    texts = synthetic_tweets(args.texts)
+    backend = HashedNgramEmbeddingBackend(dim=args.dim)
+    started = time.perf_counter()
+    backend.embed(texts)
+    elapsed = time.perf_counter() - started
+    print(f"texts={len(texts)} dim={args.dim} {len(texts) / elapsed:,.0f} texts/s")
+
+
+if __name__ == "__main__":
+    main()
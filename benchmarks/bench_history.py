@@ -0,0 +1,98 @@
+"""Benchmark the JSONL and SQLite history backends on a synthetic history.
+
+Writes ``--rows`` history entries, migrates them into SQLite, then times the reads a run
+makes on each backend: recent texts, rotation count (cold and warm), the unknown-type
+repair on a clean history, and appending a batch. Also times counting entries of one
+tweet type, which SQLite answers from an index and JSONL only with a full scan.
+
+Run with: uv run python benchmarks/bench_history.py [--rows 1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from crewx.history_store import (  # noqa: E402
+    JSONL_FILE,
+    SQLITE_FILE,
+    JsonlHistoryStore,
+    SqliteHistoryStore,
+)
+
+TYPES = ["educational", "fun_fact", "travel_hack", "industry_insight", "marketing"]
+
+
+def _timed(label: str, fn) -> object:
+    started = time.perf_counter()
+    result = fn()
+    print(f"  {label:<28} {(time.perf_counter() - started) * 1000:10.2f} ms")
+    return result
+
+
+def _write_history(path: Path, rows: int) -> None:
+    with path.open("w", encoding="utf-8") as handle:
+        for i in range(rows):
+            entry = {
+                "text": f"Tipp {i}: Koffer am Gepäckband {i % 97} prüfen",
+                "tweet_type": TYPES[i % len(TYPES)],
+                "tags": ["gepaeck"],
+                "opening_style": "frage",
+            }
+            handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def _jsonl_type_count(path: Path, tweet_type: str) -> int:
+    hits = 0
+    with path.open("rb") as handle:
+        for line in handle:
+            if json.loads(line).get("tweet_type") == tweet_type:
+                hits += 1
+    return hits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    batch = [{"text": f"Neu {i}", "tweet_type": "fun_fact"} for i in range(5)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        print(f"rows={args.rows}")
+        _timed("write history.jsonl", lambda: _write_history(out_dir / JSONL_FILE, args.rows))
+
+        jsonl = JsonlHistoryStore(out_dir)
+        print("jsonl")
+        _timed("recent_texts(50)", lambda: jsonl.recent_texts(50))
+        _timed("count (cold)", jsonl.count)
+        _timed("count (warm)", jsonl.count)
+        _timed("fix_unknown_types (cold)", lambda: jsonl.fix_unknown_types("educational"))
+        _timed("fix_unknown_types (warm)", lambda: jsonl.fix_unknown_types("educational"))
+        _timed("count tweet_type (scan)", lambda: _jsonl_type_count(jsonl.path, "fun_fact"))
+        _timed("append 5", lambda: jsonl.append(batch))
+
+        sqlite = SqliteHistoryStore(out_dir / SQLITE_FILE)
+        print("sqlite")
+        _timed("migrate_from_jsonl", lambda: sqlite.migrate_from_jsonl(out_dir / JSONL_FILE))
+        _timed("recent_texts(50)", lambda: sqlite.recent_texts(50))
+        _timed("count", sqlite.count)
+        _timed("fix_unknown_types", lambda: sqlite.fix_unknown_types("educational"))
+        _timed(
+            "count tweet_type (index)",
+            lambda: sqlite._conn.execute(
+                "SELECT COUNT(*) FROM history WHERE tweet_type = ?", ("fun_fact",)
+            ).fetchone(),
+        )
+        _timed("append 5", lambda: sqlite.append(batch))
+        sqlite.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Worst-case benchmark for extracting JSON from chatty LLM output.
+
+Builds ~1 MB of CrewAI-style trace text full of stray brackets, braces and quotes with the
+real tweet array at the very end, then times ``parse_tweets_response`` on growing inputs.
+
+Run with: uv run python benchmarks/bench_parsing.py
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from crewx.parsing import parse_tweets_response  # noqa: E402
+
+NOISE_CHUNKS = [
+    "Thought: I should check [the rules] again. ",
+    "Final Answer: {draft} ",
+    "see ] and [ and } and { ",
+    '[Note: "quoted] text" ',
+    "{'single': 'quotes'} ",
+    "[1, 2, oops] ",
+]
+
+TWEETS = [
+    {
+        "tweet_type": "service",
+        "opening_style": "condition",
+        "text": "Wenn dein Flug am Gate verspätet ist, frag nach Betreuung.",
+        "language": "de",
+        "tags": ["boarding_gate"],
+    }
+]
+
+
+def build_output(size: int, *, seed: int = 42) -> str:
+    rng = random.Random(seed)
+    parts: list[str] = []
+    total = 0
+    while total < size:
+        chunk = rng.choice(NOISE_CHUNKS)
+        parts.append(chunk)
+        total += len(chunk)
+    parts.append(json.dumps(TWEETS, ensure_ascii=False))
+    return "".join(parts)
+
+
+def main() -> None:
+    for size in (16_000, 128_000, 1_000_000):
+        raw = build_output(size)
+        started = time.perf_counter()
+        parsed = parse_tweets_response(raw, n_tweets=5)
+        elapsed = time.perf_counter() - started
+        assert parsed["tweets"][0]["text"] == TWEETS[0]["text"]
+        brackets = sum(raw.count(c) for c in "[]{}")
+        print(f"size={len(raw):>9,d} brackets={brackets:>7,d} parse={elapsed * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""End-to-end benchmark suite for the generation pipeline's local stages.
+
+Times cold import of ``crewx.crew_pipeline``, prompt construction, ``parse_tweets_response``
+on realistic and adversarial output, ``filter_crewai_tweets`` at 10/100/1000 candidates
+against 50/10k history, and the ``local:ngram`` embedding dedupe path, all on seeded
+synthetic data. Results are written as JSON; pass ``--baseline`` to flag regressions.
+The same suite runs as ``python src/main.py bench``.
+
+Run with: uv run python benchmarks/bench_pipeline.py [--quick] [--baseline old.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from crewx.bench import (  # noqa: E402
+    REGRESSION_THRESHOLD,
+    compare_results,
+    load_results,
+    run_benchmarks,
+    save_results,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="out/bench/latest.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--only")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args()
+
+    results = run_benchmarks(quick=args.quick, only=args.only, repeat=max(1, args.repeat))
+    save_results(args.out, results)
+    for name, case in results["results"].items():
+        print(f"  {name:<36} {case['median_ms']:12.3f} ms")
+    if not args.baseline:
+        return 0
+    regressions = compare_results(load_results(args.baseline), results, threshold=args.threshold)
+    for regression in regressions:
+        print(
+            f"  REGRESSION {regression['case']}: {regression['baseline_ms']:.3f} ms -> "
+            f"{regression['current_ms']:.3f} ms (x{regression['ratio']})"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from crewx.embeddings import embed_texts
+from crewx.history_store import HistoryStore, JsonlHistoryStore
+from crewx.io import ensure_dir
+
+ANN_DIR_NAME = "history_ann"
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.f32"
+CODES_FILE = "codes.u32"
+ORDER_FILE = "order.i32"
+LOOKUP_FILE = "lookup.u32"
+
+SYNC_BATCH_SIZE = 256
+
+
+def _load_array(path: Path, dtype: Any, shape: tuple[int, int]) -> np.ndarray:
+    if shape[0] == 0 or shape[1] == 0:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+def _append_rows(path: Path, rows: np.ndarray, *, keep_bytes: int) -> None:
+    # Drop bytes past the last committed row (left behind by a crash before meta was saved).
+    if path.exists() and path.stat().st_size != keep_bytes:
+        os.truncate(path, keep_bytes)
+    with path.open("ab") as handle:
+        handle.write(np.ascontiguousarray(rows).tobytes())
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class HistoryAnnIndex:
+    """Random-hyperplane LSH over the embeddings of every tweet in ``history.jsonl``.
+
+    Each of ``n_tables`` tables hashes a unit vector to ``n_bits`` sign bits. A query only
+    scores the rows that share a bucket with it in at least one table, located with a binary
+    search over per-table sorted codes, plus a small exact-scored tail of rows appended since
+    the tables were last sorted. Everything is stored as flat binary files under
+    ``out_dir/history_ann`` so appends are O(new rows) and loading is a memory map.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        model: str,
+        n_tables: int = 16,
+        n_bits: int = 10,
+        seed: int = 13,
+    ) -> None:
+        if not 0 < n_bits <= 32:
+            raise ValueError("n_bits must be between 1 and 32")
+        self.path = Path(path)
+        self.model = model
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.seed = seed
+        self.dim = 0
+        self.history_offset = 0
+        self.history_source: str | None = None
+        self._count = 0
+        self._sorted_count = 0
+        self._saved_count = 0
+        self._planes = np.zeros((0, 0), dtype=np.float32)
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._order = np.zeros((n_tables, 0), dtype=np.int32)
+        self._lookup = np.zeros((n_tables, 0), dtype=np.uint32)
+        self._tail_vectors: list[np.ndarray] = []
+        self._tail_codes: list[np.ndarray] = []
+        self._load()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self) -> None:
+        """Forget every indexed row, on disk and in memory."""
+        for name in (META_FILE, VECTORS_FILE, CODES_FILE, ORDER_FILE, LOOKUP_FILE):
+            (self.path / name).unlink(missing_ok=True)
+        self.dim = 0
+        self.history_offset = 0
+        self.history_source = None
+        self._count = self._sorted_count = self._saved_count = 0
+        self._planes = np.zeros((0, 0), dtype=np.float32)
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._order = np.zeros((self.n_tables, 0), dtype=np.int32)
+        self._lookup = np.zeros((self.n_tables, 0), dtype=np.uint32)
+        self._tail_vectors = []
+        self._tail_codes = []
+
+    def _init_planes(self, dim: int) -> None:
+        self.dim = dim
+        rng = np.random.default_rng(self.seed)
+        self._planes = rng.standard_normal((self.n_tables * self.n_bits, dim)).astype(np.float32)
+
+    def _load(self) -> None:
+        meta_path = self.path / META_FILE
+        if not meta_path.exists():
+            return
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except Exception:
+            return
+        expected = (self.model, self.n_tables, self.n_bits, self.seed)
+        found = (meta.get("model"), meta.get("n_tables"), meta.get("n_bits"), meta.get("seed"))
+        if found != expected or not meta.get("dim"):
+            # Different model or hashing parameters: rebuild from history.
+            return
+        self._init_planes(int(meta["dim"]))
+        self._count = int(meta.get("count", 0))
+        self._sorted_count = int(meta.get("sorted_count", 0))
+        self._saved_count = self._count
+        self.history_offset = int(meta.get("history_offset", 0))
+        self.history_source = meta.get("history_source")
+        self._vectors = _load_array(self.path / VECTORS_FILE, np.float32, (self._count, self.dim))
+        sorted_shape = (self.n_tables, self._sorted_count)
+        self._order = _load_array(self.path / ORDER_FILE, np.int32, sorted_shape)
+        self._lookup = _load_array(self.path / LOOKUP_FILE, np.uint32, sorted_shape)
+        if self._count > self._sorted_count:
+            tail = slice(self._sorted_count, self._count)
+            codes = _load_array(self.path / CODES_FILE, np.uint32, (self._count, self.n_tables))
+            self._tail_vectors.append(np.asarray(self._vectors[tail]))
+            self._tail_codes.append(np.asarray(codes[tail]))
+
+    def _codes(self, units: np.ndarray) -> np.ndarray:
+        bits = (units @ self._planes.T) > 0
+        bits = bits.reshape(units.shape[0], self.n_tables, self.n_bits)
+        weights = np.left_shift(np.uint32(1), np.arange(self.n_bits, dtype=np.uint32))
+        return (bits * weights).sum(axis=2, dtype=np.uint32)
+
+    def _units(
+        self, vectors: Sequence[Sequence[float]] | Sequence[float] | np.ndarray
+    ) -> np.ndarray:
+        arr = np.asarray(vectors, dtype=np.float32)
+        if arr.ndim == 1:
+            arr = arr.reshape(1, -1)
+        if arr.size == 0:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        if not self.dim:
+            self._init_planes(arr.shape[1])
+        if arr.shape[1] != self.dim:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        norms = np.linalg.norm(arr, axis=1)
+        keep = norms > 0
+        return arr[keep] / norms[keep, None]
+
+    def add(self, vectors: Sequence[Sequence[float]] | np.ndarray) -> None:
+        units = self._units(vectors)
+        if not units.shape[0]:
+            return
+        self._tail_vectors.append(units)
+        self._tail_codes.append(self._codes(units))
+        self._count += units.shape[0]
+
+    def max_similarity(self, vector: Sequence[float]) -> float:
+        if not self._count:
+            return 0.0
+        units = self._units(vector)
+        if not units.shape[0]:
+            return 0.0
+        query = units[0]
+        best = 0.0
+        if self._sorted_count:
+            query_codes = self._codes(units)[0]
+            hits = []
+            for table in range(self.n_tables):
+                lookup = self._lookup[table]
+                lo = int(np.searchsorted(lookup, query_codes[table], side="left"))
+                hi = int(np.searchsorted(lookup, query_codes[table], side="right"))
+                if hi > lo:
+                    hits.append(self._order[table][lo:hi])
+            if hits:
+                rows = np.unique(np.concatenate(hits))
+                best = max(best, float(np.max(self._vectors[rows] @ query)))
+        for tail in self._tail_vectors:
+            best = max(best, float(np.max(tail @ query)))
+        return best
+
+    def any_above(self, vector: Sequence[float], threshold: float) -> bool:
+        return self.max_similarity(vector) >= threshold
+
+    def save(self) -> None:
+        if not self.dim:
+            return
+        ensure_dir(self.path)
+        row_bytes = self.dim * 4
+        new_rows = self._count - self._saved_count
+        if new_rows:
+            tail_vectors = np.concatenate(self._tail_vectors)
+            tail_codes = np.concatenate(self._tail_codes)
+            _append_rows(
+                self.path / VECTORS_FILE,
+                tail_vectors[-new_rows:],
+                keep_bytes=self._saved_count * row_bytes,
+            )
+            _append_rows(
+                self.path / CODES_FILE,
+                tail_codes[-new_rows:],
+                keep_bytes=self._saved_count * self.n_tables * 4,
+            )
+            self._saved_count = self._count
+
+        tail_rows = self._count - self._sorted_count
+        if tail_rows > max(1024, self._sorted_count // 8):
+            # Re-sort the tables once the exact-scored tail is no longer small.
+            codes = _load_array(self.path / CODES_FILE, np.uint32, (self._count, self.n_tables))
+            order = np.argsort(codes, axis=0, kind="stable").T.astype(np.int32)
+            lookup = np.take_along_axis(codes.T, order, axis=1).astype(np.uint32)
+            _write_atomic(self.path / ORDER_FILE, order.tobytes())
+            _write_atomic(self.path / LOOKUP_FILE, lookup.tobytes())
+            self._sorted_count = self._count
+            self._order = order
+            self._lookup = lookup
+            self._tail_vectors = []
+            self._tail_codes = []
+            self._vectors = _load_array(
+                self.path / VECTORS_FILE, np.float32, (self._count, self.dim)
+            )
+
+        meta = {
+            "model": self.model,
+            "dim": self.dim,
+            "n_tables": self.n_tables,
+            "n_bits": self.n_bits,
+            "seed": self.seed,
+            "count": self._count,
+            "sorted_count": self._sorted_count,
+            "history_offset": self.history_offset,
+            "history_source": self.history_source,
+        }
+        _write_atomic(self.path / META_FILE, json.dumps(meta).encode("utf-8"))
+
+
+def open_history_index(settings) -> HistoryAnnIndex | None:
+    if not getattr(settings, "embedding_ann_enabled", False) or not settings.embedding_model_name:
+        return None
+    return HistoryAnnIndex(
+        Path(settings.out_dir) / ANN_DIR_NAME, model=settings.embedding_model_name
+    )
+
+
+def sync_history_index(index: HistoryAnnIndex, history: HistoryStore | str | Path, settings) -> int:
+    """Embed and index history entries added since the last sync. Returns rows added.
+
+    ``history`` is a history store or the path of a ``history.jsonl``. The store's cursor
+    (a byte offset for JSONL, a row id for SQLite) is kept in the index metadata.
+    """
+    store = JsonlHistoryStore.for_path(history) if isinstance(history, (str, Path)) else history
+    source = str(store.path)
+    cursor = index.history_offset
+    if index.history_source not in (None, source) or not store.is_valid_cursor(cursor):
+        # A different backend, or the history was rewritten under the cursor.
+        index.clear()
+        cursor = 0
+    index.history_source = source
+
+    added = 0
+    batch: list[str] = []
+    for position, text in store.iter_texts_after(cursor):
+        cursor = position
+        if text:
+            batch.append(text)
+        if len(batch) >= SYNC_BATCH_SIZE:
+            index.add(embed_texts(batch, settings))
+            added += len(batch)
+            batch = []
+    if batch:
+        index.add(embed_texts(batch, settings))
+        added += len(batch)
+    index.history_offset = cursor
+    index.save()
+    return added
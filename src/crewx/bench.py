@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from crewx.config import Settings
+from crewx.embeddings import build_embedding_map, embed_texts
+from crewx.filters import filter_crewai_tweets
+from crewx.io import write_json
+from crewx.parsing import TweetType, parse_tweets_response
+from crewx.prompts_pipeline import build_generator_prompt, format_types_md, trim_company_context
+from crewx.rules import HistoryFeatureIndex
+
+BENCH_SEED = 42
+BENCH_RESULTS_VERSION = 1
+# A case is a regression when its median is this much slower than the baseline.
+REGRESSION_THRESHOLD = 0.25
+
+_BUCKET_WORDS = {
+    "boarding_gate": ["Gate", "Boarding", "Boarding-Gruppe", "einsteigen"],
+    "gepaeck_handgepaeck": ["Koffer", "Handgepäck", "Gepäckband", "Gepäck"],
+    "checkin_sitzplatz": ["Check-in", "Sitzplatz", "Boardingpass", "Sitz"],
+    "wetter_irrops": ["Gewitter", "Schnee", "Nebel", "Sturm"],
+    "streik": ["Streik", "Gewerkschaft", "Arbeitskampf"],
+}
+_TYPES = ["educational", "fun_fact", "travel_hack", "faq", "industry_insight", "marketing"]
+_FILLER = (
+    "wenn dein flug morgen früh startet prüfe vorher die app und frag am schalter nach "
+    "ersatz hotel verpflegung umbuchung anschluss zeit minuten stunden tage"
+).split()
+_NOISE_CHUNKS = [
+    "Thought: I should check [the rules] again. ",
+    "Final Answer: {draft} ",
+    "see ] and [ and } and { ",
+    '[Note: "quoted] text" ',
+    "{'single': 'quotes'} ",
+]
+
+
+def synthetic_tweet(rng: random.Random) -> dict:
+    bucket = rng.choice(list(_BUCKET_WORDS))
+    words = rng.choices(_FILLER, k=rng.randint(8, 18))
+    words.insert(rng.randrange(len(words) + 1), rng.choice(_BUCKET_WORDS[bucket]))
+    text = f"{' '.join(words).capitalize()} {rng.randint(2, 90)} Min."
+    return {
+        "tweet_type": rng.choice(_TYPES),
+        "opening_style": "tip",
+        "text": text,
+        "language": "de",
+        "tags": [bucket],
+    }
+
+
+def synthetic_history(count: int, *, seed: int = BENCH_SEED) -> list[str]:
+    rng = random.Random(seed)
+    return [synthetic_tweet(rng)["text"] for _ in range(count)]
+
+
+def synthetic_candidates(count: int, *, seed: int = BENCH_SEED + 1) -> list[dict]:
+    rng = random.Random(seed)
+    return [synthetic_tweet(rng) for _ in range(count)]
+
+
+def synthetic_company_md(*, seed: int = BENCH_SEED) -> str:
+    rng = random.Random(seed)
+    sections = [
+        "Company",
+        "Product / Offer",
+        "Target Audience",
+        "Tone & Voice",
+        "Proof / Facts (only use these)",
+        "Content Pillars",
+        "Internal Notes",
+        "History",
+    ]
+    blocks = []
+    for section in sections:
+        lines = [f"- {' '.join(rng.choices(_FILLER, k=12))}" for _ in range(rng.randint(4, 12))]
+        blocks.append(f"## {section}\n" + "\n".join(lines))
+    return "# Company\n\n" + "\n\n".join(blocks)
+
+
+def realistic_output(n_tweets: int, *, seed: int = BENCH_SEED) -> str:
+    rng = random.Random(seed)
+    tweets = [synthetic_tweet(rng) for _ in range(n_tweets)]
+    return "Thought: I now can give a great answer\nFinal Answer: " + json.dumps(
+        tweets, ensure_ascii=False, indent=2
+    )
+
+
+def adversarial_output(size: int, *, seed: int = BENCH_SEED) -> str:
+    """Chatty trace text full of stray brackets with the real array at the very end."""
+    rng = random.Random(seed)
+    parts: list[str] = []
+    total = 0
+    while total < size:
+        chunk = rng.choice(_NOISE_CHUNKS)
+        parts.append(chunk)
+        total += len(chunk)
+    parts.append(json.dumps([synthetic_tweet(rng)], ensure_ascii=False))
+    return "".join(parts)
+
+
+def _measure(fn: Callable[[], Any], *, repeat: int, warmup: int = 1) -> dict[str, Any]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "max_ms": round(max(samples), 4),
+        "runs": repeat,
+    }
+
+
+def _import_time_ms(module: str, *, repeat: int) -> dict[str, Any]:
+    """Wall time of a fresh interpreter importing ``module``, minus a bare interpreter start."""
+    src = str(Path(__file__).resolve().parents[1])
+    env = {**os.environ, "PYTHONPATH": src + os.pathsep + os.environ.get("PYTHONPATH", "")}
+
+    def _spawn(code: str) -> float:
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, env=env)
+        return (time.perf_counter() - started) * 1000
+
+    bare = statistics.median(_spawn("pass") for _ in range(repeat))
+    samples = [_spawn(f"import {module}") - bare for _ in range(repeat)]
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "max_ms": round(max(samples), 4),
+        "runs": repeat,
+        "interpreter_ms": round(bare, 4),
+    }
+
+
+def _parse_case(raw: str, repeat: int) -> dict[str, Any]:
+    return _measure(lambda: parse_tweets_response(raw, n_tweets=5), repeat=repeat)
+
+
+def _filter_case(
+    candidates: list[dict], history: list[str], features: HistoryFeatureIndex, repeat: int
+) -> dict[str, Any]:
+    return _measure(
+        lambda: filter_crewai_tweets(
+            [dict(t) for t in candidates], history, max_travel_hack=1, history_features=features
+        ),
+        repeat=repeat,
+    )
+
+
+def _bench_cases(quick: bool) -> dict[str, Callable[[int], dict[str, Any]]]:
+    cases: dict[str, Callable[[int], dict[str, Any]]] = {}
+
+    cases["import.crewx.crew_pipeline"] = lambda repeat: _import_time_ms(
+        "crewx.crew_pipeline", repeat=max(1, min(repeat, 3))
+    )
+
+    company_md = synthetic_company_md()
+    types = [TweetType(name=name, goal=f"Goal for {name}", style=[], rules=[]) for name in _TYPES]
+    recent = synthetic_history(50)
+    cases["prompt.trim_company_context"] = lambda repeat: _measure(
+        lambda: trim_company_context(company_md), repeat=repeat * 20
+    )
+    cases["prompt.build_generator_prompt"] = lambda repeat: _measure(
+        lambda: build_generator_prompt(
+            company_md=company_md,
+            types_md=format_types_md(types),
+            ideas_md="- idee 1\n- idee 2",
+            n_tweets=10,
+            recent=recent,
+            required_types=_TYPES[:4],
+        ),
+        repeat=repeat * 20,
+    )
+
+    realistic = realistic_output(10)
+    cases["parse.realistic_10"] = lambda repeat: _measure(
+        lambda: parse_tweets_response(realistic, n_tweets=10), repeat=repeat * 20
+    )
+    for size in (16_000,) if quick else (16_000, 1_000_000):
+        raw = adversarial_output(size)
+        cases[f"parse.adversarial_{size}"] = partial(_parse_case, raw)
+
+    candidate_sizes = (10, 100) if quick else (10, 100, 1000)
+    history_sizes = (50, 1000) if quick else (50, 10_000)
+    for n_history in history_sizes:
+        history = synthetic_history(n_history)
+        features = HistoryFeatureIndex(history)
+        for n_candidates in candidate_sizes:
+            candidates = synthetic_candidates(n_candidates)
+            cases[f"filter.{n_candidates}x{n_history}"] = partial(
+                _filter_case, candidates, history, features
+            )
+
+    settings = Settings(
+        openai_api_base="",
+        openai_api_key="",
+        openai_model_name="bench",
+        embedding_model_name="local:ngram",
+        embedding_cache_max=0,
+    )
+    embedding_history = synthetic_history(30)
+    embedding_candidates = synthetic_candidates(10 if quick else 100)
+
+    def _embedding_dedupe() -> None:
+        texts = [t["text"] for t in embedding_candidates]
+        filter_crewai_tweets(
+            [dict(t) for t in embedding_candidates],
+            embedding_history,
+            max_travel_hack=1,
+            embedding_threshold=0.85,
+            recent_embeddings=embed_texts(embedding_history, settings),
+            candidate_embeddings=build_embedding_map(texts, settings),
+        )
+
+    cases[f"embedding.dedupe_{len(embedding_candidates)}x30"] = lambda repeat: _measure(
+        _embedding_dedupe, repeat=repeat
+    )
+    return cases
+
+
+def run_benchmarks(
+    *, quick: bool = False, only: str | None = None, repeat: int = 5
+) -> dict[str, Any]:
+    """Run the benchmark suite on synthetic, seeded data and return a JSON-ready result."""
+    results: dict[str, Any] = {}
+    for name, case in _bench_cases(quick).items():
+        if only and only not in name:
+            continue
+        results[name] = case(repeat)
+    return {
+        "version": BENCH_RESULTS_VERSION,
+        "timestamp": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": BENCH_SEED,
+        "quick": quick,
+        "results": results,
+    }
+
+
+def compare_results(
+    baseline: dict[str, Any], current: dict[str, Any], *, threshold: float = REGRESSION_THRESHOLD
+) -> list[dict[str, Any]]:
+    """Cases present in both runs whose median got slower than ``threshold`` allows."""
+    regressions = []
+    base_results = baseline.get("results") or {}
+    for name, result in (current.get("results") or {}).items():
+        before = (base_results.get(name) or {}).get("median_ms")
+        after = result.get("median_ms")
+        if not before or after is None:
+            continue
+        ratio = after / before
+        if ratio > 1 + threshold:
+            regressions.append(
+                {"case": name, "baseline_ms": before, "current_ms": after, "ratio": round(ratio, 3)}
+            )
+    return regressions
+
+
+def load_results(path: str | Path) -> dict[str, Any]:
+    results: dict[str, Any] = json.loads(Path(path).read_text(encoding="utf-8"))
+    return results
+
+
+def save_results(path: str | Path, results: dict[str, Any]) -> None:
+    write_json(str(path), results)
@@ -16,6 +16,45 @@ class Settings:
     openai_model_name: str
     temperature: float = 0.7
     verbose: bool = False
+    # Shared keep-alive HTTP pool for completions and embeddings (0 = per-client pools);
+    # HTTP/2 is used when the optional h2 package is installed.
+    http_pool_size: int = 20
+    http_keepalive_expiry: float = 30.0
+    http_timeout: float = 60.0
+    http_connect_timeout: float = 10.0
+    http2: bool = True
+    # Fallback endpoints tried in order after openai_api_base; a failing one is skipped
+    # for endpoint_cooldown_seconds.
+    openai_api_bases: tuple[str, ...] = field(default_factory=tuple)
+    endpoint_cooldown_seconds: float = 60.0
+    # Per-role models; None = the role's "Model:" in crew_roles.md, else openai_model_name.
+    generator_model: str | None = None
+    reviewer_model: str | None = None
+    poster_model: str | None = None
+    # Prompt + completion token limit per request; 0 = look it up from the model name.
+    llm_context_window: int = 0
+    # LLM response cache: "passthrough" (off), "record" (read-through) or "replay" (cache only)
+    llm_cache_mode: str = "passthrough"
+    llm_cache_max: int = 2000
+    llm_cache_ttl_seconds: float = 0.0
+    # Shared per-model rate limits (requests/tokens per minute); 0 = not limited.
+    rate_limit_rpm: int = 0
+    rate_limit_tpm: int = 0
+    embedding_rate_limit_rpm: int = 0
+    embedding_rate_limit_tpm: int = 0
+    # Hedging: duplicate a completion that is slower than this percentile of observed
+    # latencies (llm_hedge_delay seconds until enough are observed), optionally to a
+    # secondary model/endpoint; the first response wins.
+    llm_hedging: bool = False
+    llm_hedge_percentile: float = 0.95
+    llm_hedge_delay: float = 5.0
+    llm_hedge_model: str | None = None
+    llm_hedge_api_base: str | None = None
+    llm_hedge_api_key: str | None = None
+    # Wall-clock budget for one run in seconds (0 = none); the circuit breaker opens after
+    # this many consecutive connection errors (0 = never).
+    max_wall_time_seconds: float = 0.0
+    circuit_breaker_threshold: int = 5
 
     # Content inputs
     tweets_md_path: str = "content/tweets.md"
@@ -36,6 +75,22 @@ class Settings:
     embedding_api_key: str | None = None
     embedding_similarity_threshold: float = 0.85
     embedding_history_max: int = 30
+    embedding_cache_max: int = 5000
+    embedding_ann_enabled: bool = False
+
+    # Generation: crew_concurrency > 1 splits the active types into groups of
+    # crew_group_size and runs one small crew per group concurrently.
+    crew_concurrency: int = 1
+    crew_group_size: int = 2
+    # > 1: try this many context/n_tweets fallback levels at once; first accepted wins.
+    ladder_speculation: int = 1
+    # True: skip the poster LLM task and shape the reviewer's JSON into the queue locally.
+    local_poster: bool = False
+    # True: check the reviewer rules locally and only send violating tweets to the LLM reviewer.
+    hybrid_review: bool = False
+
+    # History storage: "jsonl" (history.jsonl) or "sqlite" (history.sqlite3)
+    history_backend: str = "jsonl"
 
     # Optional: force specific tweet types per run
     forced_tweet_types: tuple[str, ...] = field(default_factory=tuple)
@@ -60,6 +115,23 @@ def load_settings() -> Settings:
     )
     openai_api_key = _get_env("OPENAI_API_KEY", "") or ""
     openai_model_name = _get_env("OPENAI_MODEL_NAME", "gpt-4.1-mini") or "gpt-4.1-mini"
+    http_pool_size = max(0, int(_get_env("HTTP_POOL_SIZE", "20") or "20"))
+    http_keepalive_expiry = max(0.0, float(_get_env("HTTP_KEEPALIVE_EXPIRY", "30") or "30"))
+    http_timeout = max(1.0, float(_get_env("HTTP_TIMEOUT", "60") or "60"))
+    http_connect_timeout = max(1.0, float(_get_env("HTTP_CONNECT_TIMEOUT", "10") or "10"))
+    http2 = (_get_env("HTTP2", "true") or "true").lower() in {
+        "1",
+        "true",
+        "yes",
+        "y",
+        "on",
+    }
+    api_bases_raw = _get_env("OPENAI_API_BASES", "") or ""
+    openai_api_bases = tuple([b.strip() for b in api_bases_raw.split(",") if b.strip()])
+    endpoint_cooldown_seconds = max(0.0, float(_get_env("ENDPOINT_COOLDOWN", "60") or "60"))
+    generator_model = _get_env("GENERATOR_MODEL")
+    reviewer_model = _get_env("REVIEWER_MODEL")
+    poster_model = _get_env("POSTER_MODEL")
 
     tweets_md_path = _get_env("TWEETS_MD_PATH", "content/tweets.md") or "content/tweets.md"
     tweet_types_md_path = (
@@ -80,6 +152,38 @@ def load_settings() -> Settings:
         _get_env("EMBEDDING_SIMILARITY_THRESHOLD", "0.85") or "0.85"
     )
     embedding_history_max = int(_get_env("EMBEDDING_HISTORY_MAX", "30") or "30")
+    embedding_cache_max = int(_get_env("EMBEDDING_CACHE_MAX", "5000") or "5000")
+    embedding_ann_enabled = (_get_env("EMBEDDING_ANN", "false") or "false").lower() in {
+        "1",
+        "true",
+        "yes",
+        "y",
+        "on",
+    }
+
+    history_backend = (_get_env("HISTORY_BACKEND", "jsonl") or "jsonl").lower()
+    if history_backend not in {"jsonl", "sqlite"}:
+        raise ConfigurationError(
+            f"HISTORY_BACKEND must be 'jsonl' or 'sqlite', got {history_backend!r}."
+        )
+
+    crew_concurrency = max(1, int(_get_env("CREW_CONCURRENCY", "1") or "1"))
+    crew_group_size = max(1, int(_get_env("CREW_GROUP_SIZE", "2") or "2"))
+    ladder_speculation = max(1, int(_get_env("LADDER_SPECULATION", "1") or "1"))
+    local_poster = (_get_env("LOCAL_POSTER", "false") or "false").lower() in {
+        "1",
+        "true",
+        "yes",
+        "y",
+        "on",
+    }
+    hybrid_review = (_get_env("HYBRID_REVIEW", "false") or "false").lower() in {
+        "1",
+        "true",
+        "yes",
+        "y",
+        "on",
+    }
 
     # Optional knobs
     n_tweets = int(_get_env("N_TWEETS", "10") or "10")
@@ -87,6 +191,36 @@ def load_settings() -> Settings:
 
     # Temperature/verbose are optional; keep safe defaults
     temperature = float(_get_env("TEMPERATURE", "0.7") or "0.7")
+    llm_context_window = max(0, int(_get_env("LLM_CONTEXT_WINDOW", "0") or "0"))
+    llm_cache_mode = (_get_env("LLM_CACHE", "passthrough") or "passthrough").lower()
+    if llm_cache_mode not in {"passthrough", "record", "replay"}:
+        raise ConfigurationError(
+            f"LLM_CACHE must be 'passthrough', 'record' or 'replay', got {llm_cache_mode!r}."
+        )
+    llm_cache_max = int(_get_env("LLM_CACHE_MAX", "2000") or "2000")
+    llm_cache_ttl_seconds = float(_get_env("LLM_CACHE_TTL", "0") or "0")
+    rate_limit_rpm = max(0, int(_get_env("RATE_LIMIT_RPM", "0") or "0"))
+    rate_limit_tpm = max(0, int(_get_env("RATE_LIMIT_TPM", "0") or "0"))
+    embedding_rate_limit_rpm = max(0, int(_get_env("EMBEDDING_RATE_LIMIT_RPM", "0") or "0"))
+    embedding_rate_limit_tpm = max(0, int(_get_env("EMBEDDING_RATE_LIMIT_TPM", "0") or "0"))
+    llm_hedging = (_get_env("LLM_HEDGING", "false") or "false").lower() in {
+        "1",
+        "true",
+        "yes",
+        "y",
+        "on",
+    }
+    llm_hedge_percentile = float(_get_env("LLM_HEDGE_PERCENTILE", "0.95") or "0.95")
+    if llm_hedge_percentile > 1:
+        llm_hedge_percentile /= 100.0
+    if not 0 < llm_hedge_percentile <= 1:
+        raise ConfigurationError("LLM_HEDGE_PERCENTILE must be in (0, 1] or (0, 100]")
+    llm_hedge_delay = max(0.0, float(_get_env("LLM_HEDGE_DELAY", "5") or "5"))
+    llm_hedge_model = _get_env("LLM_HEDGE_MODEL")
+    llm_hedge_api_base = _get_env("LLM_HEDGE_API_BASE")
+    llm_hedge_api_key = _get_env("LLM_HEDGE_API_KEY")
+    max_wall_time_seconds = max(0.0, float(_get_env("MAX_WALL_TIME", "0") or "0"))
+    circuit_breaker_threshold = max(0, int(_get_env("CIRCUIT_BREAKER_THRESHOLD", "5") or "5"))
     verbose = (_get_env("VERBOSE", "false") or "false").lower() in {
         "1",
         "true",
@@ -113,7 +247,33 @@ def load_settings() -> Settings:
         openai_api_base=openai_api_base,
         openai_api_key=openai_api_key,
         openai_model_name=openai_model_name,
+        http_pool_size=http_pool_size,
+        http_keepalive_expiry=http_keepalive_expiry,
+        http_timeout=http_timeout,
+        http_connect_timeout=http_connect_timeout,
+        http2=http2,
+        openai_api_bases=openai_api_bases,
+        endpoint_cooldown_seconds=endpoint_cooldown_seconds,
+        generator_model=generator_model,
+        reviewer_model=reviewer_model,
+        poster_model=poster_model,
         temperature=temperature,
+        llm_context_window=llm_context_window,
+        llm_cache_mode=llm_cache_mode,
+        llm_cache_max=llm_cache_max,
+        llm_cache_ttl_seconds=llm_cache_ttl_seconds,
+        rate_limit_rpm=rate_limit_rpm,
+        rate_limit_tpm=rate_limit_tpm,
+        embedding_rate_limit_rpm=embedding_rate_limit_rpm,
+        embedding_rate_limit_tpm=embedding_rate_limit_tpm,
+        llm_hedging=llm_hedging,
+        llm_hedge_percentile=llm_hedge_percentile,
+        llm_hedge_delay=llm_hedge_delay,
+        llm_hedge_model=llm_hedge_model,
+        llm_hedge_api_base=llm_hedge_api_base,
+        llm_hedge_api_key=llm_hedge_api_key,
+        max_wall_time_seconds=max_wall_time_seconds,
+        circuit_breaker_threshold=circuit_breaker_threshold,
         verbose=verbose,
         tweets_md_path=tweets_md_path,
         tweet_types_md_path=tweet_types_md_path,
@@ -127,6 +287,14 @@ def load_settings() -> Settings:
         embedding_api_key=embedding_api_key,
         embedding_similarity_threshold=embedding_similarity_threshold,
         embedding_history_max=embedding_history_max,
+        embedding_cache_max=embedding_cache_max,
+        embedding_ann_enabled=embedding_ann_enabled,
+        crew_concurrency=crew_concurrency,
+        crew_group_size=crew_group_size,
+        ladder_speculation=ladder_speculation,
+        local_poster=local_poster,
+        hybrid_review=hybrid_review,
+        history_backend=history_backend,
         forced_tweet_types=forced_tweet_types,
         log_json=log_json,
         log_dir=log_dir,
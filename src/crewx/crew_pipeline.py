@@ -3,46 +3,81 @@ from __future__ import annotations
 import json
 import logging
 import re
-import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
 from uuid import uuid4
 
 from crewai import Agent, Crew, Process, Task
+from crewai.llms.base_llm import BaseLLM
 
+from crewx.ann_index import open_history_index, sync_history_index
 from crewx.config import apply_litellm_env, load_settings
-from crewx.embeddings import build_embedding_map, embed_texts, is_embedding_auth_error
-from crewx.errors import NoTweetsGeneratedError, NoTweetTypesError, RateLimitError
+from crewx.embedding_cache import get_embedding_cache
+from crewx.embeddings import (
+    build_embedding_map,
+    embed_texts,
+    is_embedding_auth_error,
+    is_local_embedding_model,
+)
+from crewx.errors import (
+    CircuitOpenError,
+    DeadlineExceededError,
+    NoTweetsGeneratedError,
+    NoTweetTypesError,
+    RateLimitError,
+)
 from crewx.filters import (
     accept_relaxed_candidate,
     assign_missing_types,
     filter_crewai_tweets,
     normalize_candidate_fields,
+    prescreen_candidates,
 )
+from crewx.hedging import get_hedge_tracker
+from crewx.history_store import HistoryStore, open_history_store
+from crewx.http_pool import http_pool_stats
 from crewx.io import (
-    append_jsonl,
     ensure_dir,
-    list_recent_tweet_texts,
     now_timestamp,
     read_text,
     write_json,
     write_text,
 )
 from crewx.llm import build_llm
+from crewx.llm_cache import get_llm_cache
 from crewx.logging_utils import log_event, setup_logging
-from crewx.parsing import TweetType, parse_tweet_types_md, parse_tweets_response
+from crewx.parsing import (
+    TweetType,
+    parse_tweet_types_md,
+    parse_tweets_response,
+    prepare_post_queue,
+)
 from crewx.prompts_pipeline import (
+    build_fix_prompt,
     build_generator_prompt,
     build_post_prompt,
     build_review_prompt,
     format_types_md,
 )
+from crewx.rate_limiter import chat_rate_limit
 from crewx.retry import (
+    KickoffCancelled,
     RateLimitHit,
+    RetryPolicy,
     is_request_too_large,
     kickoff_with_retry,
     parse_retry_after_seconds,
 )
-from crewx.rules import extract_bucket, infer_bucket_from_text
+from crewx.rules import HistoryFeatureIndex, extract_bucket, infer_bucket_from_text
+from crewx.token_budget import (
+    TokenBudget,
+    context_window_for,
+    estimate_tokens,
+    output_tokens_for,
+    plan_crew_budget,
+)
 
 LOGGER_NAME = "crewx.pipeline"
 
@@ -66,16 +101,21 @@ def _parse_roles_md(md: str) -> dict[str, dict[str, str]]:
         role = ""
         goal = ""
         backstory = ""
+        model = ""
         m_role = re.search(r"(?mi)^\s*Role:\s*(.+)\s*$", rest)
         if m_role:
             role = m_role.group(1).strip()
+        m_model = re.search(r"(?mi)^\s*Model:\s*(.+)\s*$", rest)
+        if m_model:
+            model = m_model.group(1).strip()
+            rest = rest[: m_model.start()] + rest[m_model.end() :]
         m_goal = re.search(r"(?ms)^\s*Goal:\s*(.+?)(?:\n\s*Backstory:|\Z)", rest)
         if m_goal:
             goal = m_goal.group(1).strip()
         m_backstory = re.search(r"(?ms)^\s*Backstory:\s*(.+?)\s*$", rest)
         if m_backstory:
             backstory = m_backstory.group(1).strip()
-        roles[key] = {"role": role, "goal": goal, "backstory": backstory}
+        roles[key] = {"role": role, "goal": goal, "backstory": backstory, "model": model}
     return roles
 
 
@@ -86,48 +126,20 @@ def _load_roles(path: str) -> dict[str, dict[str, str]]:
     return _parse_roles_md(p.read_text(encoding="utf-8"))
 
 
-def _rotation_start_index(out_dir: str, *, total_types: int) -> int:
+def _rotation_start_index(history: HistoryStore, *, total_types: int) -> int:
     """Deterministic rotation based on history length.
 
-    Uses number of non-empty history lines to pick the next start index.
+    Uses the number of history entries to pick the next start index.
     """
     if total_types <= 0:
         return 0
-    history_path = Path(out_dir) / "history.jsonl"
-    if not history_path.exists():
-        return 0
     try:
-        lines = history_path.read_text(encoding="utf-8").splitlines()
+        non_empty = history.count()
     except Exception:
         return 0
-    non_empty = sum(1 for line in lines if line.strip())
     return non_empty % total_types
 
 
-def fix_history_unknown_types(out_dir: str, fallback_type: str = "educational") -> int:
-    history_path = Path(out_dir) / "history.jsonl"
-    if not history_path.exists():
-        return 0
-    lines = history_path.read_text(encoding="utf-8").splitlines()
-    updated: list[str] = []
-    changed = 0
-    for line in lines:
-        if not line.strip():
-            continue
-        try:
-            data = json.loads(line)
-        except Exception:
-            updated.append(line)
-            continue
-        t = (data.get("tweet_type") or "").strip().lower()
-        if t == "unknown":
-            data["tweet_type"] = fallback_type
-            changed += 1
-        updated.append(json.dumps(data, ensure_ascii=False))
-    history_path.write_text("\n".join(updated) + "\n", encoding="utf-8")
-    return changed
-
-
 def _build_crews(
     *,
     generator_agent: Agent,
@@ -139,7 +151,15 @@ def _build_crews(
     active_types: list[TweetType],
     forced_types: bool,
     n_tweets: int,
+    local_poster: bool = False,
+    hybrid_review: bool = False,
 ) -> tuple[Crew, Crew]:
+    """Build the main crew and the review-only retry crew.
+
+    With ``local_poster`` both crews end at the review task and the poster step is done
+    locally by ``prepare_post_queue``, saving one LLM round trip per kickoff. With
+    ``hybrid_review`` both crews only generate; review happens through ``_build_fix_crew``.
+    """
     required_types = [t.name.strip() for t in active_types]
     effective_n_tweets = len(required_types) if forced_types else n_tweets
     types_md = format_types_md(active_types)
@@ -157,6 +177,15 @@ def _build_crews(
         agent=generator_agent,
     )
 
+    if hybrid_review:
+        crew = Crew(
+            agents=[generator_agent],
+            tasks=[generate_task],
+            process=Process.sequential,
+            verbose=generator_agent.verbose,
+        )
+        return crew, crew
+
     review_task = Task(
         description=build_review_prompt(n_tweets=effective_n_tweets),
         expected_output="A JSON array of compliant tweet objects.",
@@ -164,6 +193,21 @@ def _build_crews(
         context=[generate_task],
     )
 
+    if local_poster:
+        crew = Crew(
+            agents=[generator_agent, reviewer_agent],
+            tasks=[generate_task, review_task],
+            process=Process.sequential,
+            verbose=generator_agent.verbose,
+        )
+        review_only_crew = Crew(
+            agents=[generator_agent, reviewer_agent],
+            tasks=[generate_task, review_task],
+            process=Process.sequential,
+            verbose=generator_agent.verbose,
+        )
+        return crew, review_only_crew
+
     post_task = Task(
         description=build_post_prompt(),
         expected_output="A JSON array of tweets ready to queue.",
@@ -195,61 +239,82 @@ def _build_crews(
     return crew, review_only_crew
 
 
-def run_generate_tweets_crewai(
-    settings=None,
-    *,
-    dry_run: bool = False,
-) -> dict:
-    apply_litellm_env()
-    settings = settings or load_settings()
-    ensure_dir(settings.out_dir)
-    run_id = f"{now_timestamp()}_{uuid4().hex[:8]}"
-    setup_logging(
-        settings.out_dir,
-        verbose=settings.verbose,
-        run_id=run_id,
-        json_logs=settings.log_json,
-        log_dir=settings.log_dir,
+def _build_fix_crew(reviewer_agent: Agent, failing: list[tuple[dict, list[str]]]) -> Crew:
+    """Reviewer-only crew that rewrites just the tweets that failed the local pre-screen."""
+    fix_task = Task(
+        description=build_fix_prompt(
+            tweets=[t for t, _ in failing], problems=[problems for _, problems in failing]
+        ),
+        expected_output="A JSON array of compliant tweet objects.",
+        agent=reviewer_agent,
     )
-    pipeline_logger = logging.getLogger(LOGGER_NAME)
-    log_event(
-        pipeline_logger,
-        "run_start",
-        run_id=run_id,
-        model=settings.openai_model_name,
-        n_tweets=settings.n_tweets,
-        recent_max=settings.recent_tweets_max,
-        forced_types=list(settings.forced_tweet_types),
-        temperature=settings.temperature,
+    return Crew(
+        agents=[reviewer_agent],
+        tasks=[fix_task],
+        process=Process.sequential,
+        verbose=reviewer_agent.verbose,
     )
 
-    company_md = read_text(settings.tweets_md_path)
-    types_md = read_text(settings.tweet_types_md_path)
-    roles = _load_roles(settings.crew_roles_md_path)
 
-    ideas_md = None
-    ideas_path = Path(settings.ideas_md_path)
-    if ideas_path.exists():
-        ideas_md = ideas_path.read_text(encoding="utf-8")
-
-    all_types = parse_tweet_types_md(types_md)
-    if not all_types:
-        raise NoTweetTypesError(f"No tweet types found in {settings.tweet_types_md_path}")
-
-    forced_types = [t.strip().lower() for t in settings.forced_tweet_types if t.strip()]
-    if forced_types:
-        active_types = [t for t in all_types if t.name.strip().lower() in set(forced_types)]
-    else:
-        max_types = min(settings.n_tweets, len(all_types))
-        start_idx = _rotation_start_index(settings.out_dir, total_types=len(all_types))
-        active_types = [all_types[(start_idx + i) % len(all_types)] for i in range(max_types)]
-        forced_types = [t.name.strip().lower() for t in active_types]
-
-    fix_history_unknown_types(settings.out_dir, fallback_type="educational")
-    recent = list_recent_tweet_texts(settings.out_dir, limit=settings.recent_tweets_max)
+def _plan_level_budget(
+    *,
+    company_md: str,
+    ideas_md: str | None,
+    recent_context: list[str],
+    active_types: list[TweetType],
+    forced_types: bool,
+    n_tweets: int,
+    local_poster: bool,
+    hybrid_review: bool,
+    context_window: int,
+) -> TokenBudget:
+    """Token budget of the crew ``_build_crews`` would build for these arguments."""
+    required_types = [t.name.strip() for t in active_types]
+    effective_n_tweets = len(required_types) if forced_types else n_tweets
+    prompts = [
+        build_generator_prompt(
+            company_md=company_md,
+            types_md=format_types_md(active_types),
+            ideas_md=ideas_md,
+            n_tweets=effective_n_tweets,
+            recent=recent_context,
+            required_types=required_types if forced_types else None,
+        )
+    ]
+    if not hybrid_review:
+        prompts.append(build_review_prompt(n_tweets=effective_n_tweets))
+        if not local_poster:
+            prompts.append(build_post_prompt())
+    return plan_crew_budget(prompts, n_tweets=effective_n_tweets, context_window=context_window)
+
+
+@dataclass
+class LadderOutcome:
+    """What one rung of the context/n_tweets fallback ladder produced."""
+
+    tweets: list[dict] = field(default_factory=list)
+    context_limit: int | None = None
+    n_tweets: int | None = None
+    effective_n_tweets: int = 0
+    rate_limit_delay: float | None = None
+
+
+def _role_models(settings, roles: dict[str, dict[str, str]]) -> dict[str, str]:
+    """Model per crew role: settings override crew_roles.md, which overrides the default."""
+    overrides = {
+        "generator": settings.generator_model,
+        "reviewer": settings.reviewer_model,
+        "poster": settings.poster_model,
+    }
+    return {
+        role: override or roles.get(role, {}).get("model") or settings.openai_model_name
+        for role, override in overrides.items()
+    }
 
-    llm = build_llm(settings)
 
+def _build_agents(
+    settings, llms: dict[str, BaseLLM], roles: dict[str, dict[str, str]]
+) -> tuple[Agent, Agent, Agent]:
     generator_role = roles.get("generator", {})
     reviewer_role = roles.get("reviewer", {})
     poster_role = roles.get("poster", {})
@@ -260,7 +325,7 @@ def run_generate_tweets_crewai(
         or "Generate varied German tweets that follow the provided constraints.",
         backstory=generator_role.get("backstory")
         or "You are an expert social media writer for travel and passenger rights.",
-        llm=llm,
+        llm=llms["generator"],
         verbose=settings.verbose,
     )
 
@@ -270,7 +335,7 @@ def run_generate_tweets_crewai(
         or "Ensure tweets comply with X constraints and style rules.",
         backstory=reviewer_role.get("backstory")
         or "You are a strict reviewer who fixes or removes non-compliant tweets.",
-        llm=llm,
+        llm=llms["reviewer"],
         verbose=settings.verbose,
     )
 
@@ -280,200 +345,477 @@ def run_generate_tweets_crewai(
         or "Prepare final tweets for the posting queue without altering content.",
         backstory=poster_role.get("backstory")
         or "You only prepare a queue; you never call external APIs.",
-        llm=llm,
+        llm=llms["poster"],
         verbose=settings.verbose,
     )
 
-    base_active_types = active_types
-
-    last_raw_path = f"{settings.out_dir}/last_raw_output.txt"
-    write_text(last_raw_path, f"RUN ID\n{run_id}\n\n")
-    tweets: list[dict] = []
-    max_attempts = 3
-    embedding_disabled = False
-    total_attempts = 0
-    rate_limit_hits = 0
-    generated_count = 0
-    accepted_count = 0
-    fallback_used = False
-
-    def _build_context_limits(force_minimal: bool) -> list[int]:
-        if force_minimal:
-            return [0]
-        limits: list[int] = []
-        for size in [settings.recent_tweets_max, 10, 5, 0]:
-            if size is None:
-                continue
-            size = min(size, len(recent))
-            if size not in limits:
-                limits.append(size)
-        return limits
-
-    def _build_n_tweet_levels(force_minimal: bool) -> list[int]:
-        if force_minimal:
-            return [1]
-        levels: list[int] = []
-        for size in [settings.n_tweets, 5, 3, 1]:
-            if size <= 0:
-                continue
-            if size not in levels:
-                levels.append(size)
-        return levels
+    return generator_agent, reviewer_agent, poster_agent
 
-    force_minimal = False
 
-    while True:
-        context_limits = _build_context_limits(force_minimal)
-        n_tweet_levels = _build_n_tweet_levels(force_minimal)
-        rate_limit_triggered = False
+def _split_type_groups(
+    active_types: list[TweetType], n_tweets: int, group_size: int
+) -> list[tuple[list[TweetType], int]]:
+    """Split ``active_types`` into sub-crew groups, sharing ``n_tweets`` out among them."""
+    size = max(1, group_size)
+    groups = [active_types[i : i + size] for i in range(0, len(active_types), size)]
+    if len(groups) <= 1:
+        return [(active_types, n_tweets)]
+    base, extra = divmod(max(n_tweets, len(groups)), len(groups))
+    return [(group, base + (1 if i < extra else 0)) for i, group in enumerate(groups)]
 
-        for context_limit in context_limits:
-            recent_context = recent[-context_limit:] if context_limit > 0 else []
 
-            for n_tweets in n_tweet_levels:
-                if forced_types:
-                    active_types = base_active_types
+def run_generate_tweets_crewai(
+    settings=None,
+    *,
+    dry_run: bool = False,
+) -> dict:
+    apply_litellm_env()
+    settings = settings or load_settings()
+    ensure_dir(settings.out_dir)
+    run_id = f"{now_timestamp()}_{uuid4().hex[:8]}"
+    setup_logging(
+        settings.out_dir,
+        verbose=settings.verbose,
+        run_id=run_id,
+        json_logs=settings.log_json,
+        log_dir=settings.log_dir,
+    )
+    pipeline_logger = logging.getLogger(LOGGER_NAME)
+    log_event(
+        pipeline_logger,
+        "run_start",
+        run_id=run_id,
+        model=settings.openai_model_name,
+        n_tweets=settings.n_tweets,
+        recent_max=settings.recent_tweets_max,
+        forced_types=list(settings.forced_tweet_types),
+        temperature=settings.temperature,
+    )
+    # One policy per run, so the deadline and circuit breaker span every kickoff.
+    retry_policy = RetryPolicy(
+        max_wall_time=settings.max_wall_time_seconds,
+        breaker_threshold=settings.circuit_breaker_threshold,
+    )
+
+    company_md = read_text(settings.tweets_md_path)
+    types_md = read_text(settings.tweet_types_md_path)
+    roles = _load_roles(settings.crew_roles_md_path)
+
+    ideas_md = None
+    ideas_path = Path(settings.ideas_md_path)
+    if ideas_path.exists():
+        ideas_md = ideas_path.read_text(encoding="utf-8")
+
+    all_types = parse_tweet_types_md(types_md)
+    if not all_types:
+        raise NoTweetTypesError(f"No tweet types found in {settings.tweet_types_md_path}")
+
+    history = open_history_store(settings)
+    try:
+        history_path = str(history.path)
+
+        forced_types = [t.strip().lower() for t in settings.forced_tweet_types if t.strip()]
+        if forced_types:
+            active_types = [t for t in all_types if t.name.strip().lower() in set(forced_types)]
+        else:
+            max_types = min(settings.n_tweets, len(all_types))
+            start_idx = _rotation_start_index(history, total_types=len(all_types))
+            active_types = [all_types[(start_idx + i) % len(all_types)] for i in range(max_types)]
+            forced_types = [t.name.strip().lower() for t in active_types]
+
+        history.fix_unknown_types("educational")
+        recent = history.recent_texts(settings.recent_tweets_max)
+        recent_features = HistoryFeatureIndex(recent)
+
+        history_index = None
+        if (
+            settings.embedding_api_key
+            or settings.openai_api_key
+            or is_local_embedding_model(settings.embedding_model_name)
+        ):
+            history_index = open_history_index(settings)
+        if history_index is not None:
+            try:
+                synced = sync_history_index(history_index, history, settings)
+                log_event(
+                    pipeline_logger,
+                    "history_index_sync",
+                    added=synced,
+                    size=len(history_index),
+                )
+            except Exception as exc:
+                pipeline_logger.warning("History index unavailable: %s", exc)
+                history_index = None
+
+        role_models = _role_models(settings, roles)
+        # Every level's crew must fit the smallest window among the models it routes to.
+        context_window = min(
+            context_window_for(model, settings.llm_context_window) for model in role_models.values()
+        )
+        # Every role's LLM draws from its own model's buckets; they share one limiter.
+        rate_limit = chat_rate_limit(settings)
+        rate_limit_waited_before = rate_limit.limiter.waited_seconds if rate_limit else 0.0
+        hedge_tracker = get_hedge_tracker(settings)
+        hedge_stats_before = hedge_tracker.stats() if hedge_tracker else {}
+        http_stats_before = http_pool_stats(settings)
+
+        base_active_types = active_types
+
+        last_raw_path = f"{settings.out_dir}/last_raw_output.txt"
+        write_text(last_raw_path, f"RUN ID\n{run_id}\n\n")
+        tweets: list[dict] = []
+        max_attempts = 3
+        embedding_disabled = False
+        total_attempts = 0
+        rate_limit_hits = 0
+        generated_count = 0
+        accepted_count = 0
+        fallback_used = False
+        truncated_outputs = 0
+        review_candidates = 0
+        review_local_passed = 0
+        review_sent_to_llm = 0
+        review_calls = 0
+        review_calls_skipped = 0
+        review_tokens_saved = 0
+
+        def _build_context_limits(force_minimal: bool) -> list[int]:
+            if force_minimal:
+                return [0]
+            limits: list[int] = []
+            for size in [settings.recent_tweets_max, 10, 5, 0]:
+                if size is None:
+                    continue
+                size = min(size, len(recent))
+                if size not in limits:
+                    limits.append(size)
+            return limits
+
+        def _build_n_tweet_levels(force_minimal: bool) -> list[int]:
+            if force_minimal:
+                return [1]
+            levels: list[int] = []
+            for size in [settings.n_tweets, 5, 3, 1]:
+                if size <= 0:
+                    continue
+                if size not in levels:
+                    levels.append(size)
+            return levels
+
+        def _level_types(n_tweets: int) -> list[TweetType]:
+            if forced_types:
+                return base_active_types
+            return base_active_types[: max(1, min(n_tweets, len(base_active_types)))]
+
+        def _level_budget(context_limit: int, n_tweets: int) -> TokenBudget:
+            active_types = _level_types(n_tweets)
+            return _plan_level_budget(
+                company_md=company_md,
+                ideas_md=ideas_md,
+                recent_context=recent[-context_limit:] if context_limit > 0 else [],
+                active_types=active_types,
+                forced_types=bool(forced_types),
+                n_tweets=len(active_types) if forced_types else n_tweets,
+                local_poster=settings.local_poster,
+                hybrid_review=settings.hybrid_review,
+                context_window=context_window,
+            )
+
+        stats_lock = threading.Lock()
+        embedding_lock = threading.Lock()
+        speculative = settings.ladder_speculation > 1
+
+        def _hybrid_review(
+            tweets: list[dict],
+            reviewer: Agent,
+            n_expected: int,
+            default_type: str | None,
+            cancel: threading.Event,
+        ) -> list[dict]:
+            """Pass locally clean tweets through; send only the violators to the LLM reviewer."""
+            nonlocal total_attempts, review_candidates, review_local_passed, review_sent_to_llm
+            nonlocal review_calls, review_calls_skipped, review_tokens_saved
+            passed, failing = prescreen_candidates(tweets)
+            # Passed tweets are neither sent to nor echoed back by the reviewer.
+            saved = 2 * estimate_tokens(json.dumps(passed, ensure_ascii=False)) if passed else 0
+            if not failing:
+                saved += estimate_tokens(build_review_prompt(n_tweets=n_expected))
+            with stats_lock:
+                review_candidates += len(tweets)
+                review_local_passed += len(passed)
+                review_sent_to_llm += len(failing)
+                review_tokens_saved += saved
+                if failing:
+                    review_calls += 1
+                    total_attempts += 1
                 else:
-                    active_types = base_active_types[
-                        : max(1, min(n_tweets, len(base_active_types)))
-                    ]
-
-                effective_n_tweets = len(active_types) if forced_types else n_tweets
-                pipeline_logger.info(
-                    "Run context: force_minimal=%s recent_context=%s n_tweets=%s types=%s",
-                    force_minimal,
-                    len(recent_context),
-                    effective_n_tweets,
-                    ",".join([t.name for t in active_types]),
+                    review_calls_skipped += 1
+            if not failing or cancel.is_set():
+                return passed
+            fix_crew = _build_fix_crew(reviewer, failing)
+            raw_str = kickoff_with_retry(
+                fix_crew,
+                fail_fast_on_rate_limit=True,
+                debug_path=last_raw_path,
+                policy=retry_policy,
+                cancel=cancel,
+            )
+            _append_text(last_raw_path, "RAW REVIEW OUTPUT\n" + raw_str + "\n\n")
+            try:
+                fixed = parse_tweets_response(
+                    raw_str,
+                    n_tweets=len(failing),
+                    default_tweet_type=default_type,
+                    allow_truncated=True,
+                )["tweets"]
+            except ValueError:
+                fixed = []
+            fixed_passed, _ = prescreen_candidates(fixed)
+            return passed + fixed_passed
+
+        def _generate(
+            crew: Crew,
+            review_only_crew: Crew,
+            types: list[TweetType],
+            n_expected: int,
+            reviewer: Agent | None,
+            cancel: threading.Event,
+        ) -> dict | None:
+            """Kick off ``crew`` and parse it, falling back to the review-only crew once.
+
+            Returns None without another kickoff once ``cancel`` is set.
+            """
+            nonlocal total_attempts
+            default_type = types[0].name.strip() if types else None
+            for current in (crew, review_only_crew):
+                if cancel.is_set():
+                    return None
+                with stats_lock:
+                    total_attempts += 1
+                raw_str = kickoff_with_retry(
+                    current,
+                    fail_fast_on_rate_limit=True,
+                    debug_path=last_raw_path,
+                    policy=retry_policy,
+                    cancel=cancel,
                 )
-
-                _append_text(
-                    last_raw_path,
-                    f"RUN CONTEXT\nforce_minimal={force_minimal}\nrecent_context={len(recent_context)}\n"
-                    f"n_tweets={effective_n_tweets}\nactive_types={','.join([t.name for t in active_types])}\n\n",
+                _append_text(last_raw_path, "RAW OUTPUT\n" + raw_str + "\n\n")
+                try:
+                    data = parse_tweets_response(
+                        raw_str,
+                        n_tweets=n_expected,
+                        default_tweet_type=default_type,
+                        allow_truncated=True,
+                    )
+                except ValueError:
+                    continue
+                if settings.hybrid_review and reviewer is not None:
+                    data["tweets"] = _hybrid_review(
+                        data["tweets"], reviewer, n_expected, default_type, cancel
+                    )
+                if settings.local_poster or settings.hybrid_review:
+                    data["tweets"] = prepare_post_queue(data["tweets"])
+                return data
+            return None
+
+        def _generate_groups(
+            crew_groups: list[tuple[Crew, Crew, list[TweetType], int, Agent]],
+            cancel: threading.Event,
+        ) -> dict | None:
+            """Run every sub-crew (concurrently when there are several) and merge their tweets.
+
+            A failing group only loses its own tweets; errors are raised when no group has any.
+            """
+            if len(crew_groups) == 1:
+                return _generate(*crew_groups[0], cancel)
+            results: list[dict] = []
+            errors: list[Exception] = []
+            with ThreadPoolExecutor(max_workers=settings.crew_concurrency) as pool:
+                futures = [pool.submit(_generate, *group, cancel) for group in crew_groups]
+                for future in futures:
+                    try:
+                        result = future.result()
+                    except Exception as exc:
+                        errors.append(exc)
+                        continue
+                    if result is not None:
+                        results.append(result)
+            if not results:
+                if errors:
+                    raise errors[0]
+                return None
+            for error in errors:
+                pipeline_logger.warning("Sub-crew failed: %s", error)
+            return {
+                "tweets": [t for result in results for t in result["tweets"]],
+                "truncated": any(result.get("truncated") for result in results),
+            }
+
+        def _run_level(
+            force_minimal: bool, context_limit: int, n_tweets: int, cancel: threading.Event
+        ) -> LadderOutcome:
+            """Try one rung of the context/n_tweets ladder up to ``max_attempts`` times."""
+            nonlocal embedding_disabled, rate_limit_hits, generated_count
+            nonlocal accepted_count, fallback_used, truncated_outputs
+            recent_context = recent[-context_limit:] if context_limit > 0 else []
+            active_types = _level_types(n_tweets)
+
+            effective_n_tweets = len(active_types) if forced_types else n_tweets
+            outcome = LadderOutcome(
+                context_limit=context_limit,
+                n_tweets=n_tweets,
+                effective_n_tweets=effective_n_tweets,
+            )
+            pipeline_logger.info(
+                "Run context: force_minimal=%s recent_context=%s n_tweets=%s types=%s",
+                force_minimal,
+                len(recent_context),
+                effective_n_tweets,
+                ",".join([t.name for t in active_types]),
+            )
+
+            _append_text(
+                last_raw_path,
+                f"RUN CONTEXT\nforce_minimal={force_minimal}\nrecent_context={len(recent_context)}\n"
+                f"n_tweets={effective_n_tweets}\nactive_types={','.join([t.name for t in active_types])}\n\n",
+            )
+
+            type_groups = (
+                _split_type_groups(active_types, effective_n_tweets, settings.crew_group_size)
+                if settings.crew_concurrency > 1
+                else [(active_types, effective_n_tweets)]
+            )
+            crew_groups = []
+            for group_types, group_n_tweets in type_groups:
+                # Every crew gets its own agents: crewAI agents are stateful, and max_tokens is
+                # sized for the tweets this crew is asked for.
+                group_max_tokens = output_tokens_for(
+                    len(group_types) if forced_types else group_n_tweets
+                )
+                # Roles that share a model share one LLM client.
+                model_llms: dict[str, BaseLLM] = {}
+                for model in role_models.values():
+                    if model not in model_llms:
+                        model_llms[model] = build_llm(
+                            settings, max_tokens=group_max_tokens, model=model
+                        )
+                group_agents = _build_agents(
+                    settings,
+                    {role: model_llms[model] for role, model in role_models.items()},
+                    roles,
                 )
-
                 crew, review_only_crew = _build_crews(
-                    generator_agent=generator_agent,
-                    reviewer_agent=reviewer_agent,
-                    poster_agent=poster_agent,
+                    generator_agent=group_agents[0],
+                    reviewer_agent=group_agents[1],
+                    poster_agent=group_agents[2],
                     company_md=company_md,
                     ideas_md=ideas_md,
                     recent_context=recent_context,
-                    active_types=active_types,
+                    active_types=group_types,
                     forced_types=bool(forced_types),
-                    n_tweets=effective_n_tweets,
+                    n_tweets=group_n_tweets,
+                    local_poster=settings.local_poster,
+                    hybrid_review=settings.hybrid_review,
+                )
+                crew_groups.append(
+                    (crew, review_only_crew, group_types, group_n_tweets, group_agents[1])
+                )
+            if len(crew_groups) > 1:
+                log_event(
+                    pipeline_logger,
+                    "crew_groups",
+                    groups=[[t.name for t in group[2]] for group in crew_groups],
+                    concurrency=settings.crew_concurrency,
                 )
 
-                for _attempt in range(max_attempts):
-                    total_attempts += 1
-                    try:
-                        raw_str = kickoff_with_retry(
-                            crew, fail_fast_on_rate_limit=True, debug_path=last_raw_path
-                        )
-                    except RateLimitHit as exc:
-                        retry_after = parse_retry_after_seconds(str(exc))
-                        delay = max(retry_after or 0, 60.0)
+            for _attempt in range(max_attempts):
+                if cancel.is_set():
+                    return outcome
+                # An open circuit or spent deadline fails this and every remaining level.
+                retry_policy.check()
+                try:
+                    data = _generate_groups(crew_groups, cancel)
+                except KickoffCancelled:
+                    return outcome
+                except RateLimitHit as exc:
+                    retry_after = parse_retry_after_seconds(str(exc))
+                    # The shared limiter already holds the model back for exactly the hint;
+                    # without one, sleep at least a minute before the smaller retry.
+                    delay = 0.0 if rate_limit else max(retry_after or 0, 60.0)
+                    with stats_lock:
                         rate_limit_hits += 1
-                        log_event(
-                            pipeline_logger,
-                            "rate_limit",
-                            delay=delay,
-                            attempt=total_attempts,
-                        )
-                        pipeline_logger.warning("Rate limit hit. Sleeping for %s seconds.", delay)
-                        time.sleep(delay + 0.25)
-                        rate_limit_triggered = True
-                        break
-                    except Exception as exc:
-                        if is_request_too_large(exc):
-                            pipeline_logger.warning(
-                                "Request too large; retrying with smaller context"
-                            )
-                            break
-                        raise
+                    log_event(
+                        pipeline_logger,
+                        "rate_limit",
+                        delay=delay,
+                        attempt=total_attempts,
+                    )
+                    outcome.rate_limit_delay = delay
+                    return outcome
+                except Exception as exc:
+                    if is_request_too_large(exc):
+                        pipeline_logger.warning("Request too large; retrying with smaller context")
+                        return outcome
+                    raise
+                if cancel.is_set():
+                    # Another ladder level already won; drop this late result.
+                    return outcome
+                if data is None:
+                    continue
+
+                if data.get("truncated"):
+                    with stats_lock:
+                        truncated_outputs += 1
+                    log_event(
+                        pipeline_logger,
+                        "truncated_output",
+                        attempt=total_attempts,
+                        salvaged=len(data["tweets"]),
+                    )
+                    _append_text(
+                        last_raw_path,
+                        f"TRUNCATED OUTPUT\nsalvaged={len(data['tweets'])}\n\n",
+                    )
 
-                    _append_text(last_raw_path, "RAW OUTPUT\n" + raw_str + "\n\n")
+                required_types = [t.name.strip() for t in active_types]
+                data["tweets"] = assign_missing_types(data["tweets"], required_types)
+                data["tweets"] = [normalize_candidate_fields(t) for t in data["tweets"]]
+                generated_count = len(data["tweets"])
 
-                    try:
-                        default_type = active_types[0].name.strip() if active_types else None
-                        data = parse_tweets_response(
-                            raw_str,
-                            n_tweets=effective_n_tweets,
-                            default_tweet_type=default_type,
-                        )
-                    except ValueError:
-                        try:
-                            total_attempts += 1
-                            raw_str = kickoff_with_retry(
-                                review_only_crew,
-                                fail_fast_on_rate_limit=True,
-                                debug_path=last_raw_path,
-                            )
-                        except RateLimitHit as exc:
-                            retry_after = parse_retry_after_seconds(str(exc))
-                            delay = max(retry_after or 0, 60.0)
-                            rate_limit_hits += 1
-                            log_event(
-                                pipeline_logger,
-                                "rate_limit",
-                                delay=delay,
-                                attempt=total_attempts,
-                            )
-                            pipeline_logger.warning(
-                                "Rate limit hit. Sleeping for %s seconds.", delay
-                            )
-                            time.sleep(delay + 0.25)
-                            rate_limit_triggered = True
-                            break
-                        except Exception as exc:
-                            if is_request_too_large(exc):
-                                pipeline_logger.warning(
-                                    "Request too large; retrying with smaller context"
-                                )
-                                break
-                            raise
-                        _append_text(last_raw_path, "RAW OUTPUT\n" + raw_str + "\n\n")
-                        try:
-                            default_type = active_types[0].name.strip() if active_types else None
-                            data = parse_tweets_response(
-                                raw_str,
-                                n_tweets=effective_n_tweets,
-                                default_tweet_type=default_type,
-                            )
-                        except ValueError:
-                            continue
-
-                    required_types = [t.name.strip() for t in active_types]
-                    data["tweets"] = assign_missing_types(data["tweets"], required_types)
-                    data["tweets"] = [normalize_candidate_fields(t) for t in data["tweets"]]
-                    generated_count = len(data["tweets"])
-
-                    max_travel_hack = 1
-                    allowed_types = {t.name.strip().lower() for t in active_types}
-                    type_limits = (
-                        {t.name.strip().lower(): 1 for t in active_types} if forced_types else None
-                    )
+                max_travel_hack = 1
+                allowed_types = {t.name.strip().lower() for t in active_types}
+                type_limits = (
+                    {t.name.strip().lower(): 1 for t in active_types} if forced_types else None
+                )
 
-                    embedding_threshold = (
-                        settings.embedding_similarity_threshold
-                        if settings.embedding_model_name
-                        and (settings.embedding_api_key or settings.openai_api_key)
-                        else None
+                embedding_threshold = (
+                    settings.embedding_similarity_threshold
+                    if settings.embedding_model_name
+                    and (
+                        settings.embedding_api_key
+                        or settings.openai_api_key
+                        or is_local_embedding_model(settings.embedding_model_name)
                     )
-                    recent_for_embeddings = recent_context[: settings.embedding_history_max]
-                    recent_embeddings = None
-                    candidate_embeddings = None
-                    candidate_texts = [
-                        (t.get("text") or "").strip()
-                        for t in data["tweets"]
-                        if (t.get("text") or "").strip()
-                    ]
-                    embedding_error = None
-                    if embedding_threshold and not embedding_disabled:
+                    else None
+                )
+                recent_for_embeddings = recent_context[: settings.embedding_history_max]
+                recent_embeddings = None
+                candidate_embeddings = None
+                candidate_texts = [
+                    (t.get("text") or "").strip()
+                    for t in data["tweets"]
+                    if (t.get("text") or "").strip()
+                ]
+                embedding_error = None
+                if embedding_threshold and not embedding_disabled:
+                    # The embedding cache is shared by all ladder levels.
+                    with embedding_lock:
                         try:
                             recent_embeddings = embed_texts(recent_for_embeddings, settings)
-                            candidate_embeddings = build_embedding_map(candidate_texts, settings)
+                            # Candidates are compared once; only the history is worth caching.
+                            candidate_embeddings = build_embedding_map(
+                                candidate_texts, settings, store=False
+                            )
                         except Exception as exc:
                             embedding_error = str(exc)
                             if is_embedding_auth_error(exc):
@@ -481,135 +823,279 @@ def run_generate_tweets_crewai(
                                 embedding_error += " (embedding disabled)"
                             pipeline_logger.warning("Embedding error: %s", embedding_error)
 
-                        _append_text(
-                            last_raw_path,
-                            f"EMBEDDING DEBUG\nrecent={len(recent_for_embeddings)} emb_recent={'yes' if recent_embeddings else 'no'}\n"
-                            f"candidates={len(candidate_texts)} emb_candidates={'yes' if candidate_embeddings else 'no'}\n"
-                            f"error={embedding_error}\n\n",
-                        )
+                    _append_text(
+                        last_raw_path,
+                        f"EMBEDDING DEBUG\nrecent={len(recent_for_embeddings)} emb_recent={'yes' if recent_embeddings else 'no'}\n"
+                        f"candidates={len(candidate_texts)} emb_candidates={'yes' if candidate_embeddings else 'no'}\n"
+                        f"error={embedding_error}\n\n",
+                    )
+
+                tweets = filter_crewai_tweets(
+                    data["tweets"],
+                    recent,
+                    max_travel_hack=max_travel_hack,
+                    allowed_types=allowed_types,
+                    type_limits=type_limits,
+                    embedding_threshold=embedding_threshold,
+                    recent_embeddings=recent_embeddings,
+                    candidate_embeddings=candidate_embeddings,
+                    history_index=history_index,
+                    history_features=recent_features,
+                )
+                level_fallback = False
+                if not tweets:
+                    fallback = []
+                    for t in data["tweets"]:
+                        if accept_relaxed_candidate(
+                            t, allowed_types=allowed_types, type_limits=type_limits
+                        ):
+                            fallback = [t]
+                            break
+                    if fallback:
+                        level_fallback = True
+                    tweets = fallback
 
+                if tweets:
                     tweets = filter_crewai_tweets(
-                        data["tweets"],
+                        tweets,
                         recent,
                         max_travel_hack=max_travel_hack,
                         allowed_types=allowed_types,
                         type_limits=type_limits,
-                        embedding_threshold=embedding_threshold,
-                        recent_embeddings=recent_embeddings,
-                        candidate_embeddings=candidate_embeddings,
+                        embedding_threshold=None,
+                        recent_embeddings=None,
+                        candidate_embeddings=None,
+                        history_features=recent_features,
                     )
-                    if not tweets:
-                        fallback = []
-                        for t in data["tweets"]:
-                            if accept_relaxed_candidate(
-                                t, allowed_types=allowed_types, type_limits=type_limits
-                            ):
-                                fallback = [t]
-                                break
-                        if fallback:
-                            fallback_used = True
-                        tweets = fallback
-
-                    if tweets:
-                        tweets = filter_crewai_tweets(
-                            tweets,
-                            recent,
-                            max_travel_hack=max_travel_hack,
-                            allowed_types=allowed_types,
-                            type_limits=type_limits,
-                            embedding_threshold=None,
-                            recent_embeddings=None,
-                            candidate_embeddings=None,
-                        )
 
-                    if tweets:
+                if tweets:
+                    with stats_lock:
+                        if cancel.is_set():
+                            return outcome
+                        # Claim the win so concurrent levels discard their results.
+                        cancel.set()
                         accepted_count = len(tweets)
-                        pipeline_logger.info("Accepted %s tweets", len(tweets))
+                        fallback_used = fallback_used or level_fallback
+                    pipeline_logger.info("Accepted %s tweets", len(tweets))
+                    outcome.tweets = tweets
+                    return outcome
+            return outcome
+
+        def _run_ladder(force_minimal: bool, levels: list[tuple[int, int]]) -> LadderOutcome:
+            outcome = LadderOutcome()
+            for context_limit, n_tweets in levels:
+                outcome = _run_level(force_minimal, context_limit, n_tweets, threading.Event())
+                if outcome.tweets or outcome.rate_limit_delay is not None:
+                    break
+            return outcome
+
+        def _run_ladder_speculative(
+            force_minimal: bool, levels: list[tuple[int, int]]
+        ) -> LadderOutcome:
+            """Run up to ``ladder_speculation`` levels at once; the first accepted result wins.
+
+            Levels that have not started are cancelled. A kickoff already talking to the LLM
+            cannot be interrupted, but a losing level starts no further kickoff, retry or
+            review and its output is discarded. A rate limit on any level stops the whole
+            speculative ladder.
+            """
+            cancel = threading.Event()
+            queue = list(levels)
+            running: dict[Future[LadderOutcome], tuple[int, int]] = {}
+            result = LadderOutcome()
+            width = settings.ladder_speculation
+            pool = ThreadPoolExecutor(max_workers=width)
+            try:
+                while queue or running:
+                    while queue and len(running) < width and not cancel.is_set():
+                        level = queue.pop(0)
+                        running[pool.submit(_run_level, force_minimal, *level, cancel)] = level
+                    if not running:
                         break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        running.pop(future)
+                        outcome = future.result()
+                        if outcome.tweets:
+                            result = outcome
+                        elif outcome.rate_limit_delay is not None and not result.tweets:
+                            result = outcome
+                            cancel.set()
+                    if result.tweets or result.rate_limit_delay is not None:
+                        break
+            finally:
+                cancel.set()
+                pool.shutdown(wait=False, cancel_futures=True)
+            log_event(
+                pipeline_logger,
+                "ladder_speculation",
+                width=width,
+                levels=len(levels),
+                started=len(levels) - len(queue),
+                abandoned=len(running),
+                context_limit=result.context_limit,
+                n_tweets=result.n_tweets,
+            )
+            return result
+
+        force_minimal = False
+        effective_n_tweets = settings.n_tweets
 
-                if tweets or rate_limit_triggered:
-                    break
+        try:
+            while True:
+                levels = [
+                    (context_limit, n_tweets)
+                    for context_limit in _build_context_limits(force_minimal)
+                    for n_tweets in _build_n_tweet_levels(force_minimal)
+                ]
+                # Drop levels whose estimated request exceeds the model window up front instead of
+                # waiting for the provider to reject them; keep the smallest one as a last resort.
+                budgets = {level: _level_budget(*level) for level in levels}
+                fitting = [level for level in levels if budgets[level].fits]
+                log_event(
+                    pipeline_logger,
+                    "token_budget",
+                    context_window=context_window,
+                    levels=len(levels),
+                    fitting=len(fitting),
+                    input_tokens=budgets[(fitting or levels)[0]].input_tokens,
+                    max_tokens=budgets[(fitting or levels)[0]].max_tokens,
+                )
+                levels = fitting or levels[-1:]
+                if speculative and len(levels) > 1:
+                    outcome = _run_ladder_speculative(force_minimal, levels)
+                else:
+                    outcome = _run_ladder(force_minimal, levels)
+                tweets = outcome.tweets
+                effective_n_tweets = outcome.effective_n_tweets or effective_n_tweets
 
-            if tweets or rate_limit_triggered:
+                if tweets:
+                    break
+                if outcome.rate_limit_delay is not None:
+                    pipeline_logger.warning(
+                        "Rate limit hit. Sleeping for %s seconds.", outcome.rate_limit_delay
+                    )
+                    retry_policy.backoff(outcome.rate_limit_delay + 0.25, rate_limited=True)
+                    if not force_minimal:
+                        force_minimal = True
+                        pipeline_logger.warning(
+                            "Rate limit triggered; retrying with minimal settings"
+                        )
+                        continue
                 break
-
-        if tweets:
-            break
-        if rate_limit_triggered and not force_minimal:
-            force_minimal = True
-            pipeline_logger.warning("Rate limit triggered; retrying with minimal settings")
-            continue
-        break
-
-    if not tweets:
-        pipeline_logger.warning("No tweets produced")
-        if rate_limit_hits:
-            raise RateLimitError("No tweets produced after rate-limit retries")
-        raise NoTweetsGeneratedError("No tweets produced")
-
-    timestamp = now_timestamp()
-    out_queue_path = f"{settings.out_dir}/post_queue_{timestamp}.json"
-
-    output_candidates = tweets[: min(effective_n_tweets, 5)]
-    seen_buckets: set[str] = set()
-    seen_types: set[str] = set()
-    deduped_output: list[dict] = []
-    for t in output_candidates:
-        tags = t.get("tags") if isinstance(t.get("tags"), list) else []
-        text = t.get("text", "")
-        bucket = extract_bucket(text, tags) or infer_bucket_from_text(text)
-        t_type = (t.get("tweet_type") or "").strip().lower()
-        if bucket and bucket in seen_buckets:
-            continue
-        if t_type and t_type in seen_types:
-            continue
-        if bucket:
-            seen_buckets.add(bucket)
-        if t_type:
-            seen_types.add(t_type)
-        deduped_output.append(t)
-
-    if not deduped_output and output_candidates:
-        deduped_output = [output_candidates[0]]
-
-    payload = {"tweets": deduped_output}
-    if not dry_run:
-        write_json(out_queue_path, {"queue": payload["tweets"]})
-        pipeline_logger.info("Wrote post queue: %s", out_queue_path)
-    else:
-        pipeline_logger.info("Dry run: skipped writing post queue: %s", out_queue_path)
-    log_event(
-        pipeline_logger,
-        "run_metrics",
-        run_id=run_id,
-        attempts=total_attempts,
-        rate_limit_hits=rate_limit_hits,
-        generated=generated_count,
-        accepted=accepted_count,
-        output=len(deduped_output),
-        fallback_used=fallback_used,
-        out_queue_path=out_queue_path,
-        dry_run=dry_run,
-    )
-
-    history_path = f"{settings.out_dir}/history.jsonl"
-    if not dry_run:
-        for t in payload["tweets"]:
-            append_jsonl(history_path, t)
-
-    log_event(
-        pipeline_logger,
-        "run_complete",
-        run_id=run_id,
-        history_path=history_path,
-        output_count=len(payload["tweets"]),
-        dry_run=dry_run,
-    )
-
-    return {
-        "run_id": run_id,
-        "out_queue_path": out_queue_path,
-        "history_path": history_path,
-        "output_count": len(payload["tweets"]),
-        "dry_run": dry_run,
-    }
+        except (CircuitOpenError, DeadlineExceededError) as exc:
+            log_event(
+                pipeline_logger,
+                "run_aborted",
+                run_id=run_id,
+                reason=str(exc),
+                attempts=total_attempts,
+                **retry_policy.stats(),
+            )
+            raise
+
+        if not tweets:
+            pipeline_logger.warning("No tweets produced")
+            if rate_limit_hits:
+                raise RateLimitError("No tweets produced after rate-limit retries")
+            raise NoTweetsGeneratedError("No tweets produced")
+
+        timestamp = now_timestamp()
+        out_queue_path = f"{settings.out_dir}/post_queue_{timestamp}.json"
+
+        output_candidates = tweets[: min(effective_n_tweets, 5)]
+        seen_buckets: set[str] = set()
+        seen_types: set[str] = set()
+        deduped_output: list[dict] = []
+        for t in output_candidates:
+            tags = t.get("tags") if isinstance(t.get("tags"), list) else []
+            text = t.get("text", "")
+            bucket = extract_bucket(text, tags) or infer_bucket_from_text(text)
+            t_type = (t.get("tweet_type") or "").strip().lower()
+            if bucket and bucket in seen_buckets:
+                continue
+            if t_type and t_type in seen_types:
+                continue
+            if bucket:
+                seen_buckets.add(bucket)
+            if t_type:
+                seen_types.add(t_type)
+            deduped_output.append(t)
+
+        if not deduped_output and output_candidates:
+            deduped_output = [output_candidates[0]]
+
+        payload = {"tweets": deduped_output}
+        if not dry_run:
+            write_json(out_queue_path, {"queue": payload["tweets"]})
+            pipeline_logger.info("Wrote post queue: %s", out_queue_path)
+        else:
+            pipeline_logger.info("Dry run: skipped writing post queue: %s", out_queue_path)
+        embedding_cache = get_embedding_cache(settings)
+        llm_cache = get_llm_cache(settings)
+        log_event(
+            pipeline_logger,
+            "run_metrics",
+            run_id=run_id,
+            models=role_models,
+            attempts=total_attempts,
+            rate_limit_hits=rate_limit_hits,
+            generated=generated_count,
+            accepted=accepted_count,
+            output=len(deduped_output),
+            fallback_used=fallback_used,
+            truncated_outputs=truncated_outputs,
+            review_candidates=review_candidates,
+            review_local_passed=review_local_passed,
+            review_sent_to_llm=review_sent_to_llm,
+            review_calls=review_calls,
+            review_calls_skipped=review_calls_skipped,
+            review_tokens_saved=review_tokens_saved,
+            embedding_cache_hits=embedding_cache.hits if embedding_cache else 0,
+            embedding_cache_misses=embedding_cache.misses if embedding_cache else 0,
+            llm_cache_mode=settings.llm_cache_mode,
+            llm_cache_hits=llm_cache.hits if llm_cache else 0,
+            llm_cache_misses=llm_cache.misses if llm_cache else 0,
+            **retry_policy.stats(),
+            **{
+                key: round(value - hedge_stats_before[key], 3)
+                for key, value in (hedge_tracker.stats() if hedge_tracker else {}).items()
+            },
+            **{
+                key: value - http_stats_before[key]
+                for key, value in http_pool_stats(settings).items()
+            },
+            rate_limit_waited_seconds=round(
+                rate_limit.limiter.waited_seconds - rate_limit_waited_before if rate_limit else 0.0,
+                3,
+            ),
+            out_queue_path=out_queue_path,
+            dry_run=dry_run,
+        )
+
+        if not dry_run:
+            history.append(payload["tweets"])
+            if history_index is not None:
+                try:
+                    sync_history_index(history_index, history, settings)
+                except Exception as exc:
+                    pipeline_logger.warning("History index update failed: %s", exc)
+
+        log_event(
+            pipeline_logger,
+            "run_complete",
+            run_id=run_id,
+            history_path=history_path,
+            output_count=len(payload["tweets"]),
+            dry_run=dry_run,
+        )
+
+        return {
+            "run_id": run_id,
+            "out_queue_path": out_queue_path,
+            "history_path": history_path,
+            "output_count": len(payload["tweets"]),
+            "dry_run": dry_run,
+        }
+    finally:
+        history.close()
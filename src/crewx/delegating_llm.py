@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from typing import Any
+
+from crewai.llms.base_llm import BaseLLM, call_stop_override
+from pydantic import ConfigDict
+
+
+class DelegatingLLM(BaseLLM):
+    """Base for LLMs that wrap another client.
+
+    Model, sampling settings and capabilities are those of ``inner``. Subclasses override
+    ``call`` and pass the request on with ``_forward``, which keeps the stop words crewAI
+    set on the wrapper for the wrapped client.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: BaseLLM
+
+    def __init__(self, *, inner: BaseLLM, **fields: Any) -> None:
+        super().__init__(  # type: ignore[call-arg]
+            model=inner.model,
+            inner=inner,
+            temperature=inner.temperature,
+            max_tokens=inner.max_tokens,
+            stop=list(inner.stop),
+            provider=inner.provider,
+            **fields,
+        )
+
+    def _forward(self, llm: BaseLLM, messages, kwargs: dict[str, Any]) -> Any:
+        with call_stop_override(llm, self.stop_sequences):
+            return llm.call(messages, **kwargs)
+
+    def call(
+        self,
+        messages,
+        tools=None,
+        callbacks=None,
+        available_functions=None,
+        from_task=None,
+        from_agent=None,
+        response_model=None,
+    ):
+        return self._forward(
+            self.inner,
+            messages,
+            dict(
+                tools=tools,
+                callbacks=callbacks,
+                available_functions=available_functions,
+                from_task=from_task,
+                from_agent=from_agent,
+                response_model=response_model,
+            ),
+        )
+
+    def supports_stop_words(self) -> bool:
+        return self.inner.supports_stop_words()
+
+    def supports_function_calling(self) -> bool:
+        return getattr(self.inner, "supports_function_calling", lambda: False)()
+
+    def get_context_window_size(self) -> int:
+        return self.inner.get_context_window_size()
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from pathlib import Path
+from uuid import uuid4
+
+import numpy as np
+
+from crewx.io import ensure_dir
+
+CACHE_DIR_NAME = "embedding_cache"
+INDEX_FILE = "index.json"
+VECTORS_FILE = "vectors.npy"
+SHARD_PREFIX = "shard-"
+# Saves past this many shard files compact the store back into VECTORS_FILE.
+MAX_SHARDS = 32
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _model_slug(model: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", model).strip("_") or "default"
+    digest = hashlib.sha256(model.encode("utf-8")).hexdigest()[:8]
+    return f"{slug}-{digest}"
+
+
+class EmbeddingCache:
+    """Content-addressed embedding store for one model.
+
+    Vectors live in float32 ``.npy`` files next to a small JSON index mapping the
+    normalized-text hash to its file, row and last-use tick. A save writes only the new rows,
+    as one shard file; the store is compacted back into a single ``vectors.npy`` when it
+    grows past ``max_entries`` (dropping the least recently used rows) or collects
+    ``MAX_SHARDS`` shards.
+    """
+
+    def __init__(self, root: str | Path, model: str, *, max_entries: int = 5000) -> None:
+        self.model = model
+        self.max_entries = max_entries
+        self.path = Path(root) / _model_slug(model)
+        self.hits = 0
+        self.misses = 0
+        self._tick = 0
+        # key -> [file, row, tick]
+        self._rows: dict[str, list[int]] = {}
+        self._files: list[str] = []
+        self._shards: list[np.ndarray] = []
+        self._pending: dict[str, np.ndarray] = {}
+        self._touched = False
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._pending)
+
+    def _load(self) -> None:
+        index_path = self.path / INDEX_FILE
+        if not index_path.exists():
+            return
+        try:
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+            if not isinstance(index, dict) or index.get("model") != self.model:
+                return
+            files = list(index["files"])
+            rows = {key: [int(v) for v in entry] for key, entry in index["rows"].items()}
+            shards = [np.load(self.path / name, mmap_mode="r") for name in files]
+            tick = int(index.get("tick", 0))
+        except Exception:
+            return
+        if any(shard.ndim != 2 for shard in shards) or any(
+            len(entry) != 3 or entry[0] >= len(shards) or entry[1] >= shards[entry[0]].shape[0]
+            for entry in rows.values()
+        ):
+            # Index and vectors were written by different saves; start from scratch.
+            return
+        self._rows = rows
+        self._files = files
+        self._shards = shards
+        self._tick = tick
+
+    def get_many(self, texts: list[str]) -> list[np.ndarray | None]:
+        self._tick += 1
+        found: list[np.ndarray | None] = []
+        for text in texts:
+            key = text_key(text)
+            pending = self._pending.get(key)
+            if pending is not None:
+                self.hits += 1
+                found.append(pending)
+                continue
+            entry = self._rows.get(key)
+            if entry is None:
+                self.misses += 1
+                found.append(None)
+                continue
+            entry[2] = self._tick
+            self._touched = True
+            self.hits += 1
+            found.append(np.asarray(self._shards[entry[0]][entry[1]], dtype=np.float32))
+        return found
+
+    def put_many(self, texts: list[str], vectors: list[list[float]]) -> None:
+        for text, vector in zip(texts, vectors, strict=True):
+            self._pending[text_key(text)] = np.asarray(vector, dtype=np.float32)
+
+    def _write_index(self) -> None:
+        tmp_index = self.path / f"{INDEX_FILE}.{os.getpid()}.tmp"
+        tmp_index.write_text(
+            json.dumps(
+                {"model": self.model, "tick": self._tick, "files": self._files, "rows": self._rows}
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_index, self.path / INDEX_FILE)
+
+    def _write_vectors(self, name: str, vectors: np.ndarray) -> None:
+        tmp_vectors = self.path / f"{name}.{os.getpid()}.tmp"
+        with tmp_vectors.open("wb") as handle:
+            np.save(handle, vectors)
+        os.replace(tmp_vectors, self.path / name)
+
+    def save(self) -> None:
+        if not self._pending:
+            if self._touched:
+                # Only last-use ticks changed; the vector files stay as they are.
+                self._write_index()
+                self._touched = False
+            return
+        ensure_dir(self.path)
+        dim = next(iter(self._pending.values())).shape[0]
+        if (
+            len(self) > self.max_entries
+            or len(self._files) >= MAX_SHARDS
+            or any(shard.shape[1] != dim for shard in self._shards)
+        ):
+            self._compact()
+        else:
+            self._append_shard()
+        self._pending = {}
+        self._touched = False
+
+    def _append_shard(self) -> None:
+        keys = list(self._pending)
+        vectors = np.stack([self._pending[key] for key in keys]).astype(np.float32)
+        name = f"{SHARD_PREFIX}{uuid4().hex[:12]}.npy"
+        self._write_vectors(name, vectors)
+        file = len(self._files)
+        self._files.append(name)
+        self._shards.append(vectors)
+        for row, key in enumerate(keys):
+            self._rows[key] = [file, row, self._tick]
+        self._write_index()
+
+    def _compact(self) -> None:
+        entries: list[tuple[str, int, np.ndarray]] = [
+            (key, tick, self._shards[file][row]) for key, (file, row, tick) in self._rows.items()
+        ]
+        entries.extend((key, self._tick, vec) for key, vec in self._pending.items())
+        dims = {vec.shape[0] for _, _, vec in entries}
+        if len(dims) > 1:
+            # A model change under the same name: keep only the newest shape.
+            newest = next(iter(self._pending.values())).shape[0]
+            entries = [e for e in entries if e[2].shape[0] == newest]
+        entries.sort(key=lambda e: e[1], reverse=True)
+        entries = entries[: self.max_entries]
+
+        vectors = np.stack([vec for _, _, vec in entries]).astype(np.float32)
+        self._write_vectors(VECTORS_FILE, vectors)
+        self._rows = {key: [0, i, tick] for i, (key, tick, _) in enumerate(entries)}
+        self._files = [VECTORS_FILE]
+        self._shards = [vectors]
+        self._write_index()
+        for stale in self.path.glob(f"{SHARD_PREFIX}*.npy"):
+            stale.unlink(missing_ok=True)
+
+
+_caches: dict[tuple[str, str], EmbeddingCache] = {}
+
+
+def get_embedding_cache(settings) -> EmbeddingCache | None:
+    """Return the process-wide cache for the configured embedding model, if enabled."""
+    max_entries = getattr(settings, "embedding_cache_max", 0)
+    model = settings.embedding_model_name
+    if not model or max_entries <= 0:
+        return None
+    root = str(Path(settings.out_dir) / CACHE_DIR_NAME)
+    cache = _caches.get((root, model))
+    if cache is None:
+        cache = EmbeddingCache(root, model, max_entries=max_entries)
+        _caches[(root, model)] = cache
+    return cache
@@ -1,10 +1,19 @@
 from __future__ import annotations
 
 import math
-from collections.abc import Iterable
+import zlib
+from collections.abc import Callable, Iterable, Sequence
+from typing import Protocol
 
+import numpy as np
 from litellm import embedding as litellm_embedding
 
+from crewx.embedding_cache import get_embedding_cache
+from crewx.http_pool import get_openai_embedding_client
+from crewx.rate_limiter import embedding_rate_limit
+from crewx.retry import is_rate_limit_error, parse_retry_after_seconds
+from crewx.token_budget import estimate_tokens
+
 
 def is_embedding_auth_error(exc: Exception) -> bool:
     message = str(exc).lower()
@@ -24,15 +33,203 @@ def cosine_similarity(a: Iterable[float], b: Iterable[float]) -> float:
     return dot / (norm_a * norm_b)
 
 
-def embed_texts(texts: list[str], settings) -> list[list[float]]:
+class SimilarityIndex:
+    """Row-normalized embedding matrix scored with one matrix-vector product per query.
+
+    History vectors are normalized once on construction; accepted candidates are appended
+    in place (amortized O(dim)), so checking a candidate against N vectors is a single
+    BLAS call instead of N Python-level cosine computations.
+    """
+
+    def __init__(self, vectors: Iterable[Sequence[float]] | None = None) -> None:
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+        for vector in vectors or []:
+            self.add(vector)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _unit(vector: Sequence[float]) -> np.ndarray | None:
+        arr = np.asarray(vector, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(arr))
+        if arr.size == 0 or norm == 0.0:
+            return None
+        return arr / norm
+
+    def add(self, vector: Sequence[float]) -> None:
+        unit = self._unit(vector)
+        if unit is None:
+            return
+        if self._size == 0:
+            self._matrix = np.empty((16, unit.size), dtype=np.float32)
+        elif unit.size != self._matrix.shape[1]:
+            # Mismatched dimensions never compare as similar (see cosine_similarity).
+            return
+        elif self._size == self._matrix.shape[0]:
+            grown = np.empty((self._size * 2, unit.size), dtype=np.float32)
+            grown[: self._size] = self._matrix[: self._size]
+            self._matrix = grown
+        self._matrix[self._size] = unit
+        self._size += 1
+
+    def max_similarity(self, vector: Sequence[float]) -> float:
+        unit = self._unit(vector)
+        if unit is None or self._size == 0 or unit.size != self._matrix.shape[1]:
+            return 0.0
+        return float(np.max(self._matrix[: self._size] @ unit))
+
+    def any_above(self, vector: Sequence[float], threshold: float) -> bool:
+        return self.max_similarity(vector) >= threshold
+
+
+LOCAL_MODEL_PREFIX = "local:"
+
+
+class EmbeddingBackend(Protocol):
+    def embed(self, texts: list[str]) -> list[list[float]]: ...
+
+
+class LiteLLMEmbeddingBackend:
+    """Provider embeddings via ``litellm.embedding`` against ``EMBEDDING_API_BASE``."""
+
+    def __init__(self, settings) -> None:
+        self.settings = settings
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return _request_embeddings(texts, self.settings)
+
+
+class HashedNgramEmbeddingBackend:
+    """Offline embeddings from signed, hashed character n-grams.
+
+    Each text is lowercased, whitespace-collapsed and padded; every UTF-8 byte n-gram is
+    hashed with CRC32 into one of ``dim`` buckets with a hash-derived sign, counts are
+    log-damped and the vector is L2-normalized. Output is deterministic across processes
+    and platforms, and needs no corpus statistics, so vectors stay valid in caches and
+    history indexes.
+    """
+
+    def __init__(self, dim: int = 512, ngram_range: tuple[int, int] = (3, 5)) -> None:
+        if dim <= 0:
+            raise ValueError("Embedding dimension must be positive")
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _features(self, text: str) -> list[int]:
+        padded = f" {' '.join((text or '').lower().split())} ".encode()
+        crc32 = zlib.crc32
+        lo, hi = self.ngram_range
+        return [
+            crc32(padded[i : i + n]) for n in range(lo, hi + 1) for i in range(len(padded) - n + 1)
+        ]
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        per_text = [self._features(text) for text in texts]
+        lengths = np.fromiter((len(f) for f in per_text), dtype=np.int64, count=len(texts))
+        hashed = np.fromiter(
+            (h for features in per_text for h in features), dtype=np.uint32, count=lengths.sum()
+        )
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        buckets = rows * self.dim + (hashed % self.dim)
+        signs = np.where(hashed & 0x80000000, -1.0, 1.0)
+        counts = np.bincount(buckets, weights=signs, minlength=len(texts) * self.dim)
+        matrix = counts.reshape(len(texts), self.dim)
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+        return matrix.astype(np.float32).tolist()
+
+
+def _hashed_ngram_backend(dim: int | None) -> EmbeddingBackend:
+    return HashedNgramEmbeddingBackend(dim=dim or 512)
+
+
+_LOCAL_BACKENDS: dict[str, Callable[[int | None], EmbeddingBackend]] = {
+    "ngram": _hashed_ngram_backend,
+}
+
+
+def register_local_embedding_backend(
+    name: str, factory: Callable[[int | None], EmbeddingBackend]
+) -> None:
+    """Make ``EMBEDDING_MODEL_NAME=local:<name>[-<dim>]`` resolve to ``factory(dim)``."""
+    _LOCAL_BACKENDS[name] = factory
+
+
+def is_local_embedding_model(model_name: str | None) -> bool:
+    return bool(model_name) and str(model_name).startswith(LOCAL_MODEL_PREFIX)
+
+
+def get_embedding_backend(settings) -> EmbeddingBackend:
+    model_name = settings.embedding_model_name or ""
+    if not is_local_embedding_model(model_name):
+        return LiteLLMEmbeddingBackend(settings)
+    spec = model_name[len(LOCAL_MODEL_PREFIX) :].strip()
+    name, _, dim_raw = spec.partition("-")
+    factory = _LOCAL_BACKENDS.get(name or "ngram")
+    if factory is None:
+        raise ValueError(f"Unknown local embedding backend: {model_name}")
+    try:
+        dim = int(dim_raw) if dim_raw else None
+    except ValueError as exc:
+        raise ValueError(f"Invalid local embedding dimension: {model_name}") from exc
+    return factory(dim)
+
+
+def embed_texts(texts: list[str], settings, *, store: bool = True) -> list[list[float]]:
+    """Embed ``texts`` in order, sending only cache misses to the provider.
+
+    ``store=False`` still reads the cache but does not keep the fetched vectors, for
+    one-off texts that will not be looked up again.
+    """
     if not texts or not settings.embedding_model_name:
         raise ValueError("Embedding disabled or empty input")
-    response = litellm_embedding(
-        model=settings.embedding_model_name,
-        input=texts,
-        api_key=settings.embedding_api_key or settings.openai_api_key,
-        base_url=settings.embedding_api_base or settings.openai_api_base,
-    )
+    backend = get_embedding_backend(settings)
+    cache = get_embedding_cache(settings)
+    if cache is None or is_local_embedding_model(settings.embedding_model_name):
+        # Local backends are cheaper to recompute than to look up.
+        return backend.embed(texts)
+
+    cached = cache.get_many(texts)
+    missing = list(dict.fromkeys(t for t, emb in zip(texts, cached, strict=True) if emb is None))
+    by_text: dict[str, list[float]] = {}
+    if missing:
+        fetched = backend.embed(missing)
+        if len(fetched) != len(missing):
+            raise ValueError("Embedding count mismatch")
+        if store:
+            cache.put_many(missing, fetched)
+        by_text = dict(zip(missing, fetched, strict=True))
+    cache.save()
+    return [
+        by_text[text] if emb is None else [float(v) for v in emb]
+        for text, emb in zip(texts, cached, strict=True)
+    ]
+
+
+def _request_embeddings(texts: list[str], settings) -> list[list[float]]:
+    rate_limit = embedding_rate_limit(settings)
+    if rate_limit is not None:
+        rate_limit.acquire(tokens=sum(estimate_tokens(text) for text in texts))
+    model = settings.embedding_model_name
+    api_key = settings.embedding_api_key or settings.openai_api_key
+    api_base = settings.embedding_api_base or settings.openai_api_base
+    kwargs: dict = {}
+    # litellm only reuses a passed-in client for the OpenAI-compatible provider.
+    if "/" not in model or model.startswith("openai/"):
+        client = get_openai_embedding_client(settings, api_key=api_key, base_url=api_base or None)
+        if client is not None:
+            kwargs["client"] = client
+    try:
+        response = litellm_embedding(
+            model=model, input=texts, api_key=api_key, api_base=api_base, **kwargs
+        )
+    except Exception as exc:
+        if rate_limit is not None and is_rate_limit_error(exc):
+            rate_limit.penalize(parse_retry_after_seconds(str(exc)))
+        raise
 
     if isinstance(response, dict) and response.get("error"):
         raise ValueError(f"Embedding error: {response.get('error')}")
@@ -70,8 +267,10 @@ def embed_texts(texts: list[str], settings) -> list[list[float]]:
     return embeddings
 
 
-def build_embedding_map(texts: list[str], settings) -> dict[str, list[float]]:
-    embeddings = embed_texts(texts, settings)
+def build_embedding_map(
+    texts: list[str], settings, *, store: bool = True
+) -> dict[str, list[float]]:
+    embeddings = embed_texts(texts, settings, store=store)
     if len(embeddings) != len(texts):
         raise ValueError("Embedding count mismatch")
     mapping: dict[str, list[float]] = {}
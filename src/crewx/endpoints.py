@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+
+from crewai.llms.base_llm import BaseLLM
+from pydantic import PrivateAttr
+
+from crewx.delegating_llm import DelegatingLLM
+from crewx.retry import is_connection_error
+
+DEFAULT_ENDPOINT_COOLDOWN = 60.0
+
+_SERVER_ERROR_MARKERS = (
+    "internal server error",
+    "bad gateway",
+    "service unavailable",
+    "gateway timeout",
+    "error code: 500",
+    "error code: 502",
+    "error code: 503",
+    "error code: 504",
+)
+
+
+def is_endpoint_failure(exc: Exception) -> bool:
+    """Errors that say the endpoint is down rather than that the request was bad."""
+    message = str(exc).lower()
+    return is_connection_error(exc) or any(marker in message for marker in _SERVER_ERROR_MARKERS)
+
+
+class EndpointHealth:
+    """Remembers failing base URLs and keeps them out of rotation for ``cooldown`` seconds."""
+
+    def __init__(
+        self,
+        *,
+        cooldown: float = DEFAULT_ENDPOINT_COOLDOWN,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        self.cooldown = cooldown
+        self._clock = clock or time.monotonic
+        self._lock = threading.Lock()
+        self._down_until: dict[str, float] = {}
+        self.failovers = 0
+
+    def order(self, endpoints: list[str]) -> list[str]:
+        """Healthy endpoints in configured order, then cooling ones by soonest recovery."""
+        now = self._clock()
+        with self._lock:
+            healthy = [e for e in endpoints if self._down_until.get(e, 0.0) <= now]
+            cooling = sorted(
+                (e for e in endpoints if e not in healthy), key=lambda e: self._down_until[e]
+            )
+        return healthy + cooling
+
+    def mark_down(self, endpoint: str) -> None:
+        with self._lock:
+            self._down_until[endpoint] = self._clock() + self.cooldown
+
+    def mark_up(self, endpoint: str) -> None:
+        with self._lock:
+            self._down_until.pop(endpoint, None)
+
+    def is_down(self, endpoint: str) -> bool:
+        with self._lock:
+            return self._down_until.get(endpoint, 0.0) > self._clock()
+
+    def record_failover(self) -> None:
+        with self._lock:
+            self.failovers += 1
+
+
+class FailoverLLM(DelegatingLLM):
+    """Tries the same completion against an ordered list of endpoints.
+
+    ``clients`` holds one LLM per base URL in ``endpoints``. An endpoint that fails with a
+    connection or server error is marked down in the shared ``EndpointHealth`` and the next
+    one is tried; every other error (rate limits, bad requests) is raised unchanged.
+    """
+
+    endpoints: list[str]
+    clients: list[BaseLLM]
+    _health: EndpointHealth = PrivateAttr()
+
+    def __init__(
+        self, *, endpoints: list[str], clients: list[BaseLLM], health: EndpointHealth
+    ) -> None:
+        super().__init__(inner=clients[0], endpoints=endpoints, clients=clients)
+        self._health = health
+
+    @property
+    def health(self) -> EndpointHealth:
+        return self._health
+
+    def call(self, messages, **kwargs):
+        by_endpoint: dict[str, BaseLLM] = dict(zip(self.endpoints, self.clients, strict=True))
+        last_exc: Exception | None = None
+        for i, endpoint in enumerate(self._health.order(self.endpoints)):
+            if i:
+                self._health.record_failover()
+            try:
+                response = self._forward(by_endpoint[endpoint], messages, kwargs)
+            except Exception as exc:
+                if not is_endpoint_failure(exc):
+                    raise
+                self._health.mark_down(endpoint)
+                last_exc = exc
+                continue
+            self._health.mark_up(endpoint)
+            return response
+        raise last_exc
+
+
+_health: dict[float, EndpointHealth] = {}
+_health_lock = threading.Lock()
+
+
+def get_endpoint_health(settings) -> EndpointHealth:
+    """Process-wide health tracker, so every crew and sub-crew skips the same dead endpoints."""
+    cooldown = getattr(settings, "endpoint_cooldown_seconds", DEFAULT_ENDPOINT_COOLDOWN)
+    with _health_lock:
+        health = _health.get(cooldown)
+        if health is None:
+            health = EndpointHealth(cooldown=cooldown)
+            _health[cooldown] = health
+    return health
+
+
+def chat_endpoints(settings) -> list[str]:
+    """``OPENAI_API_BASE`` followed by the ``OPENAI_API_BASES`` fallbacks, without repeats."""
+    endpoints: list[str] = []
+    for endpoint in (settings.openai_api_base, *getattr(settings, "openai_api_bases", ())):
+        if endpoint and endpoint not in endpoints:
+            endpoints.append(endpoint)
+    return endpoints
@@ -19,3 +19,15 @@ class NoTweetsGeneratedError(CrewXError):
 
 class RateLimitError(CrewXError):
     """Rate limit encountered and no fallback succeeded."""
+
+
+class LLMCacheMissError(CrewXError):
+    """Replay mode found no cached response for an LLM request."""
+
+
+class DeadlineExceededError(CrewXError):
+    """The run's wall-clock budget (``--max-wall-time``) ran out."""
+
+
+class CircuitOpenError(CrewXError):
+    """Too many consecutive connection errors; the provider is treated as down."""
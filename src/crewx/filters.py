@@ -2,20 +2,22 @@ from __future__ import annotations
 
 from typing import Any
 
-from crewx.embeddings import cosine_similarity
+from crewx.ann_index import HistoryAnnIndex
+from crewx.embeddings import SimilarityIndex
 from crewx.rules import (
     BUCKET_HISTORY_MAX,
-    BUCKET_HISTORY_WINDOW,
-    DOCUMENT_PATTERNS,
+    HASHTAG_PATTERN,
     KEYWORD_HISTORY_LIMITS,
     KEYWORD_QUOTAS,
+    MAX_HASHTAGS,
+    MAX_TWEET_CHARS,
     MAX_TYPES_PER_BATCH,
-    TIP_LANGUAGE,
-    TOPIC_KEYWORDS,
+    REVIEW_BANNED_OPENING_PATTERN,
+    REVIEW_BANNED_WORDING_PATTERN,
+    GroupCounter,
+    HistoryFeatureIndex,
     bucket_matches_text,
     contains_brand_or_cta,
-    count_keyword_hits,
-    count_recent_bucket_hits,
     extract_bucket,
     has_concrete_detail,
     has_hashtag,
@@ -23,6 +25,7 @@ from crewx.rules import (
     infer_opening_style,
     is_allowed_bucket,
     is_doc_tip,
+    text_features,
     violates_hard_rules,
 )
 
@@ -97,6 +100,42 @@ def accept_relaxed_candidate(
     return True
 
 
+def review_problems(t: dict) -> list[str]:
+    """Reviewer rules that can be checked locally; an empty list means the tweet passes."""
+    text = (t.get("text") or "").strip()
+    tweet_type = (t.get("tweet_type") or "").strip().lower()
+    problems: list[str] = []
+    if not text:
+        return ["empty"]
+    if len(text) > MAX_TWEET_CHARS:
+        problems.append(f"longer than {MAX_TWEET_CHARS} characters")
+    hashtags = len(HASHTAG_PATTERN.findall(text))
+    if hashtags and tweet_type != "marketing":
+        problems.append("hashtag outside a marketing tweet")
+    elif hashtags > MAX_HASHTAGS:
+        problems.append(f"more than {MAX_HASHTAGS} hashtags")
+    if REVIEW_BANNED_OPENING_PATTERN.search(text):
+        problems.append("banned opening")
+    if REVIEW_BANNED_WORDING_PATTERN.search(text):
+        problems.append("checklist/steps wording")
+    if violates_hard_rules(text):
+        problems.append("forbidden claim or phrase")
+    return problems
+
+
+def prescreen_candidates(tweets: list[dict]) -> tuple[list[dict], list[tuple[dict, list[str]]]]:
+    """Split candidates into those passing the local review checks and those that need fixing."""
+    passed: list[dict] = []
+    failing: list[tuple[dict, list[str]]] = []
+    for t in tweets:
+        problems = review_problems(t)
+        if not problems:
+            passed.append(t)
+        elif problems != ["empty"]:
+            failing.append((t, problems))
+    return passed, failing
+
+
 def assign_missing_types(tweets: list[dict], required_types: list[str]) -> list[dict]:
     required_queue = [t.strip().lower() for t in required_types if t.strip()]
     if not required_queue:
@@ -124,15 +163,20 @@ def filter_crewai_tweets(
     embedding_threshold: float | None = None,
     recent_embeddings: list[list[float]] | None = None,
     candidate_embeddings: dict[str, list[float]] | None = None,
+    history_index: HistoryAnnIndex | None = None,
+    history_features: HistoryFeatureIndex | None = None,
 ) -> list[dict]:
     filtered: list[dict] = []
+    batch_counts = GroupCounter()
     type_counts: dict[str, int] = {}
     bucket_counts: dict[str, int] = {}
     brand_hits = 0
-    accepted_embeddings: list[list[float]] = []
-    recent_scope = recent_texts[:50] if recent_texts else []
-    recent_bucket_scope = recent_texts[:BUCKET_HISTORY_WINDOW] if recent_texts else []
-    doc_tip_recent_hits = count_keyword_hits(recent_scope, DOCUMENT_PATTERNS)
+    # History and accepted candidates share one pre-normalized matrix.
+    similarity_index = SimilarityIndex(recent_embeddings if embedding_threshold else None)
+    # Recent-window counts are built once (or passed in) so each check is a lookup.
+    if history_features is None:
+        history_features = HistoryFeatureIndex(recent_texts or [])
+    doc_tip_recent_hits = history_features.group_hits("document")
 
     for t in tweets:
         text = (t.get("text") or "").strip()
@@ -144,16 +188,16 @@ def filter_crewai_tweets(
             continue
 
         tags = _coerce_tags(t.get("tags"))
-        lower_text = text.lower()
-        if not any(k in lower_text for k in TOPIC_KEYWORDS):
+        features = text_features(text)
+        if not features.has("topic"):
             continue
 
         if tweet_type == "industry_insight":
-            if any(p in lower_text for p in TIP_LANGUAGE):
+            if features.has("tip"):
                 continue
 
         if tweet_type == "fun_fact":
-            if any(p in lower_text for p in TIP_LANGUAGE):
+            if features.has("tip"):
                 continue
 
         type_counts.setdefault(tweet_type, 0)
@@ -168,9 +212,7 @@ def filter_crewai_tweets(
                 continue
 
         if is_doc_tip(text):
-            doc_tip_batch_hits = count_keyword_hits(
-                [u.get("text", "") for u in filtered], DOCUMENT_PATTERNS
-            )
+            doc_tip_batch_hits = batch_counts.group_hits("document")
             if doc_tip_batch_hits >= 1 or doc_tip_recent_hits >= 1:
                 continue
 
@@ -189,7 +231,7 @@ def filter_crewai_tweets(
             continue
         if bucket_counts.get(bucket, 0) >= 1:
             continue
-        if count_recent_bucket_hits(recent_bucket_scope, bucket) >= BUCKET_HISTORY_MAX:
+        if history_features.bucket_hits(bucket) >= BUCKET_HISTORY_MAX:
             continue
 
         if has_hashtag(text) and tweet_type != "marketing":
@@ -203,44 +245,39 @@ def filter_crewai_tweets(
             brand_hits += 1
 
         keyword_blocked = False
-        for key, quota in KEYWORD_QUOTAS.items():
-            if not isinstance(quota, dict):
-                continue
-            needles = quota.get("needles")
-            max_per_batch = quota.get("max_per_batch")
-            if not isinstance(needles, list) or not isinstance(max_per_batch, int):
-                continue
-            needles = [str(n) for n in needles]
-            if any(n in text.lower() for n in needles):
-                batch_hits = count_keyword_hits([u.get("text", "") for u in filtered], needles)
-                recent_hits = count_keyword_hits(recent_scope, needles)
-                history_limit = KEYWORD_HISTORY_LIMITS.get(key)
-                if history_limit is not None and not isinstance(history_limit, int):
-                    history_limit = None
-                if batch_hits >= max_per_batch:
-                    keyword_blocked = True
-                    break
-                if history_limit is not None and recent_hits >= history_limit:
-                    keyword_blocked = True
-                    break
-                if history_limit is None and recent_hits >= max_per_batch:
-                    keyword_blocked = True
-                    break
+        for key in features.quotas:
+            max_per_batch = KEYWORD_QUOTAS[key]["max_per_batch"]
+            group = f"quota:{key}"
+            batch_hits = batch_counts.group_hits(group)
+            recent_hits = history_features.group_hits(group)
+            history_limit = KEYWORD_HISTORY_LIMITS.get(key)
+            if history_limit is not None and not isinstance(history_limit, int):
+                history_limit = None
+            if batch_hits >= max_per_batch:
+                keyword_blocked = True
+                break
+            if history_limit is not None and recent_hits >= history_limit:
+                keyword_blocked = True
+                break
+            if history_limit is None and recent_hits >= max_per_batch:
+                keyword_blocked = True
+                break
         if keyword_blocked:
             continue
 
         if embedding_threshold and candidate_embeddings:
             candidate_embedding = candidate_embeddings.get(text)
             if candidate_embedding:
-                pool = (recent_embeddings or []) + accepted_embeddings
-                if any(
-                    cosine_similarity(candidate_embedding, emb) >= embedding_threshold
-                    for emb in pool
+                if similarity_index.any_above(candidate_embedding, embedding_threshold):
+                    continue
+                if history_index is not None and history_index.any_above(
+                    candidate_embedding, embedding_threshold
                 ):
                     continue
-                accepted_embeddings.append(candidate_embedding)
+                similarity_index.add(candidate_embedding)
 
         filtered.append(t)
+        batch_counts.add(text)
         type_counts[tweet_type] += 1
         bucket_counts[bucket] = bucket_counts.get(bucket, 0) + 1
 
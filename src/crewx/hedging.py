@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any
+
+from crewai.llms.base_llm import BaseLLM
+from pydantic import PrivateAttr
+
+from crewx.delegating_llm import DelegatingLLM
+from crewx.rate_limiter import ModelRateLimit
+from crewx.retry import is_rate_limit_error, parse_retry_after_seconds
+from crewx.token_budget import request_tokens
+
+# Latencies kept for the percentile and how many are needed before it replaces the
+# configured initial delay.
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 5
+# Never hedge sooner than this, however fast the provider has been.
+MIN_HEDGE_DELAY = 0.05
+
+
+class HedgeTracker:
+    """Observed completion latencies and hedging counters shared by every hedged LLM."""
+
+    def __init__(self, *, percentile: float = 0.95, initial_delay: float = 5.0) -> None:
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.rate_limited = 0
+        self.latency_saved_seconds = 0.0
+
+    def record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary request before sending the duplicate."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return self.initial_delay
+        index = min(len(samples) - 1, math.ceil(self.percentile * len(samples)) - 1)
+        return max(MIN_HEDGE_DELAY, samples[max(0, index)])
+
+    def _add(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "hedge_calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "hedges_rate_limited": self.rate_limited,
+                "hedge_latency_saved_seconds": round(self.latency_saved_seconds, 3),
+            }
+
+
+class _TimedFuture(Future):
+    """Future that records when its call started and finished (monotonic seconds)."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.started = time.monotonic()
+        self.finished: float | None = None
+
+
+class HedgedLLM(DelegatingLLM):
+    """Sends a duplicate request when the primary is slower than the observed percentile.
+
+    The duplicate goes to ``secondary`` (a second client for the same or a fallback model)
+    and the first successful response wins. ``rate_limit`` holds the secondary model's
+    limits: the duplicate draws its own request and tokens from them, is skipped when none
+    are left right now, and a 429 on it blocks that model in the shared limiter.
+    HTTP calls cannot be interrupted, so the loser is abandoned on a daemon thread and its
+    response discarded; when it finishes, the time the winner saved is added to the tracker.
+    """
+
+    secondary: BaseLLM
+    _tracker: HedgeTracker = PrivateAttr()
+    _rate_limit: ModelRateLimit | None = PrivateAttr(default=None)
+
+    def __init__(
+        self,
+        *,
+        primary: BaseLLM,
+        secondary: BaseLLM,
+        tracker: HedgeTracker,
+        rate_limit: ModelRateLimit | None = None,
+    ) -> None:
+        super().__init__(inner=primary, secondary=secondary)
+        self._tracker = tracker
+        self._rate_limit = rate_limit
+
+    @property
+    def tracker(self) -> HedgeTracker:
+        return self._tracker
+
+    def _start(
+        self, llm: BaseLLM, messages, kwargs: dict, rate_limit: ModelRateLimit | None = None
+    ) -> _TimedFuture:
+        """Run ``llm.call`` on a daemon thread; the future carries its start/end times."""
+        future = _TimedFuture()
+        context = contextvars.copy_context()
+
+        def _run() -> None:
+            try:
+                # The copied context carries the caller's stop words into this thread.
+                result = self._forward(llm, messages, kwargs)
+            except BaseException as exc:
+                future.finished = time.monotonic()
+                if (
+                    rate_limit is not None
+                    and isinstance(exc, Exception)
+                    and is_rate_limit_error(exc)
+                ):
+                    rate_limit.penalize(parse_retry_after_seconds(str(exc)))
+                future.set_exception(exc)
+                return
+            future.finished = time.monotonic()
+            self._tracker.record_latency(future.finished - future.started)
+            future.set_result(result)
+
+        threading.Thread(target=context.run, args=(_run,), daemon=True).start()
+        return future
+
+    def call(self, messages, **kwargs):
+        self._tracker._add("calls")
+        primary = self._start(self.inner, messages, kwargs)
+        done, _ = wait([primary], timeout=self._tracker.hedge_delay())
+        if done:
+            return primary.result()
+        if self._rate_limit is not None and not self._rate_limit.try_acquire(
+            tokens=request_tokens(messages, self.secondary.max_tokens)
+        ):
+            self._tracker._add("rate_limited")
+            return primary.result()
+
+        self._tracker._add("hedged")
+        hedge = self._start(self.secondary, messages, kwargs, self._rate_limit)
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                if future is hedge and primary in pending:
+                    self._tracker._add("hedge_wins")
+                    primary.add_done_callback(
+                        lambda loser, winner=hedge: self._tracker._add(
+                            "latency_saved_seconds", max(0.0, loser.finished - winner.finished)
+                        )
+                    )
+                return future.result()
+        raise error
+
+
+_trackers: dict[tuple[float, float], HedgeTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_hedge_tracker(settings) -> HedgeTracker | None:
+    """Process-wide tracker for the configured percentile, or None when hedging is off."""
+    if not getattr(settings, "llm_hedging", False):
+        return None
+    key = (settings.llm_hedge_percentile, settings.llm_hedge_delay)
+    with _trackers_lock:
+        tracker = _trackers.get(key)
+        if tracker is None:
+            tracker = HedgeTracker(
+                percentile=settings.llm_hedge_percentile,
+                initial_delay=settings.llm_hedge_delay,
+            )
+            _trackers[key] = tracker
+    return tracker
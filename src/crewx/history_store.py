@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sqlite3
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Protocol
+
+from crewx.embedding_cache import text_key
+from crewx.io import (
+    READ_BLOCK_SIZE,
+    append_jsonl,
+    count_non_empty_lines,
+    ensure_dir,
+    list_output_tweet_texts,
+    list_recent_tweet_texts,
+    load_watermark,
+    save_watermark,
+)
+from crewx.rules import extract_bucket, infer_bucket_from_text
+
+HISTORY_BACKENDS = ("jsonl", "sqlite")
+JSONL_FILE = "history.jsonl"
+SQLITE_FILE = "history.sqlite3"
+HISTORY_REPAIR_SUFFIX = ".repair.json"
+MIGRATE_BATCH_SIZE = 5000
+
+
+class HistoryStore(Protocol):
+    """The history reads and writes a pipeline run makes."""
+
+    path: Path
+
+    def append(self, entries: Iterable[dict[str, Any]]) -> None: ...
+
+    def recent_texts(self, limit: int) -> list[str]: ...
+
+    def count(self) -> int: ...
+
+    def fix_unknown_types(self, fallback_type: str, *, full: bool = False) -> int: ...
+
+    def is_valid_cursor(self, cursor: int) -> bool: ...
+
+    def iter_texts_after(self, cursor: int) -> Iterator[tuple[int, str]]: ...
+
+    def close(self) -> None: ...
+
+
+def _copy_bytes(src, dst, length: int) -> None:
+    while length > 0:
+        chunk = src.read(min(length, READ_BLOCK_SIZE))
+        if not chunk:
+            break
+        dst.write(chunk)
+        length -= len(chunk)
+
+
+def fix_history_unknown_types(
+    out_dir: str, fallback_type: str = "educational", *, full: bool = False
+) -> int:
+    """Replace ``tweet_type=unknown`` in history lines appended since the last check.
+
+    A ``history.jsonl.repair.json`` watermark records how far the file has been checked,
+    so a clean history costs one short read. Fixes are written to a temp file that is
+    renamed over the original; every other line is copied byte for byte. ``full=True``
+    rechecks the whole file.
+    """
+    history_path = Path(out_dir) / JSONL_FILE
+    if not history_path.exists():
+        return 0
+    state = {} if full else load_watermark(history_path, HISTORY_REPAIR_SUFFIX)
+    offset = int(state.get("offset", 0))
+
+    fixes: list[tuple[int, int, bytes]] = []
+    with history_path.open("rb") as handle:
+        handle.seek(offset)
+        for raw_line in handle:
+            if not raw_line.endswith(b"\n"):
+                # Partially written last line; check it on the next run.
+                break
+            start = offset
+            offset += len(raw_line)
+            if b"unknown" not in raw_line.lower():
+                continue
+            try:
+                data = json.loads(raw_line)
+            except Exception:
+                continue
+            if not isinstance(data, dict):
+                continue
+            t = str(data.get("tweet_type") or "").strip().lower()
+            if t == "unknown":
+                data["tweet_type"] = fallback_type
+                fixed = (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+                fixes.append((start, len(raw_line), fixed))
+
+    if fixes:
+        tmp_path = history_path.with_name(f"{history_path.name}.{os.getpid()}.tmp")
+        with history_path.open("rb") as src, tmp_path.open("wb") as dst:
+            cursor = 0
+            for start, length, fixed in fixes:
+                _copy_bytes(src, dst, start - cursor)
+                dst.write(fixed)
+                cursor = start + length
+                src.seek(cursor)
+            # Copy the rest, including anything appended since the scan.
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, history_path)
+        offset += sum(len(fixed) - length for _, length, fixed in fixes)
+
+    save_watermark(history_path, HISTORY_REPAIR_SUFFIX, {"offset": offset})
+    return len(fixes)
+
+
+def _is_line_start(path: Path, offset: int) -> bool:
+    if offset == 0:
+        return True
+    if not path.exists() or offset > path.stat().st_size:
+        return False
+    with path.open("rb") as handle:
+        handle.seek(offset - 1)
+        return handle.read(1) == b"\n"
+
+
+def _iter_jsonl_after(
+    path: Path, offset: int
+) -> Iterator[tuple[int, dict[str, Any] | None, bytes]]:
+    """Yield ``(offset after the line, parsed object or None, raw line)`` for complete lines."""
+    if not path.exists():
+        return
+    with path.open("rb") as handle:
+        handle.seek(offset)
+        for raw_line in handle:
+            if not raw_line.endswith(b"\n"):
+                # Partially written last line; pick it up next time.
+                break
+            offset += len(raw_line)
+            try:
+                data = json.loads(raw_line)
+            except Exception:
+                data = None
+            yield offset, (data if isinstance(data, dict) else None), raw_line
+
+
+class JsonlHistoryStore:
+    """``out_dir/history.jsonl``: one JSON object per line, newest last.
+
+    Cursors are byte offsets just past a newline.
+    """
+
+    def __init__(self, out_dir: str | Path) -> None:
+        self.out_dir = Path(out_dir)
+        self.path = self.out_dir / JSONL_FILE
+
+    @classmethod
+    def for_path(cls, path: str | Path) -> JsonlHistoryStore:
+        store = cls(Path(path).parent)
+        store.path = Path(path)
+        return store
+
+    def append(self, entries: Iterable[dict[str, Any]]) -> None:
+        for entry in entries:
+            append_jsonl(self.path, entry)
+
+    def recent_texts(self, limit: int) -> list[str]:
+        return list_recent_tweet_texts(str(self.out_dir), limit=limit)
+
+    def count(self) -> int:
+        return count_non_empty_lines(self.path)
+
+    def fix_unknown_types(self, fallback_type: str, *, full: bool = False) -> int:
+        return fix_history_unknown_types(str(self.out_dir), fallback_type, full=full)
+
+    def is_valid_cursor(self, cursor: int) -> bool:
+        return _is_line_start(self.path, cursor)
+
+    def iter_texts_after(self, cursor: int) -> Iterator[tuple[int, str]]:
+        """Yield ``(cursor after the line, text)`` for each complete line past ``cursor``.
+
+        Lines without a text still advance the cursor and are yielded with ``""``.
+        """
+        for offset, data, _ in _iter_jsonl_after(self.path, cursor):
+            yield offset, (str(data.get("text") or "").strip() if data else "")
+
+    def close(self) -> None:
+        pass
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT,
+    tweet_type TEXT,
+    bucket TEXT,
+    opening_style TEXT,
+    text TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO history_meta (key, value) VALUES ('count', 0), ('jsonl_offset', 0);
+"""
+_SQLITE_INDEXES = ("created_at", "tweet_type", "bucket", "opening_style", "text_hash")
+
+
+def _history_row(
+    entry: dict[str, Any], created_at: str | None, raw: str | None = None
+) -> tuple[Any, ...]:
+    text = str(entry.get("text") or "").strip()
+    tags = entry.get("tags") if isinstance(entry.get("tags"), list) else []
+    return (
+        entry.get("created_at") or entry.get("timestamp") or created_at,
+        str(entry.get("tweet_type") or "").strip().lower() or None,
+        extract_bucket(text, tags) or infer_bucket_from_text(text),
+        str(entry.get("opening_style") or "").strip().lower() or None,
+        text,
+        text_key(text),
+        raw if raw is not None else json.dumps(entry, ensure_ascii=False),
+    )
+
+
+class SqliteHistoryStore:
+    """History in ``out_dir/history.sqlite3`` (WAL mode).
+
+    ``created_at``, ``tweet_type``, ``bucket``, ``opening_style`` and ``text_hash`` are
+    indexed columns next to the original entry as JSON. The row count is kept in
+    ``history_meta`` next to every insert so ``count`` never scans. Cursors are row ids.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        ensure_dir(self.path.parent)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(_SQLITE_SCHEMA)
+            self._create_indexes()
+
+    def _create_indexes(self) -> None:
+        for column in _SQLITE_INDEXES:
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS history_{column} ON history ({column})")
+
+    def _meta(self, key: str) -> int:
+        row = self._conn.execute("SELECT value FROM history_meta WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def _insert_rows(self, rows: list[tuple[Any, ...]], *, jsonl_offset: int | None = None) -> int:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO history (created_at, tweet_type, bucket, opening_style, text,"
+                " text_hash, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute(
+                "UPDATE history_meta SET value = value + ? WHERE key = 'count'", (len(rows),)
+            )
+            if jsonl_offset is not None:
+                self._conn.execute(
+                    "UPDATE history_meta SET value = ? WHERE key = 'jsonl_offset'",
+                    (jsonl_offset,),
+                )
+        return len(rows)
+
+    def append(self, entries: Iterable[dict[str, Any]]) -> None:
+        created_at = datetime.now().isoformat(timespec="seconds")
+        self._insert_rows([_history_row(entry, created_at) for entry in entries])
+
+    def recent_texts(self, limit: int) -> list[str]:
+        texts = [
+            row[0]
+            for row in self._conn.execute(
+                "SELECT text FROM history WHERE text != '' ORDER BY id DESC LIMIT ?", (limit,)
+            )
+        ]
+        if len(texts) >= limit:
+            return texts
+        return texts + list_output_tweet_texts(str(self.path.parent), limit=limit - len(texts))
+
+    def count(self) -> int:
+        return self._meta("count")
+
+    def fix_unknown_types(self, fallback_type: str, *, full: bool = False) -> int:
+        # ``tweet_type`` is indexed, so a clean history costs one index probe.
+        with self._conn:
+            cursor = self._conn.execute(
+                "UPDATE history SET tweet_type = ?, data = json_set(data, '$.tweet_type', ?)"
+                " WHERE tweet_type = 'unknown'",
+                (fallback_type.strip().lower(), fallback_type),
+            )
+        return cursor.rowcount
+
+    def is_valid_cursor(self, cursor: int) -> bool:
+        row = self._conn.execute("SELECT MAX(id) FROM history").fetchone()
+        return cursor <= int(row[0] or 0)
+
+    def iter_texts_after(self, cursor: int) -> Iterator[tuple[int, str]]:
+        rows = self._conn.execute(
+            "SELECT id, text FROM history WHERE id > ? ORDER BY id", (cursor,)
+        )
+        for row_id, text in rows:
+            yield int(row_id), text
+
+    def migrate_from_jsonl(self, jsonl_path: str | Path) -> int:
+        """Import ``history.jsonl`` lines not imported yet. Returns rows added.
+
+        The byte offset reached is stored in ``history_meta``, so rerunning after more
+        lines were appended only imports the new ones. If the file was rewritten under
+        that offset it is read again from the start, skipping texts already stored.
+        """
+        path = Path(jsonl_path)
+        offset = self._meta("jsonl_offset")
+        skip_existing = not _is_line_start(path, offset)
+        if skip_existing:
+            offset = 0
+        known: set[str] = set()
+        if skip_existing:
+            known = {row[0] for row in self._conn.execute("SELECT text_hash FROM history")}
+
+        bulk = self.count() == 0
+        if bulk:
+            # Filling an empty table: build the secondary indexes once at the end.
+            with self._conn:
+                for column in _SQLITE_INDEXES:
+                    self._conn.execute(f"DROP INDEX IF EXISTS history_{column}")
+
+        added = 0
+        batch: list[tuple[Any, ...]] = []
+        for position, data, raw in _iter_jsonl_after(path, offset):
+            offset = position
+            if data is not None:
+                row = _history_row(data, None, raw.decode("utf-8", errors="replace").rstrip())
+                if row[5] not in known:
+                    batch.append(row)
+            if len(batch) >= MIGRATE_BATCH_SIZE:
+                added += self._insert_rows(batch, jsonl_offset=offset)
+                batch = []
+        added += self._insert_rows(batch, jsonl_offset=offset)
+        if bulk:
+            with self._conn:
+                self._create_indexes()
+        return added
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_history_store(settings, out_dir: str | None = None) -> HistoryStore:
+    """Open the configured history backend, migrating ``history.jsonl`` into a new SQLite store."""
+    out_dir = out_dir or settings.out_dir
+    backend = getattr(settings, "history_backend", "jsonl")
+    if backend == "sqlite":
+        store = SqliteHistoryStore(Path(out_dir) / SQLITE_FILE)
+        jsonl_path = Path(out_dir) / JSONL_FILE
+        if store.count() == 0 and jsonl_path.exists():
+            store.migrate_from_jsonl(jsonl_path)
+        return store
+    return JsonlHistoryStore(out_dir)
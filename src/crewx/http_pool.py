@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import importlib.util
+import threading
+from typing import Any
+
+import httpx
+from crewai.llms.base_llm import BaseLLM
+from crewai.llms.providers.openai.completion import OpenAICompletion
+from openai import OpenAI
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class ConnectionStats:
+    """Counts requests and new connections through httpcore's ``trace`` extension.
+
+    httpcore only reports ``connection.connect_tcp`` when it opens a socket, so every
+    other request rode on a pooled keep-alive connection.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+
+    def _trace(self, event_name: str, info: dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections_opened += 1
+        elif event_name == "connection.start_tls.complete":
+            with self._lock:
+                self.tls_handshakes += 1
+
+    def on_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "http_requests": self.requests,
+                "http_connections_opened": self.connections_opened,
+                "http_connections_reused": max(0, self.requests - self.connections_opened),
+                "http_tls_handshakes": self.tls_handshakes,
+            }
+
+
+class SharedHTTPClient(httpx.Client):
+    """Process-wide keep-alive pool; SDK clients that try to close it leave it open."""
+
+    def __init__(self, *, connection_stats: ConnectionStats, **kwargs: Any) -> None:
+        self.connection_stats = connection_stats
+        super().__init__(event_hooks={"request": [connection_stats.on_request]}, **kwargs)
+
+    def close(self) -> None:
+        return
+
+
+def build_http_client(settings) -> SharedHTTPClient:
+    return SharedHTTPClient(
+        connection_stats=ConnectionStats(),
+        http2=settings.http2 and HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=settings.http_pool_size,
+            max_keepalive_connections=settings.http_pool_size,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(settings.http_timeout, connect=settings.http_connect_timeout),
+    )
+
+
+_clients: dict[tuple, SharedHTTPClient] = {}
+_embedding_clients: dict[tuple, OpenAI] = {}
+_clients_lock = threading.Lock()
+
+
+def _pool_key(settings) -> tuple:
+    return (
+        settings.http_pool_size,
+        settings.http_keepalive_expiry,
+        settings.http_timeout,
+        settings.http_connect_timeout,
+        settings.http2,
+    )
+
+
+def get_http_client(settings) -> SharedHTTPClient | None:
+    """The shared pooled client for completions and embeddings; None if ``HTTP_POOL_SIZE=0``."""
+    if getattr(settings, "http_pool_size", 0) <= 0:
+        return None
+    key = _pool_key(settings)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = build_http_client(settings)
+            _clients[key] = client
+    return client
+
+
+def http_pool_stats(settings) -> dict[str, int]:
+    client = get_http_client(settings)
+    return client.connection_stats.stats() if client is not None else {}
+
+
+def use_shared_http_client(llm: BaseLLM, settings) -> BaseLLM:
+    """Rebind an OpenAI-native LLM's sync SDK client onto the shared pool.
+
+    crewAI hands ``client_params`` to its sync and async clients alike, so the pooled
+    ``httpx.Client`` cannot go in that way; crews only use the sync client.
+    """
+    http_client = get_http_client(settings)
+    if http_client is None or not isinstance(llm, OpenAICompletion) or llm._client is None:
+        return llm
+    llm._client = OpenAI(**{**llm._get_client_params(), "http_client": http_client})
+    return llm
+
+
+def get_openai_embedding_client(settings, *, api_key: str, base_url: str | None) -> OpenAI | None:
+    """OpenAI SDK client on the shared pool, handed to litellm for OpenAI embedding models."""
+    http_client = get_http_client(settings)
+    if http_client is None:
+        return None
+    key = (_pool_key(settings), api_key, base_url)
+    with _clients_lock:
+        client = _embedding_clients.get(key)
+        if client is None:
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=http_client,
+                max_retries=0,
+                timeout=settings.http_timeout,
+            )
+            _embedding_clients[key] = client
+    return client
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+from collections.abc import Iterator
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+HISTORY_COUNT_SUFFIX = ".count.json"
+READ_BLOCK_SIZE = 1 << 16
+# Bytes before the counted offset that must be unchanged for the count to be reused.
+_COUNT_CHECK_BYTES = 4096
+
 
 def ensure_dir(path: str | Path) -> None:
     Path(path).mkdir(parents=True, exist_ok=True)
@@ -37,6 +45,98 @@ def now_timestamp() -> str:
     return datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
 
+def iter_lines_reversed(path: str | Path, *, block_size: int = READ_BLOCK_SIZE) -> Iterator[str]:
+    """Yield the lines of ``path`` newest-first, reading fixed-size blocks from the end."""
+    with Path(path).open("rb") as handle:
+        pos = handle.seek(0, os.SEEK_END)
+        remainder = b""
+        while pos > 0:
+            size = min(block_size, pos)
+            pos -= size
+            handle.seek(pos)
+            lines = (handle.read(size) + remainder).split(b"\n")
+            # The first piece may continue in the previous block.
+            remainder = lines[0]
+            for line in reversed(lines[1:]):
+                yield line.decode("utf-8", errors="replace")
+        yield remainder.decode("utf-8", errors="replace")
+
+
+def _count_non_empty(data: bytes) -> int:
+    return sum(1 for line in data.split(b"\n") if line.strip())
+
+
+def _check_digest(handle, offset: int) -> str:
+    start = max(0, offset - _COUNT_CHECK_BYTES)
+    handle.seek(start)
+    return hashlib.sha256(handle.read(offset - start)).hexdigest()
+
+
+def _watermark_path(path: Path, suffix: str) -> Path:
+    return path.with_name(path.name + suffix)
+
+
+def load_watermark(path: str | Path, suffix: str) -> dict[str, Any]:
+    """Sidecar state for ``path`` if its ``offset`` still marks unchanged bytes, else ``{}``.
+
+    The bytes just before the offset are compared against a stored digest, so a file that
+    was truncated or rewritten under the watermark is detected and processed from scratch.
+    """
+    p = Path(path)
+    try:
+        state: dict[str, Any] = json.loads(_watermark_path(p, suffix).read_text(encoding="utf-8"))
+        offset = int(state["offset"])
+        with p.open("rb") as handle:
+            size = handle.seek(0, os.SEEK_END)
+            if 0 < offset <= size and _check_digest(handle, offset) == state.get("check"):
+                return state
+    except Exception:
+        pass
+    return {}
+
+
+def save_watermark(path: str | Path, suffix: str, state: dict[str, Any]) -> None:
+    """Persist ``state`` (which must carry ``offset``) atomically; failures are ignored."""
+    p = Path(path)
+    sidecar = _watermark_path(p, suffix)
+    try:
+        with p.open("rb") as handle:
+            payload = {**state, "check": _check_digest(handle, int(state["offset"]))}
+        tmp_path = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp_path, sidecar)
+    except OSError:
+        pass
+
+
+def count_non_empty_lines(path: str | Path) -> int:
+    """Number of non-empty lines in ``path``, kept in a ``<name>.count.json`` sidecar.
+
+    The sidecar records how many non-empty lines precede a byte offset (always just past
+    a newline). Appends are counted from that offset onwards; a file rewritten under the
+    offset is recounted from scratch.
+    """
+    p = Path(path)
+    if not p.exists():
+        return 0
+    state = load_watermark(p, HISTORY_COUNT_SUFFIX)
+    offset = int(state.get("offset", 0))
+    lines = int(state.get("lines", 0))
+
+    with p.open("rb") as handle:
+        handle.seek(offset)
+        tail = handle.read()
+    complete, newline, partial = tail.rpartition(b"\n")
+    if newline:
+        lines += _count_non_empty(complete)
+        save_watermark(
+            p, HISTORY_COUNT_SUFFIX, {"offset": offset + len(complete) + 1, "lines": lines}
+        )
+
+    # A trailing line without its newline yet still counts, but is not persisted.
+    return lines + (1 if partial.strip() else 0)
+
+
 def list_recent_tweet_texts(out_dir: str, *, limit: int) -> list[str]:
     """
     Collect tweet texts from history.jsonl if present; fallback to newest JSON outputs.
@@ -51,9 +151,8 @@ def list_recent_tweet_texts(out_dir: str, *, limit: int) -> list[str]:
 
     if history_path.exists():
         try:
-            lines = history_path.read_text(encoding="utf-8").splitlines()
             # newest last; read from end
-            for line in reversed(lines):
+            for line in iter_lines_reversed(history_path):
                 if len(texts) >= limit:
                     break
                 if not line.strip():
@@ -70,9 +169,17 @@ def list_recent_tweet_texts(out_dir: str, *, limit: int) -> list[str]:
 
     if len(texts) >= limit:
         return texts
+    return texts + list_output_tweet_texts(out_dir, limit=limit - len(texts))
+
 
-    # fallback to tweets_*.json files (newest first)
-    json_files = sorted(p.glob("tweets_*.json"), key=lambda x: x.stat().st_mtime, reverse=True)
+def list_output_tweet_texts(out_dir: str, *, limit: int) -> list[str]:
+    """Tweet texts from ``tweets_*.json`` run outputs, newest file first."""
+    texts: list[str] = []
+    if limit <= 0:
+        return texts
+    json_files = sorted(
+        Path(out_dir).glob("tweets_*.json"), key=lambda x: x.stat().st_mtime, reverse=True
+    )
     for jf in json_files:
         if len(texts) >= limit:
             break
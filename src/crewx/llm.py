@@ -1,17 +1,110 @@
 from __future__ import annotations
 
 from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+from pydantic import PrivateAttr
 
 from crewx.config import Settings
+from crewx.delegating_llm import DelegatingLLM
+from crewx.endpoints import FailoverLLM, chat_endpoints, get_endpoint_health
+from crewx.hedging import HedgedLLM, get_hedge_tracker
+from crewx.http_pool import use_shared_http_client
+from crewx.llm_cache import CachedLLM, get_llm_cache
+from crewx.rate_limiter import ModelRateLimit, chat_rate_limit
+from crewx.retry import is_rate_limit_error, parse_retry_after_seconds
+from crewx.token_budget import DEFAULT_MAX_TOKENS, request_tokens
 
 
-def build_llm(settings: Settings) -> LLM:
-    return LLM(
-        model=settings.openai_model_name,
-        base_url=settings.openai_api_base,
-        api_key=settings.openai_api_key,
-        temperature=settings.temperature,
-        max_tokens=250,  # keep responses fast and small
-        timeout=60,
-        max_retries=0,
-    )
+class RateLimitedLLM(DelegatingLLM):
+    """Draws every completion from the shared limiter of the model it calls.
+
+    Each call first takes one request and its estimated tokens from ``rate_limit``; a 429
+    blocks that model for the provider's retry-after hint and is raised for the caller's
+    retry.
+    """
+
+    _rate_limit: ModelRateLimit = PrivateAttr()
+
+    def __init__(self, *, inner: BaseLLM, rate_limit: ModelRateLimit) -> None:
+        super().__init__(inner=inner)
+        self._rate_limit = rate_limit
+
+    @property
+    def rate_limit(self) -> ModelRateLimit:
+        return self._rate_limit
+
+    def call(self, messages, **kwargs):
+        self._rate_limit.acquire(tokens=request_tokens(messages, self.max_tokens))
+        try:
+            return self._forward(self.inner, messages, kwargs)
+        except Exception as exc:
+            if is_rate_limit_error(exc):
+                self._rate_limit.penalize(parse_retry_after_seconds(str(exc)))
+            raise
+
+
+def _completion_llm(
+    settings: Settings,
+    max_tokens: int | None,
+    *,
+    model: str,
+    endpoints: list[str],
+    api_key: str | None = None,
+) -> BaseLLM:
+    clients: list[BaseLLM] = [
+        use_shared_http_client(
+            LLM(
+                model=model,
+                base_url=endpoint,
+                api_key=api_key or settings.openai_api_key,
+                temperature=settings.temperature,
+                max_tokens=max_tokens or DEFAULT_MAX_TOKENS,
+                timeout=settings.http_timeout,
+                max_retries=0,
+            ),
+            settings,
+        )
+        for endpoint in endpoints
+    ]
+    if len(clients) == 1:
+        return clients[0]
+    return FailoverLLM(endpoints=endpoints, clients=clients, health=get_endpoint_health(settings))
+
+
+def build_llm(
+    settings: Settings, *, max_tokens: int | None = None, model: str | None = None
+) -> BaseLLM:
+    """Build the chat LLM; ``max_tokens`` comes from the token budget of the calling crew.
+
+    ``model`` overrides ``OPENAI_MODEL_NAME`` (per-role routing). With ``OPENAI_API_BASES``
+    set, calls fail over across the endpoints. With ``RATE_LIMIT_*`` set, every call draws
+    from the buckets of the model it goes to. With hedging on, slow calls are duplicated
+    to a second client (``LLM_HEDGE_*`` or the same endpoints); the response cache sits
+    outside so cache hits never hedge or wait for the limiter.
+    """
+    model = model or settings.openai_model_name
+    endpoints = chat_endpoints(settings) or [settings.openai_api_base]
+    llm = _completion_llm(settings, max_tokens, model=model, endpoints=endpoints)
+    rate_limit = chat_rate_limit(settings, model)
+    if rate_limit is not None:
+        llm = RateLimitedLLM(inner=llm, rate_limit=rate_limit)
+    tracker = get_hedge_tracker(settings)
+    if tracker is not None:
+        hedge_model = settings.llm_hedge_model or model
+        secondary = _completion_llm(
+            settings,
+            max_tokens,
+            model=hedge_model,
+            endpoints=[settings.llm_hedge_api_base] if settings.llm_hedge_api_base else endpoints,
+            api_key=settings.llm_hedge_api_key,
+        )
+        llm = HedgedLLM(
+            primary=llm,
+            secondary=secondary,
+            tracker=tracker,
+            rate_limit=chat_rate_limit(settings, hedge_model),
+        )
+    cache = get_llm_cache(settings)
+    if cache is None:
+        return llm
+    return CachedLLM(inner=llm, cache=cache, mode=settings.llm_cache_mode)
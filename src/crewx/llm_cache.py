@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any
+
+from crewai.llms.base_llm import BaseLLM
+from pydantic import PrivateAttr
+
+from crewx.delegating_llm import DelegatingLLM
+from crewx.errors import LLMCacheMissError
+from crewx.io import ensure_dir
+
+LLM_CACHE_MODES = ("passthrough", "record", "replay")
+LLM_CACHE_FILE = "llm_cache.sqlite3"
+
+
+def request_key(model: str, temperature: float | None, messages: Any) -> str:
+    """Cache key for one completion request: model, temperature and the full message list."""
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "messages": messages},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite store of zlib-compressed completions keyed by ``request_key``.
+
+    Entries older than ``ttl_seconds`` (0 = never) count as misses and are purged on the
+    next write; past ``max_entries`` the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self, path: str | Path, *, max_entries: int = 2000, ttl_seconds: float = 0
+    ) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        ensure_dir(self.path.parent)
+        self._lock = threading.Lock()
+        # Sub-crews and speculative ladder levels share one connection behind the lock.
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, created REAL NOT NULL, "
+            "last_used REAL NOT NULL, response BLOB NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+        )
+        self._conn.commit()
+
+    def _expired_before(self, now: float) -> float:
+        return now - self.ttl_seconds if self.ttl_seconds > 0 else float("-inf")
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created >= ?",
+                (key, self._expired_before(now)),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        blob = zlib.compress(response.encode("utf-8"), 6)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, created, last_used, response) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, now, now, blob),
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE created < ?", (self._expired_before(now),)
+            )
+            if self.max_entries > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                    "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedLLM(DelegatingLLM):
+    """Wraps a crewAI LLM with a response cache.
+
+    ``record`` answers from the cache and stores every live completion; ``replay`` never
+    calls the provider and raises ``LLMCacheMissError`` for unknown requests.
+    """
+
+    mode: str = "record"
+    _cache: LLMResponseCache = PrivateAttr()
+
+    def __init__(self, *, inner: BaseLLM, cache: LLMResponseCache, mode: str = "record") -> None:
+        super().__init__(inner=inner, mode=mode)
+        self._cache = cache
+
+    @property
+    def cache(self) -> LLMResponseCache:
+        return self._cache
+
+    def call(self, messages, **kwargs):
+        key = request_key(self.model, self.temperature, messages)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        if self.mode == "replay":
+            raise LLMCacheMissError(f"No cached LLM response for request {key[:12]} (replay mode)")
+        response = self._forward(self.inner, messages, kwargs)
+        if isinstance(response, str):
+            self._cache.put(key, self.model, response)
+        return response
+
+
+_caches: dict[str, LLMResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_cache(settings) -> LLMResponseCache | None:
+    """Return the process-wide response cache for ``settings.out_dir``, unless passthrough."""
+    if getattr(settings, "llm_cache_mode", "passthrough") == "passthrough":
+        return None
+    path = str(Path(settings.out_dir) / LLM_CACHE_FILE)
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = LLMResponseCache(
+                path,
+                max_entries=settings.llm_cache_max,
+                ttl_seconds=settings.llm_cache_ttl_seconds,
+            )
+            _caches[path] = cache
+    return cache
@@ -80,13 +80,104 @@ def parse_tweet_types_md(md: str) -> list[TweetType]:
     return types
 
 
-def _extract_first_json_object(raw: str) -> str | None:
-    """Best-effort: find first JSON object or array even if model prints extra text.
+_JSON_DECODER = json.JSONDecoder()
+_STRUCTURAL_CHARS = re.compile(r'[\[\]{}"\\]')
+_OPENER_FOR = {"]": "[", "}": "{"}
+
+
+def _scan_brackets(text: str) -> tuple[list[tuple[int, int]], list[int]]:
+    """Single pass over ``text`` returning balanced segments and still-open brackets.
+
+    Segments are ``(start, end)`` offsets sorted by start; the second list holds the offsets
+    of openers that were never closed (e.g. because the output was cut off). Quotes and
+    escapes are only tracked inside brackets, so stray quotes in the surrounding prose do not
+    derail the scan.
+    """
+    segments: list[tuple[int, int]] = []
+    stack: list[int] = []
+    in_string = False
+    escaped_pos = -1
+    for match in _STRUCTURAL_CHARS.finditer(text):
+        ch = match.group()
+        pos = match.start()
+        if in_string:
+            if pos == escaped_pos:
+                continue
+            if ch == "\\":
+                escaped_pos = pos + 1
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = bool(stack)
+        elif ch in "[{":
+            stack.append(pos)
+        elif ch in "]}" and stack:
+            start = stack.pop()
+            if text[start] != _OPENER_FOR[ch]:
+                # Mismatched closer: everything still open is prose, not JSON.
+                stack.clear()
+                continue
+            segments.append((start, pos + 1))
+    segments.sort()
+    return segments, stack
+
+
+def _opens_item_array(text: str, start: int) -> bool:
+    """True if the ``[`` at ``start`` is followed by an object or string element."""
+    pos = start + 1
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return text[start] == "[" and pos < len(text) and text[pos] in '{"'
+
+
+def _holds_tweets(value: Any) -> bool:
+    """True for a list of tweets or an object with a ``"tweets"`` list."""
+    return isinstance(value, list) or (
+        isinstance(value, dict) and isinstance(value.get("tweets"), list)
+    )
+
+
+def _decode_first_candidate(text: str, segments: list[tuple[int, int]]) -> tuple[str, Any] | None:
+    # Candidates are visited left to right and the first top-level value that holds tweets
+    # wins. A failed decode advances the watermark to the error offset and a decoded object
+    # advances it past its end, so every byte is decoded at most once and arrays nested
+    # inside a valid object are never mistaken for the answer.
+    # Decoding the segment slice (not the whole text) also keeps JSONDecodeError's
+    # line/column bookkeeping from rescanning everything before the candidate.
+    first_object: tuple[str, Any] | None = None
+    watermark = 0
+    for start, end in segments:
+        if start < watermark:
+            continue
+        segment = text[start:end]
+        try:
+            value, stop = _JSON_DECODER.raw_decode(segment)
+        except json.JSONDecodeError as exc:
+            watermark = start + max(exc.pos, 1)
+            continue
+        except RecursionError:
+            watermark = end
+            continue
+        if _holds_tweets(value):
+            return segment[:stop], value
+        if first_object is None:
+            first_object = (segment[:stop], value)
+        watermark = start + stop
+    return first_object
+
+
+def _extract_first_json_value(raw: str) -> tuple[str, Any] | None:
+    """Best-effort: find the first JSON array (or object) even if model prints extra text.
 
     Strategy:
     1) If the whole stripped string is valid JSON -> use it.
-    2) Otherwise, try to find the first valid JSON array "[...]".
-    3) If that fails, try to find the first valid JSON object "{...}".
+    2) Otherwise, decode bracket-balanced candidates left to right and return the first
+       valid top-level array "[...]" or object with a "tweets" list.
+    3) If there is none, return the first valid top-level object "{...}".
+
+    Runs in O(n): one structural scan plus one left-to-right decode sweep.
+    Returns the JSON text together with its decoded value.
     """
     if not raw:
         return None
@@ -98,40 +189,67 @@ def _extract_first_json_object(raw: str) -> str | None:
         raw_strip.startswith("[") and raw_strip.endswith("]")
     ):
         try:
-            json.loads(raw_strip)
-            return raw_strip
-        except json.JSONDecodeError:
+            value, stop = _JSON_DECODER.raw_decode(raw_strip)
+        except (json.JSONDecodeError, RecursionError):
             pass
+        else:
+            if stop == len(raw_strip):
+                return raw_strip, value
 
-    # Helper to scan for first valid JSON by delimiter
-    def _scan_for_valid_segment(text: str, open_char: str, close_char: str) -> str | None:
-        start = text.find(open_char)
-        if start == -1:
-            return None
-        for end in range(len(text) - 1, start, -1):
-            if text[end] != close_char:
-                continue
-            candidate = text[start : end + 1].strip()
-            try:
-                json.loads(candidate)
-            except json.JSONDecodeError:
-                continue
-            return candidate
-        return None
+    segments, unclosed = _scan_brackets(raw)
+    # An array of tweets that was cut off contains closed segments of its own (a complete
+    # tweet, its "tags" list); those are fields of the truncated answer, not the answer.
+    cutoff = next((start for start in unclosed if _opens_item_array(raw, start)), None)
+    if cutoff is not None:
+        segments = [segment for segment in segments if segment[0] < cutoff]
 
-    # 2) Prefer arrays if present
-    segment = _scan_for_valid_segment(raw, "[", "]")
-    if segment is not None:
-        return segment
+    # 2) Prefer values holding tweets, 3) fall back to any object
+    return _decode_first_candidate(raw, segments)
 
-    # 3) Fallback: try objects
-    segment = _scan_for_valid_segment(raw, "{", "}")
-    if segment is not None:
-        return segment
 
+def _salvage_truncated_array(raw: str) -> list[Any] | None:
+    """Return every fully closed element of a JSON array that was cut off mid-output.
+
+    Walks the array element by element with ``raw_decode`` and stops at the first element
+    that does not decode, so each byte is read once. Only arrays of objects or strings are
+    considered, which skips stray ``[`` in the surrounding prose without decoding it.
+    """
+    if not raw:
+        return None
+    _, unclosed = _scan_brackets(raw)
+    watermark = 0
+    for start in unclosed:
+        if start < watermark or not _opens_item_array(raw, start):
+            continue
+        items: list[Any] = []
+        pos = start + 1
+        while True:
+            while pos < len(raw) and raw[pos].isspace():
+                pos += 1
+            if pos >= len(raw) or raw[pos] not in '{"':
+                break
+            try:
+                value, pos = _JSON_DECODER.raw_decode(raw, pos)
+            except (json.JSONDecodeError, RecursionError):
+                break
+            items.append(value)
+            while pos < len(raw) and raw[pos].isspace():
+                pos += 1
+            if pos >= len(raw) or raw[pos] != ",":
+                break
+            pos += 1
+        if items:
+            return items
+        watermark = pos
     return None
 
 
+def _extract_first_json_object(raw: str) -> str | None:
+    """Best-effort: return the text of the first JSON array or object in ``raw``."""
+    found = _extract_first_json_value(raw)
+    return found[0] if found is not None else None
+
+
 def _normalize_tag(tag: str) -> str:
     t = tag.strip().lower()
     if t.startswith("#"):
@@ -147,31 +265,40 @@ def _normalize_tag(tag: str) -> str:
 
 
 def parse_tweets_response(
-    raw: str, *, n_tweets: int, default_tweet_type: str | None = None
+    raw: str,
+    *,
+    n_tweets: int,
+    default_tweet_type: str | None = None,
+    allow_truncated: bool = False,
 ) -> dict[str, Any]:
     """Parse model output into a normalized tweets structure.
 
-    Returns: {"tweets": [ {tweet_type,text,language,tags}, ... ] }
+    Returns: {"tweets": [ {tweet_type,text,language,tags}, ... ], "truncated": bool }
     Ensures at most n_tweets tweets, and normalizes fields.
+    With allow_truncated=True, an array that was cut off mid-output (e.g. by max_tokens)
+    yields its fully closed tweet objects and "truncated" is set to True.
     Raises ValueError on failure.
     """
-    json_str = _extract_first_json_object(raw)
-    if not json_str:
-        raise ValueError("No JSON object found in model output.")
-
-    try:
-        data = json.loads(json_str)
-    except json.JSONDecodeError as e:
-        # Give a slightly more helpful error including a snippet
-        snippet = json_str[:200].replace("\n", " ")
-        raise ValueError(f"Invalid JSON in model output: {e} | snippet: {snippet!r}") from e
+    found = _extract_first_json_value(raw)
+    # The extractor already decoded the segment; reuse the value instead of parsing twice.
+    data = found[1] if found is not None else None
 
     # Accept either a plain list of tweets OR an object with "tweets" key
+    tweets: Any = None
     if isinstance(data, list):
         tweets = data
-    else:
+    elif isinstance(data, dict):
         tweets = data.get("tweets")
 
+    truncated = False
+    if not isinstance(tweets, list) and allow_truncated:
+        salvaged = _salvage_truncated_array(raw)
+        if salvaged is not None:
+            tweets = salvaged
+            truncated = True
+
+    if found is None and not truncated:
+        raise ValueError("No JSON object found in model output.")
     if not isinstance(tweets, list):
         raise ValueError('JSON must be a list or contain key "tweets" as a list.')
 
@@ -224,4 +351,23 @@ def parse_tweets_response(
     if not norm:
         raise ValueError("Parsed JSON but no usable tweets were found.")
 
-    return {"tweets": norm[:n_tweets]}
+    return {"tweets": norm[:n_tweets], "truncated": truncated}
+
+
+def prepare_post_queue(tweets: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Local stand-in for the poster task: shape reviewed tweets for the queue.
+
+    Text and fields are kept as the reviewer returned them (already normalized by
+    ``parse_tweets_response``); tweets with an empty text and repeats of the same text are
+    dropped, as the poster prompt only ever passes approved tweets through.
+    """
+    queue: list[dict[str, Any]] = []
+    seen: set[str] = set()
+    for t in tweets:
+        text = str(t.get("text") or "").strip()
+        key = " ".join(text.lower().split())
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        queue.append({**t, "text": text})
+    return queue
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import re
 from textwrap import dedent
 
@@ -140,6 +141,30 @@ def build_review_prompt(*, n_tweets: int) -> str:
         """).strip()
 
 
+def build_fix_prompt(*, tweets: list[dict], problems: list[list[str]]) -> str:
+    items = "\n".join(
+        json.dumps({**t, "problems": p}, ensure_ascii=False)
+        for t, p in zip(tweets, problems, strict=True)
+    )
+    rules = dedent("""
+        You are a strict X (Twitter) compliance reviewer.
+        Each tweet below failed an automatic check; its "problems" say which.
+        Rewrite it to comply while keeping the meaning, tweet_type and tags, or drop it
+        if it cannot be fixed. Rules:
+        - Max 240 characters
+        - No hashtags unless tweet_type is marketing; max 2 hashtags
+        - No legal advice or guarantees
+        - HARD BAN: 3-hour thresholds ("3 Stunden", "über 3", "ab 3", "3h")
+        - HARD BAN: EU start/landing claims ("ab Start/Landung in der EU", "EU-Airlines")
+
+        Output MUST be a JSON array only, without the "problems" field:
+        [{"tweet_type": "...", "opening_style": "...", "text": "...", "language": "de", "tags": ["..."]}]
+
+        TWEETS:
+        """).strip()
+    return f"{rules}\n{items}"
+
+
 def build_quality_prompt(*, n_tweets: int) -> str:
     return dedent(f"""
         You are a quality reviewer for German tweets.
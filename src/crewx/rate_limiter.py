@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from crewx.io import ensure_dir
+
+RATE_LIMIT_FILE = "rate_limit.sqlite3"
+# Wait after a 429 that carried no "try again in" hint.
+DEFAULT_PENALTY_SECONDS = 60.0
+
+
+class RateLimiter:
+    """Token buckets for requests and tokens per minute, shared through SQLite.
+
+    Every process pointing at the same file (e.g. cron-launched runs sharing ``out_dir``)
+    draws from the same buckets, one row per model. Each bucket holds at most one minute
+    of allowance and refills continuously; ``acquire`` sleeps exactly until enough has
+    refilled. A 429 drains the model's buckets and blocks it until the provider's
+    ``retry after`` hint has passed.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.path = Path(path)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+        ensure_dir(self.path.parent)
+        # Autocommit mode so BEGIN IMMEDIATE takes the cross-process write lock explicitly.
+        self._conn = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "model TEXT PRIMARY KEY, requests REAL NOT NULL, tokens REAL NOT NULL, "
+            "updated REAL NOT NULL, blocked_until REAL NOT NULL DEFAULT 0)"
+        )
+
+    def _reserve(self, model: str, rpm: int, tpm: int, requests: int, tokens: int) -> float:
+        """Take the allowance if it is there and return 0, else return how long to wait."""
+        now = self._clock()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT requests, tokens, updated, blocked_until FROM buckets WHERE model = ?",
+                    (model,),
+                ).fetchone()
+                if row is None:
+                    row = (float(rpm), float(tpm), now, 0.0)
+                have_requests, have_tokens, updated, blocked_until = row
+                elapsed = max(0.0, now - updated)
+                have_requests = min(float(rpm), have_requests + elapsed * rpm / 60.0)
+                have_tokens = min(float(tpm), have_tokens + elapsed * tpm / 60.0)
+                # A single call larger than a minute's allowance waits for a full bucket.
+                need_requests = min(float(requests), float(rpm)) if rpm > 0 else 0.0
+                need_tokens = min(float(tokens), float(tpm)) if tpm > 0 else 0.0
+                wait: float = max(0.0, blocked_until - now)
+                if rpm > 0 and have_requests < need_requests:
+                    wait = max(wait, (need_requests - have_requests) * 60.0 / rpm)
+                if tpm > 0 and have_tokens < need_tokens:
+                    wait = max(wait, (need_tokens - have_tokens) * 60.0 / tpm)
+                if wait <= 0:
+                    have_requests -= need_requests
+                    have_tokens -= need_tokens
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (model, requests, tokens, updated, "
+                    "blocked_until) VALUES (?, ?, ?, ?, ?)",
+                    (model, have_requests, have_tokens, now, blocked_until),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def acquire(
+        self, model: str, *, rpm: int = 0, tpm: int = 0, requests: int = 1, tokens: int = 0
+    ) -> float:
+        """Block until ``requests`` calls using ``tokens`` tokens fit ``model``'s limits.
+
+        ``rpm``/``tpm`` of 0 leave that dimension unlimited. Returns the seconds waited.
+        """
+        waited = 0.0
+        while True:
+            wait = self._reserve(model, rpm, tpm, requests, tokens)
+            if wait <= 0:
+                break
+            self._sleep(wait)
+            waited += wait
+        if waited:
+            with self._lock:
+                self.waited_seconds += waited
+        return waited
+
+    def try_acquire(
+        self, model: str, *, rpm: int = 0, tpm: int = 0, requests: int = 1, tokens: int = 0
+    ) -> bool:
+        """Take the allowance only if it is available right now; never sleeps."""
+        return self._reserve(model, rpm, tpm, requests, tokens) <= 0
+
+    def penalize(self, model: str, retry_after: float | None) -> None:
+        """Record a 429 for ``model``: empty its buckets and block it for ``retry_after``."""
+        now = self._clock()
+        delay = retry_after if retry_after is not None else DEFAULT_PENALTY_SECONDS
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT blocked_until FROM buckets WHERE model = ?", (model,)
+                ).fetchone()
+                blocked_until = max(now + delay, row[0] if row else 0.0)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (model, requests, tokens, updated, "
+                    "blocked_until) VALUES (?, 0, 0, ?, ?)",
+                    (model, now, blocked_until),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass(frozen=True)
+class ModelRateLimit:
+    """One model's limits bound to the shared limiter."""
+
+    limiter: RateLimiter
+    model: str
+    rpm: int = 0
+    tpm: int = 0
+
+    def acquire(self, *, requests: int = 1, tokens: int = 0) -> float:
+        return self.limiter.acquire(
+            self.model, rpm=self.rpm, tpm=self.tpm, requests=requests, tokens=tokens
+        )
+
+    def try_acquire(self, *, requests: int = 1, tokens: int = 0) -> bool:
+        return self.limiter.try_acquire(
+            self.model, rpm=self.rpm, tpm=self.tpm, requests=requests, tokens=tokens
+        )
+
+    def penalize(self, retry_after: float | None) -> None:
+        self.limiter.penalize(self.model, retry_after)
+
+
+_limiters: dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _shared_limiter(out_dir: str) -> RateLimiter:
+    path = str(Path(out_dir) / RATE_LIMIT_FILE)
+    with _limiters_lock:
+        limiter = _limiters.get(path)
+        if limiter is None:
+            limiter = RateLimiter(path)
+            _limiters[path] = limiter
+    return limiter
+
+
+def chat_rate_limit(settings, model: str | None = None) -> ModelRateLimit | None:
+    """Limits for a chat model (default ``OPENAI_MODEL_NAME``), or None when unlimited.
+
+    Every chat model gets its own buckets with the ``RATE_LIMIT_RPM``/``RATE_LIMIT_TPM``
+    allowance.
+    """
+    rpm = getattr(settings, "rate_limit_rpm", 0)
+    tpm = getattr(settings, "rate_limit_tpm", 0)
+    if rpm <= 0 and tpm <= 0:
+        return None
+    return ModelRateLimit(
+        _shared_limiter(settings.out_dir), model or settings.openai_model_name, rpm, tpm
+    )
+
+
+def embedding_rate_limit(settings) -> ModelRateLimit | None:
+    """Limits for the embedding model, or None when its RPM/TPM limits are unset."""
+    rpm = getattr(settings, "embedding_rate_limit_rpm", 0)
+    tpm = getattr(settings, "embedding_rate_limit_tpm", 0)
+    if rpm <= 0 and tpm <= 0 or not settings.embedding_model_name:
+        return None
+    return ModelRateLimit(
+        _shared_limiter(settings.out_dir), settings.embedding_model_name, rpm, tpm
+    )
@@ -1,16 +1,25 @@
 from __future__ import annotations
 
+import random
 import re
+import threading
 import time
+from collections.abc import Callable
 from pathlib import Path
 
+from crewx.errors import CircuitOpenError, DeadlineExceededError
 from crewx.io import ensure_dir
+from crewx.rate_limiter import ModelRateLimit
 
 
 class RateLimitHit(RuntimeError):
     pass
 
 
+class KickoffCancelled(RuntimeError):
+    """The caller's ``cancel`` event was set before the kickoff started."""
+
+
 def is_rate_limit_error(exc: Exception) -> bool:
     message = str(exc).lower()
     return "rate limit" in message or "rate_limit" in message or "429" in message
@@ -47,6 +56,107 @@ def _append_text(path: str, text: str) -> None:
         handle.write(text)
 
 
+class RetryPolicy:
+    """Backoff, deadline and circuit breaker shared by every kickoff of one run.
+
+    Delays use decorrelated jitter: each one is drawn from ``[base_delay, 3 * previous]`` and
+    capped at ``max_delay``, so concurrent callers spread out instead of retrying in step.
+    ``max_wall_time`` (seconds, 0 = none) bounds the whole run: a retry whose sleep would
+    overrun it raises ``DeadlineExceededError`` right away. After ``breaker_threshold``
+    consecutive connection errors (0 = never) the breaker opens and every later attempt
+    raises ``CircuitOpenError`` without calling the provider.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_retries: int = 6,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+        max_wall_time: float = 0.0,
+        breaker_threshold: int = 0,
+        seed: int | None = None,
+        clock: Callable[[], float] | None = None,
+        sleep: Callable[[float], None] | None = None,
+    ) -> None:
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker_threshold = breaker_threshold
+        self._clock = clock or time.monotonic
+        self._sleep = sleep or time.sleep
+        self._deadline = self._clock() + max_wall_time if max_wall_time > 0 else None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._consecutive_connection_errors = 0
+        self.circuit_open = False
+        self.deadline_exceeded = False
+        self.retries = 0
+        self.rate_limit_retries = 0
+        self.connection_errors = 0
+        self.backoff_seconds = 0.0
+
+    def remaining(self) -> float | None:
+        """Seconds left before the deadline, or None without one."""
+        if self._deadline is None:
+            return None
+        return self._deadline - self._clock()
+
+    def check(self) -> None:
+        """Raise if the circuit is open or the deadline has passed."""
+        if self.circuit_open:
+            raise CircuitOpenError(
+                f"Circuit open after {self.breaker_threshold} consecutive connection errors"
+            )
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            with self._lock:
+                self.deadline_exceeded = True
+            raise DeadlineExceededError("Run exceeded its wall-time budget")
+
+    def next_delay(self, previous: float) -> float:
+        with self._lock:
+            upper = max(self.base_delay, previous * 3)
+            return min(self.max_delay, self._rng.uniform(self.base_delay, upper))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive_connection_errors = 0
+
+    def record_connection_error(self) -> None:
+        with self._lock:
+            self.connection_errors += 1
+            self._consecutive_connection_errors += 1
+            if 0 < self.breaker_threshold <= self._consecutive_connection_errors:
+                self.circuit_open = True
+
+    def backoff(self, delay: float, *, rate_limited: bool = False) -> None:
+        """Sleep ``delay`` before a retry, or raise if that would overrun the deadline."""
+        remaining = self.remaining()
+        if remaining is not None and delay >= remaining:
+            with self._lock:
+                self.deadline_exceeded = True
+            raise DeadlineExceededError(
+                f"Retry in {delay:.1f}s would exceed the wall-time budget ({remaining:.1f}s left)"
+            )
+        with self._lock:
+            self.retries += 1
+            self.rate_limit_retries += int(rate_limited)
+            self.backoff_seconds += delay
+        self._sleep(delay)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "retries": self.retries,
+                "rate_limit_retries": self.rate_limit_retries,
+                "connection_errors": self.connection_errors,
+                "backoff_seconds": round(self.backoff_seconds, 3),
+                "circuit_open": self.circuit_open,
+                "deadline_exceeded": self.deadline_exceeded,
+            }
+
+
 def kickoff_with_retry(
     crew,
     *,
@@ -54,33 +164,70 @@ def kickoff_with_retry(
     base_delay: float = 2.0,
     fail_fast_on_rate_limit: bool = False,
     debug_path: str | None = None,
+    rate_limit: ModelRateLimit | None = None,
+    tokens: int = 0,
+    policy: RetryPolicy | None = None,
+    cancel: threading.Event | None = None,
 ) -> str:
+    """Kick off ``crew``, retrying rate limits and connection errors.
+
+    ``policy`` carries the run's backoff, deadline and circuit breaker; without one, a
+    private policy is built from ``max_retries`` and ``base_delay``. With ``rate_limit``
+    every attempt first takes one request per task and ``tokens`` from the shared buckets,
+    and a 429 blocks the model there for its retry-after hint, so the next attempt (in this
+    or any other process) waits exactly that long. Once ``cancel`` is set no further
+    attempt is started and ``KickoffCancelled`` is raised instead.
+    """
+    if policy is None:
+        policy = RetryPolicy(max_retries=max_retries, base_delay=base_delay)
     last_exc: Exception | None = None
-    for attempt in range(max_retries + 1):
+    delay = policy.base_delay
+    for attempt in range(policy.max_retries + 1):
+        policy.check()
+        if cancel is not None and cancel.is_set():
+            raise KickoffCancelled("kickoff cancelled")
         try:
-            return str(crew.kickoff() or "")
+            if rate_limit is not None:
+                rate_limit.acquire(requests=max(1, len(crew.tasks)), tokens=tokens)
+                # The limiter may have slept; the result may no longer be wanted.
+                if cancel is not None and cancel.is_set():
+                    raise KickoffCancelled("kickoff cancelled")
+            result = str(crew.kickoff() or "")
         except Exception as exc:
             if is_rate_limit_error(exc):
+                retry_after = parse_retry_after_seconds(str(exc))
+                if rate_limit is not None:
+                    rate_limit.penalize(retry_after)
                 if fail_fast_on_rate_limit:
                     raise RateLimitHit(str(exc)) from exc
-                if attempt < max_retries:
-                    message = str(exc)
-                    retry_after = parse_retry_after_seconds(message)
-                    delay = retry_after if retry_after is not None else base_delay * (attempt + 1)
-                    time.sleep(delay + 0.25)
+                if attempt < policy.max_retries:
+                    if rate_limit is None:
+                        delay = (
+                            retry_after + 0.25
+                            if retry_after is not None
+                            else policy.next_delay(delay)
+                        )
+                        policy.backoff(delay, rate_limited=True)
+                    last_exc = exc
+                    continue
+            if is_connection_error(exc):
+                policy.record_connection_error()
+                if policy.circuit_open:
+                    policy.check()
+                if attempt < policy.max_retries:
+                    delay = policy.next_delay(delay)
+                    if debug_path:
+                        _append_text(
+                            debug_path,
+                            f"CONNECTION ERROR\nattempt={attempt + 1}\ndelay={delay:.2f}s\n"
+                            f"error={exc}\n\n",
+                        )
+                    policy.backoff(delay)
                     last_exc = exc
                     continue
-            if is_connection_error(exc) and attempt < max_retries:
-                delay = min(60.0, base_delay * (attempt + 1) * 3)
-                if debug_path:
-                    _append_text(
-                        debug_path,
-                        f"CONNECTION ERROR\nattempt={attempt + 1}\ndelay={delay}s\nerror={exc}\n\n",
-                    )
-                time.sleep(delay)
-                last_exc = exc
-                continue
             raise
+        policy.record_success()
+        return result
     if last_exc:
         raise last_exc
     return ""
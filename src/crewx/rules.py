@@ -1,22 +1,39 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 import re
+from collections import Counter, deque
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
-import yaml
+from crewx.io import ensure_dir
 
 
 def _project_root() -> Path:
     return Path(__file__).resolve().parents[2]
 
 
-def _load_rules() -> dict[str, Any]:
-    path = _project_root() / "config" / "rules.yaml"
-    if not path.exists():
-        raise FileNotFoundError(f"Rules file not found: {path}")
-    with path.open("r", encoding="utf-8") as handle:
-        data = yaml.safe_load(handle) or {}
+RULES_CACHE_VERSION = 1
+
+
+def _rules_path() -> Path:
+    return _project_root() / "config" / "rules.yaml"
+
+
+def _rules_cache_path() -> Path:
+    return _project_root() / ".cache" / "rules.json"
+
+
+def _parse_rules_yaml(raw: bytes) -> dict[str, Any]:
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    data = yaml.load(raw, Loader=loader) or {}
     if not isinstance(data, dict):
         raise ValueError("Rules file must contain a mapping at the top level.")
     return data
@@ -34,7 +51,190 @@ def _as_dict(value: Any) -> dict[str, Any]:
     return value
 
 
-_rules = _load_rules()
+# 3-hour threshold claims are banned regardless of rules.yaml.
+HARD_BANNED_PHRASES = [
+    "3 stunden",
+    "3h",
+    "3\u00a0stunden",
+    "mehr als 3",
+    "über 3",
+    "ab 3",
+    "drei stunden",
+]
+
+
+def _trie_pattern(needles: Iterable[str]) -> str:
+    trie: dict[str, Any] = {}
+    for needle in needles:
+        node = trie
+        for ch in needle:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict[str, Any]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class NeedleMatcher:
+    """Substring matcher for many named needle groups, compiled into one regex.
+
+    The needles form a trie-shaped alternation inside a lookahead, so one ``finditer`` pass
+    reports the longest needle starting at every position. Shorter needles that share that
+    start are prefixes of it and are folded in from a precomputed closure, which gives the
+    same answer as ``any(n in text for n in group)`` for every group at once.
+    """
+
+    def __init__(self, groups: Mapping[str, Iterable[str]]) -> None:
+        groups_for: dict[str, set[str]] = {}
+        for group, needles in groups.items():
+            for needle in needles:
+                needle = str(needle).lower()
+                if needle:
+                    groups_for.setdefault(needle, set()).add(group)
+        self._groups_for: dict[str, frozenset[str]] = {}
+        for needle in groups_for:
+            hit: set[str] = set()
+            for end in range(1, len(needle) + 1):
+                hit |= groups_for.get(needle[:end], set())
+            self._groups_for[needle] = frozenset(hit)
+        self._pattern = re.compile(f"(?=({_trie_pattern(groups_for)}))") if groups_for else None
+
+    def to_payload(self) -> dict[str, Any]:
+        return {
+            "pattern": self._pattern.pattern if self._pattern is not None else None,
+            "groups_for": {needle: sorted(groups) for needle, groups in self._groups_for.items()},
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> NeedleMatcher:
+        matcher = cls({})
+        pattern = payload.get("pattern")
+        matcher._pattern = re.compile(pattern) if pattern else None
+        matcher._groups_for = {
+            needle: frozenset(groups) for needle, groups in payload["groups_for"].items()
+        }
+        return matcher
+
+    def scan(self, lower_text: str) -> frozenset[str]:
+        if self._pattern is None:
+            return frozenset()
+        hits: set[str] = set()
+        for match in self._pattern.finditer(lower_text):
+            hits |= self._groups_for[match.group(1)]
+        return frozenset(hits)
+
+
+def _quota_needles(quota: Any) -> list[str] | None:
+    if not isinstance(quota, dict):
+        return None
+    needles = quota.get("needles")
+    if not isinstance(needles, list) or not isinstance(quota.get("max_per_batch"), int):
+        return None
+    return [str(n) for n in needles]
+
+
+def _matcher_groups(data: dict[str, Any]) -> dict[str, list[str]]:
+    groups: dict[str, list[str]] = {
+        "topic": _as_list(data.get("topic_keywords")),
+        "tip": _as_list(data.get("tip_language")),
+        "document": _as_list(data.get("document_patterns")),
+        "brand": _as_list(data.get("brand_terms")),
+        "cta": _as_list(data.get("cta_terms")),
+        "detail": _as_list(data.get("detail_keywords")),
+        "forbidden": _as_list(data.get("forbidden_claim_phrases"))
+        + HARD_BANNED_PHRASES
+        + _as_list(data.get("forbidden_legal_claims"))
+        + _as_list(data.get("forbidden_compensation_claims"))
+        + _as_list(data.get("forbidden_patterns")),
+    }
+    for bucket, needles in _as_dict(data.get("topic_buckets")).items():
+        groups[f"bucket:{bucket}"] = _as_list(needles)
+    for key, quota in _as_dict(data.get("keyword_quotas")).items():
+        quota_needles = _quota_needles(quota)
+        if quota_needles is not None:
+            groups[f"quota:{key}"] = quota_needles
+    return groups
+
+
+def _groups_digest(groups: dict[str, list[str]]) -> str:
+    payload = json.dumps(groups, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """Parsed rules.yaml together with its compiled needle matcher."""
+
+    data: dict[str, Any]
+    matcher: NeedleMatcher
+
+
+def load_compiled_rules(
+    path: Path | None = None, *, cache_path: Path | None = None
+) -> CompiledRules:
+    """Load rules.yaml, reusing the on-disk compiled copy while the file is unchanged.
+
+    The cache is JSON (no YAML parse, no trie build on a warm start) and is keyed by the
+    rules file's mtime and size, falling back to its SHA-256 when only the mtime moved.
+    The cached matcher is only reused while the needle groups built from the cached data
+    hash the same, so edits to ``HARD_BANNED_PHRASES`` or ``_matcher_groups`` rebuild it.
+    A missing or unwritable cache only costs a fresh parse.
+    """
+    path = path or _rules_path()
+    cache_path = cache_path or _rules_cache_path()
+    if not path.exists():
+        raise FileNotFoundError(f"Rules file not found: {path}")
+    stat = path.stat()
+
+    cached: dict[str, Any] = {}
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cached = {}
+    if not isinstance(cached, dict) or cached.get("version") != RULES_CACHE_VERSION:
+        cached = {}
+    if cached.get("mtime_ns") == stat.st_mtime_ns and cached.get("size") == stat.st_size:
+        groups = _matcher_groups(cached["data"])
+        if cached.get("groups_sha256") == _groups_digest(groups):
+            return CompiledRules(cached["data"], NeedleMatcher.from_payload(cached["matcher"]))
+
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    data = cached["data"] if cached.get("sha256") == digest else _parse_rules_yaml(raw)
+    groups = _matcher_groups(data)
+    groups_digest = _groups_digest(groups)
+    if cached.get("sha256") == digest and cached.get("groups_sha256") == groups_digest:
+        compiled = CompiledRules(data, NeedleMatcher.from_payload(cached["matcher"]))
+    else:
+        compiled = CompiledRules(data, NeedleMatcher(groups))
+
+    payload = {
+        "version": RULES_CACHE_VERSION,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": digest,
+        "groups_sha256": groups_digest,
+        "data": compiled.data,
+        "matcher": compiled.matcher.to_payload(),
+    }
+    try:
+        ensure_dir(cache_path.parent)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return compiled
+
+
+_compiled = load_compiled_rules()
+_rules = _compiled.data
 
 DOCUMENT_PATTERNS = _as_list(_rules.get("document_patterns"))
 KEYWORD_QUOTAS = _as_dict(_rules.get("keyword_quotas"))
@@ -55,25 +255,49 @@ BRAND_TERMS = _as_list(_rules.get("brand_terms"))
 CTA_TERMS = _as_list(_rules.get("cta_terms"))
 DETAIL_KEYWORDS = _as_list(_rules.get("detail_keywords"))
 
+MAX_TWEET_CHARS = int(_rules.get("max_tweet_chars", 240))
+MAX_HASHTAGS = int(_rules.get("max_hashtags", 2))
+
 DETAIL_NUMBER_PATTERN = re.compile(r"\d")
 HASHTAG_PATTERN = re.compile(r"#\w+")
 URL_PATTERN = re.compile(r"https?://\S+")
+# Openings and wording the reviewer prompt rejects.
+REVIEW_BANNED_OPENING_PATTERN = re.compile(
+    r"^\W*(wussten sie|wissen sie|haben sie gewusst|wusstest du|mythos|fakt|irrtum|falsch)\b",
+    re.IGNORECASE,
+)
+REVIEW_BANNED_WORDING_PATTERN = re.compile(r"\b(checkliste|schritte)\b", re.IGNORECASE)
 
 FORBIDDEN_CLAIM_PHRASES = _as_list(_rules.get("forbidden_claim_phrases"))
 
+_matcher = _compiled.matcher
 
-def is_doc_tip(text: str) -> bool:
-    lower = (text or "").lower()
-    return any(p in lower for p in DOCUMENT_PATTERNS)
 
+@dataclass(frozen=True)
+class TextFeatures:
+    """Every rules.yaml needle group a text contains, from a single scan."""
+
+    hits: frozenset[str]
+
+    def has(self, group: str) -> bool:
+        return group in self.hits
+
+    @property
+    def buckets(self) -> list[str]:
+        return [b for b in TOPIC_BUCKETS if f"bucket:{b}" in self.hits]
 
-def count_keyword_hits(texts: list[str], needles: list[str]) -> int:
-    hits = 0
-    for t in texts:
-        lower = t.lower()
-        if any(n in lower for n in needles):
-            hits += 1
-    return hits
+    @property
+    def quotas(self) -> list[str]:
+        return [k for k in KEYWORD_QUOTAS if f"quota:{k}" in self.hits]
+
+
+@lru_cache(maxsize=4096)
+def text_features(text: str) -> TextFeatures:
+    return TextFeatures(hits=_matcher.scan((text or "").lower()))
+
+
+def is_doc_tip(text: str) -> bool:
+    return text_features(text).has("document")
 
 
 def extract_bucket(text: str, tags: list[str] | None) -> str | None:
@@ -94,9 +318,8 @@ def contains_brand_or_cta(text: str, tags: list[str] | None) -> bool:
 
     if URL_PATTERN.search(lower):
         return True
-    if any(term in lower for term in BRAND_TERMS):
-        return True
-    if any(term in lower for term in CTA_TERMS):
+    features = text_features(text)
+    if features.has("brand") or features.has("cta"):
         return True
     if any(
         term.replace("#", "").strip() in tag_values for term in BRAND_TERMS if term.startswith("#")
@@ -108,25 +331,88 @@ def contains_brand_or_cta(text: str, tags: list[str] | None) -> bool:
 
 
 def bucket_matches_text(bucket: str, text: str) -> bool:
-    needles = TOPIC_BUCKETS.get(bucket, [])
-    lower = (text or "").lower()
-    return any(n in lower for n in needles)
+    return text_features(text).has(f"bucket:{bucket}")
 
 
 def infer_bucket_from_text(text: str) -> str | None:
-    lower = (text or "").lower()
-    for bucket, needles in TOPIC_BUCKETS.items():
-        if any(n in lower for n in needles):
-            return bucket
-    return None
-
-
-def count_recent_bucket_hits(texts: list[str], bucket: str) -> int:
-    hits = 0
-    for t in texts:
-        if infer_bucket_from_text(t) == bucket:
-            hits += 1
-    return hits
+    buckets = text_features(text).buckets
+    return buckets[0] if buckets else None
+
+
+class GroupCounter:
+    """Number of texts hitting each needle group, plus each text's inferred bucket."""
+
+    def __init__(self, texts: Iterable[str] = ()) -> None:
+        self._groups: Counter[str] = Counter()
+        self._buckets: Counter[str] = Counter()
+        for text in texts:
+            self.add(text)
+
+    def _update(self, text: str, sign: int) -> None:
+        features = text_features(text)
+        for group in features.hits:
+            self._groups[group] += sign
+        buckets = features.buckets
+        if buckets:
+            self._buckets[buckets[0]] += sign
+
+    def add(self, text: str) -> None:
+        self._update(text, 1)
+
+    def remove(self, text: str) -> None:
+        self._update(text, -1)
+
+    def group_hits(self, group: str) -> int:
+        return self._groups[group]
+
+    def bucket_hits(self, bucket: str) -> int:
+        return self._buckets[bucket]
+
+
+class HistoryFeatureIndex:
+    """Group and bucket hit counts over the newest history entries.
+
+    ``recent_texts`` is newest-first, as returned by ``list_recent_tweet_texts``. Counts
+    cover the newest ``window`` texts and bucket counts the newest ``bucket_window``: the
+    same numbers a rescan of those slices with ``text_features`` and
+    ``infer_bucket_from_text`` would give.
+    ``push`` keeps both windows current as new tweets are appended to history.
+    """
+
+    def __init__(
+        self,
+        recent_texts: Iterable[str] = (),
+        *,
+        window: int = 50,
+        bucket_window: int = BUCKET_HISTORY_WINDOW,
+    ) -> None:
+        self.window = window
+        self.bucket_window = bucket_window
+        # Oldest first, so ``push`` appends on the right and evicts from the left.
+        self._texts: deque[str] = deque()
+        self._recent = GroupCounter()
+        self._bucket_recent = GroupCounter()
+        for text in reversed(list(recent_texts)[: max(window, bucket_window)]):
+            self.push(text)
+
+    def push(self, text: str) -> None:
+        """Record ``text`` as the newest history entry."""
+        self._texts.append(text)
+        self._recent.add(text)
+        self._bucket_recent.add(text)
+        size = len(self._texts)
+        if size > self.window:
+            self._recent.remove(self._texts[size - self.window - 1])
+        if size > self.bucket_window:
+            self._bucket_recent.remove(self._texts[size - self.bucket_window - 1])
+        if size > max(self.window, self.bucket_window):
+            self._texts.popleft()
+
+    def group_hits(self, group: str) -> int:
+        return self._recent.group_hits(group)
+
+    def bucket_hits(self, bucket: str) -> int:
+        return self._bucket_recent.bucket_hits(bucket)
 
 
 def is_allowed_bucket(bucket: str) -> bool:
@@ -145,10 +431,9 @@ def infer_opening_style(text: str) -> str:
 
 
 def has_concrete_detail(text: str) -> bool:
-    lower = (text or "").lower()
-    if DETAIL_NUMBER_PATTERN.search(lower):
+    if DETAIL_NUMBER_PATTERN.search(text or ""):
         return True
-    return any(k in lower for k in DETAIL_KEYWORDS)
+    return text_features(text).has("detail")
 
 
 def has_hashtag(text: str) -> bool:
@@ -156,33 +441,4 @@ def has_hashtag(text: str) -> bool:
 
 
 def violates_hard_rules(text: str, *, strict: bool = True) -> bool:
-    lower_text = (text or "").lower()
-
-    if any(p in lower_text for p in FORBIDDEN_CLAIM_PHRASES):
-        return True
-
-    if "3 stunden" in lower_text or "3h" in lower_text:
-        return True
-
-    if "3\u00a0stunden" in lower_text:
-        return True
-
-    if "mehr als 3" in lower_text or "über 3" in lower_text or "ab 3" in lower_text:
-        return True
-
-    if "drei stunden" in lower_text:
-        return True
-
-    if any(p in lower_text for p in _as_list(_rules.get("forbidden_legal_claims"))):
-        return True
-
-    if any(p in lower_text for p in _as_list(_rules.get("forbidden_compensation_claims"))):
-        return True
-
-    if any(p in lower_text for p in _as_list(_rules.get("forbidden_patterns"))):
-        return True
-
-    if strict:
-        return False
-
-    return False
+    return text_features(text).has("forbidden")
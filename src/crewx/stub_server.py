@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import json
+import math
+import random
+import re
+import socket
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from crewx.embeddings import HashedNgramEmbeddingBackend
+
+# One tweet per active bucket that passes the pipeline's local filters.
+CANNED_TWEETS = [
+    ("boarding_gate", "Wenn am Gate 12 das Boarding startet, halte den Pass bereit."),
+    ("gepaeck_handgepaeck", "Vor dem Flug den Koffer wiegen: 23 kg sind oft das Limit."),
+    ("checkin_sitzplatz", "Beim Check-in 24 Stunden vor dem Flug den Sitzplatz sichern."),
+    ("wetter_irrops", "Wenn Gewitter den Flug verzögern, frag nach 2 Stunden nach Essen."),
+    ("streik", "Bei Streik am Flughafen den Flugstatus 2 Tage vorher prüfen."),
+]
+DEFAULT_TWEET_TYPES = ["educational", "fun_fact", "travel_hack"]
+
+_REQUIRED_TYPES_PATTERN = re.compile(r"REQUIRED TYPES: ([^\n\\\"]+)")
+_TWEET_ARRAY_PATTERN = re.compile(r'\[\s*\{\s*"tweet_type"')
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Parse a latency distribution in seconds.
+
+    ``"0.2"`` or ``"fixed:0.2"``, ``"uniform:0.1:0.5"``, ``"exp:0.3"`` (mean) or
+    ``"lognormal:0.3:0.5"`` (median, sigma).
+    """
+    kind, _, rest = (spec or "0").partition(":")
+    if not rest:
+        kind, rest = "fixed", kind
+    args = [float(part) for part in rest.split(":") if part]
+    if kind == "fixed" and len(args) == 1:
+        return lambda _rng: max(0.0, args[0])
+    if kind == "uniform" and len(args) == 2:
+        return lambda rng: rng.uniform(args[0], args[1])
+    if kind == "exp" and len(args) == 1:
+        return lambda rng: rng.expovariate(1.0 / args[0]) if args[0] > 0 else 0.0
+    if kind == "lognormal" and len(args) == 2:
+        return lambda rng: rng.lognormvariate(math.log(args[0]), args[1])
+    raise ValueError(f"Invalid latency spec {spec!r}")
+
+
+@dataclass(frozen=True)
+class StubConfig:
+    latency: str = "0"
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    drop_rate: float = 0.0
+    truncate_rate: float = 0.0
+    embedding_dim: int = 256
+    seed: int | None = None
+
+
+class _StubState:
+    def __init__(self, config: StubConfig) -> None:
+        self.config = config
+        self.latency = parse_latency(config.latency)
+        self.rng = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.stats: dict[str, int] = {
+            "requests": 0,
+            "completions": 0,
+            "embeddings": 0,
+            "rate_limited": 0,
+            "dropped": 0,
+            "truncated": 0,
+        }
+        self._canned = 0
+
+    def count(self, key: str) -> None:
+        with self.lock:
+            self.stats[key] += 1
+
+    def roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self.lock:
+            return self.rng.random() < rate
+
+    def delay(self) -> float:
+        with self.lock:
+            return self.latency(self.rng)
+
+    def next_tweets(self, types: list[str]) -> list[dict]:
+        with self.lock:
+            start = self._canned
+            self._canned += len(types)
+        tweets = []
+        for i, tweet_type in enumerate(types):
+            bucket, text = CANNED_TWEETS[(start + i) % len(CANNED_TWEETS)]
+            tweets.append(
+                {
+                    "tweet_type": tweet_type,
+                    "opening_style": "tip",
+                    "text": text,
+                    "language": "de",
+                    "tags": [bucket],
+                }
+            )
+        return tweets
+
+
+def _message_text(messages: Any) -> str:
+    if isinstance(messages, str):
+        return messages
+    parts: list[str] = []
+    for message in messages or []:
+        content = message.get("content") if isinstance(message, dict) else message
+        if isinstance(content, list):
+            content = " ".join(
+                str(part.get("text", "")) if isinstance(part, dict) else str(part)
+                for part in content
+            )
+        parts.append(str(content or ""))
+    return "\n".join(parts)
+
+
+def _last_tweet_array(text: str) -> list | None:
+    """Last JSON tweet array in ``text`` that is real output, not a prompt's format example."""
+    decoder = json.JSONDecoder()
+    found = None
+    for match in _TWEET_ARRAY_PATTERN.finditer(text):
+        try:
+            tweets, _ = decoder.raw_decode(text, match.start())
+        except ValueError:
+            continue
+        if any(isinstance(t, dict) and t.get("text") not in (None, "", "...") for t in tweets):
+            found = tweets
+    return found
+
+
+def canned_completion(state: _StubState, messages: Any) -> str:
+    """Echo the tweet array a reviewer/poster was given, or generate one per required type."""
+    text = _message_text(messages)
+    tweets = _last_tweet_array(text)
+    if tweets is not None:
+        return json.dumps(tweets, ensure_ascii=False)
+    required = _REQUIRED_TYPES_PATTERN.search(text)
+    types = (
+        [t.strip() for t in required.group(1).split(",") if t.strip()]
+        if required
+        else DEFAULT_TWEET_TYPES
+    )
+    return json.dumps(state.next_tweets(types), ensure_ascii=False)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: _StubHTTPServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        return
+
+    def _send_json(self, status: int, payload: dict, headers: dict[str, str] | None = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b"{}"
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def do_GET(self) -> None:
+        state = self.server.state
+        if self.path.rstrip("/").endswith("/stub/stats"):
+            with state.lock:
+                self._send_json(200, dict(state.stats))
+            return
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+            return
+        self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self) -> None:
+        state = self.server.state
+        config = state.config
+        request = self._read_json()
+        state.count("requests")
+        time.sleep(state.delay())
+
+        if state.roll(config.drop_rate):
+            state.count("dropped")
+            # Hang up without answering, like a reset connection.
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        if state.roll(config.rate_limit_rate):
+            state.count("rate_limited")
+            model = request.get("model") or "stub"
+            message = (
+                f"Rate limit reached for {model} in organization stub on tokens per min (TPM). "
+                f"Please try again in {config.retry_after:g}s."
+            )
+            self._send_json(
+                429,
+                {"error": {"message": message, "type": "tokens", "code": "rate_limit_exceeded"}},
+                headers={"Retry-After": f"{config.retry_after:g}"},
+            )
+            return
+
+        if self.path.rstrip("/").endswith("/chat/completions"):
+            self._complete(request)
+        elif self.path.rstrip("/").endswith("/embeddings"):
+            self._embed(request)
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def _complete(self, request: dict) -> None:
+        state = self.server.state
+        state.count("completions")
+        content = canned_completion(state, request.get("messages"))
+        finish_reason = "stop"
+        if state.roll(state.config.truncate_rate):
+            state.count("truncated")
+            content = content[: max(1, int(len(content) * 0.6))]
+            finish_reason = "length"
+        prompt_tokens = len(_message_text(request.get("messages")).split())
+        completion_tokens = len(content.split())
+        self._send_json(
+            200,
+            {
+                "id": f"chatcmpl-stub-{state.stats['completions']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model") or "stub",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": finish_reason,
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            },
+        )
+
+    def _embed(self, request: dict) -> None:
+        state = self.server.state
+        state.count("embeddings")
+        texts = request.get("input") or []
+        if isinstance(texts, str):
+            texts = [texts]
+        dim = int(request.get("dimensions") or state.config.embedding_dim)
+        vectors = HashedNgramEmbeddingBackend(dim=dim).embed([str(t) for t in texts])
+        self._send_json(
+            200,
+            {
+                "object": "list",
+                "model": request.get("model") or "stub",
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": vector}
+                    for i, vector in enumerate(vectors)
+                ],
+                "usage": {"prompt_tokens": 0, "total_tokens": 0},
+            },
+        )
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], state: _StubState) -> None:
+        super().__init__(address, _StubHandler)
+        self.state = state
+
+
+class StubServer:
+    """Local OpenAI-compatible stand-in for load, latency and retry testing.
+
+    Serves ``/v1/chat/completions`` with canned tweet JSON, ``/v1/embeddings`` with
+    hashed n-gram vectors, ``/v1/models`` and a ``/stub/stats`` counter endpoint. Latency,
+    429s, dropped connections and truncated outputs are injected at the configured rates
+    from a seeded RNG. Runs on a background thread as a context manager.
+    """
+
+    def __init__(
+        self, config: StubConfig | None = None, *, host: str = "127.0.0.1", port: int = 0
+    ) -> None:
+        self.state = _StubState(config or StubConfig())
+        self._host = host
+        self._server = _StubHTTPServer((host, port), self.state)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self._host}:{self._server.server_port}/v1"
+
+    @property
+    def stats(self) -> dict[str, int]:
+        with self.state.lock:
+            return dict(self.state.stats)
+
+    def start(self) -> StubServer:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> StubServer:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
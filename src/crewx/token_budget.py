@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import math
+import re
+from dataclasses import dataclass
+
+# Context windows (prompt + completion tokens) by model-name prefix; the longest prefix wins.
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4.1": 1_047_576,
+    "gpt-4o": 128_000,
+    "gpt-4-turbo": 128_000,
+    "gpt-4": 8_192,
+    "gpt-3.5-turbo": 16_385,
+    "o1": 200_000,
+    "o3": 200_000,
+    "o4": 200_000,
+    "llama-3.1": 131_072,
+    "llama-3.3": 131_072,
+    "llama3": 8_192,
+    "mixtral-8x7b": 32_768,
+    "gemma2": 8_192,
+}
+DEFAULT_CONTEXT_WINDOW = 8_192
+DEFAULT_MAX_TOKENS = 250
+
+# crewAI wraps every task in its own role/goal/format instructions.
+AGENT_PROMPT_OVERHEAD = 400
+# Output headroom for the estimate being off and for the model padding its JSON.
+OUTPUT_MARGIN = 1.15
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+# Shape of one tweet object in the pipeline's JSON output, with a full-length text.
+_SAMPLE_TWEET = {
+    "tweet_type": "industry_insight",
+    "opening_style": "myth_vs_fact",
+    "text": " ".join(["Flugverspätung"] * 16)[:240],
+    "language": "de",
+    "tags": ["gepaeck_handgepaeck", "mistake_fix"],
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count without a tokenizer download.
+
+    Each word costs one token plus one per further four characters (long German compounds
+    split into several pieces) and each punctuation mark costs one. This overestimates
+    English slightly, which is the safe side for a budget.
+    """
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(text or ""):
+        tokens += 1 + (len(piece) - 1) // 4
+    return tokens
+
+
+TWEET_OUTPUT_TOKENS = estimate_tokens(json.dumps(_SAMPLE_TWEET, ensure_ascii=False)) + 2
+
+
+def output_tokens_for(n_tweets: int) -> int:
+    """``max_tokens`` for a JSON array of ``n_tweets`` tweets (never below the old default)."""
+    planned = math.ceil((2 + max(1, n_tweets) * TWEET_OUTPUT_TOKENS) * OUTPUT_MARGIN)
+    return max(DEFAULT_MAX_TOKENS, planned)
+
+
+def context_window_for(model: str | None, override: int = 0) -> int:
+    if override > 0:
+        return override
+    name = (model or "").lower().rsplit("/", 1)[-1]
+    best = ""
+    for prefix in MODEL_CONTEXT_WINDOWS:
+        if name.startswith(prefix) and len(prefix) > len(best):
+            best = prefix
+    return MODEL_CONTEXT_WINDOWS[best] if best else DEFAULT_CONTEXT_WINDOW
+
+
+@dataclass(frozen=True)
+class TokenBudget:
+    """Planned size of the largest single LLM request in a sequential crew."""
+
+    input_tokens: int
+    max_tokens: int
+    context_window: int
+
+    @property
+    def request_tokens(self) -> int:
+        return self.input_tokens + self.max_tokens
+
+    @property
+    def fits(self) -> bool:
+        return self.request_tokens <= self.context_window
+
+
+def plan_crew_budget(prompts: list[str], *, n_tweets: int, context_window: int) -> TokenBudget:
+    """Budget a sequential crew whose tasks each see the previous task's output as context."""
+    max_tokens = output_tokens_for(n_tweets)
+    largest_input = 0
+    for i, prompt in enumerate(prompts):
+        input_tokens = AGENT_PROMPT_OVERHEAD + estimate_tokens(prompt)
+        if i > 0:
+            input_tokens += max_tokens
+        largest_input = max(largest_input, input_tokens)
+    return TokenBudget(
+        input_tokens=largest_input, max_tokens=max_tokens, context_window=context_window
+    )
+
+
+def request_tokens(messages, max_tokens: int | None) -> int:
+    """Tokens one completion draws from a TPM limit: its messages plus its output allowance."""
+    if isinstance(messages, str):
+        text = messages
+    else:
+        text = "\n".join(str(m.get("content") or "") for m in messages if isinstance(m, dict))
+    return estimate_tokens(text) + (max_tokens or 0)
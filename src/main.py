@@ -5,21 +5,39 @@ import json
 import sys
 from dataclasses import replace
 from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
 from typing import cast
 
+from crewx.bench import (
+    REGRESSION_THRESHOLD,
+    compare_results,
+    load_results,
+    run_benchmarks,
+    save_results,
+)
 from crewx.config import Settings, load_settings
-from crewx.crew_pipeline import fix_history_unknown_types, run_generate_tweets_crewai
+from crewx.crew_pipeline import run_generate_tweets_crewai
 from crewx.errors import (
     ConfigurationError,
     CrewXError,
     NoTweetsGeneratedError,
     RateLimitError,
 )
+from crewx.history_store import (
+    HISTORY_BACKENDS,
+    JSONL_FILE,
+    SQLITE_FILE,
+    SqliteHistoryStore,
+    open_history_store,
+)
+from crewx.llm_cache import LLM_CACHE_MODES
+from crewx.stub_server import StubConfig, StubServer
 
 EXIT_OK = 0
 EXIT_CONFIG_ERROR = 2
 EXIT_NO_TWEETS = 3
 EXIT_RATE_LIMIT = 4
+EXIT_REGRESSION = 5
 EXIT_UNKNOWN_ERROR = 1
 
 
@@ -67,6 +85,60 @@ def _build_parser() -> argparse.ArgumentParser:
         help="Embedding similarity threshold",
     )
     run_parser.add_argument("--embedding-history-max", type=int, help="Embedding history max size")
+    run_parser.add_argument(
+        "--embedding-ann",
+        dest="embedding_ann",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Dedupe against an ANN index over the full history",
+    )
+    run_parser.add_argument(
+        "--crew-concurrency",
+        type=int,
+        help="Run the active types as this many concurrent sub-crews (1 = one crew)",
+    )
+    run_parser.add_argument("--crew-group-size", type=int, help="Tweet types per sub-crew")
+    run_parser.add_argument(
+        "--ladder-speculation",
+        type=int,
+        help="Try this many fallback ladder levels concurrently (1 = one after another)",
+    )
+    run_parser.add_argument(
+        "--local-poster",
+        dest="local_poster",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Shape the reviewed tweets into the queue locally instead of a poster LLM call",
+    )
+    run_parser.add_argument(
+        "--hybrid-review",
+        dest="hybrid_review",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Check review rules locally and only send violating tweets to the LLM reviewer",
+    )
+    run_parser.add_argument(
+        "--llm-cache",
+        choices=LLM_CACHE_MODES,
+        help="LLM response cache: passthrough, record (read-through) or replay (offline)",
+    )
+    run_parser.add_argument(
+        "--hedging",
+        dest="llm_hedging",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Duplicate LLM calls slower than the observed latency percentile",
+    )
+    run_parser.add_argument(
+        "--max-wall-time",
+        type=float,
+        help="Give up once the run has taken this many seconds (0 = no limit)",
+    )
+    run_parser.add_argument(
+        "--history-backend",
+        choices=HISTORY_BACKENDS,
+        help="History storage backend",
+    )
     run_parser.add_argument(
         "--log-json",
         dest="log_json",
@@ -106,6 +178,16 @@ def _build_parser() -> argparse.ArgumentParser:
         default="educational",
         help="Fallback type for unknown entries",
     )
+    history_parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Recheck the whole history instead of only lines added since the last check",
+    )
+    history_parser.add_argument(
+        "--history-backend",
+        choices=HISTORY_BACKENDS,
+        help="History storage backend",
+    )
     history_parser.add_argument(
         "--json",
         dest="output_json",
@@ -113,6 +195,69 @@ def _build_parser() -> argparse.ArgumentParser:
         help="JSON output to stdout",
     )
 
+    migrate_parser = subparsers.add_parser(
+        "migrate-history", help="Import history.jsonl into the SQLite history store"
+    )
+    migrate_parser.add_argument("--out-dir", help="Output directory")
+    migrate_parser.add_argument(
+        "--json",
+        dest="output_json",
+        action="store_true",
+        help="JSON output to stdout",
+    )
+
+    stub_parser = subparsers.add_parser(
+        "stub-server", help="Serve a local OpenAI-compatible stub for load and retry testing"
+    )
+    stub_parser.add_argument("--host", default="127.0.0.1", help="Bind address")
+    stub_parser.add_argument("--port", type=int, default=8799, help="Port (0 = any free port)")
+    stub_parser.add_argument(
+        "--latency",
+        default="0",
+        help="Latency in seconds: 0.2, uniform:0.1:0.5, exp:0.3 or lognormal:0.3:0.5",
+    )
+    stub_parser.add_argument(
+        "--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with 429"
+    )
+    stub_parser.add_argument(
+        "--retry-after", type=float, default=1.0, help="Seconds named in 429 responses"
+    )
+    stub_parser.add_argument(
+        "--drop-rate", type=float, default=0.0, help="Share of connections dropped unanswered"
+    )
+    stub_parser.add_argument(
+        "--truncate-rate",
+        type=float,
+        default=0.0,
+        help="Share of completions cut off (finish_reason=length)",
+    )
+    stub_parser.add_argument("--seed", type=int, help="RNG seed for reproducible faults")
+
+    bench_parser = subparsers.add_parser(
+        "bench", help="Benchmark prompts, parsing, filtering and embedding dedupe"
+    )
+    bench_parser.add_argument(
+        "--out", default="out/bench/latest.json", help="Where to write the JSON results"
+    )
+    bench_parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    bench_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help="Slowdown ratio over the baseline median that counts as a regression",
+    )
+    bench_parser.add_argument("--only", help="Only run cases whose name contains this text")
+    bench_parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    bench_parser.add_argument(
+        "--quick", action="store_true", help="Smaller inputs for a fast smoke run"
+    )
+    bench_parser.add_argument(
+        "--json",
+        dest="output_json",
+        action="store_true",
+        help="JSON output to stdout",
+    )
+
     return parser
 
 
@@ -149,6 +294,26 @@ def _apply_run_overrides(settings: Settings, args: argparse.Namespace) -> Settin
         )
     if args.embedding_history_max is not None:
         settings = replace(settings, embedding_history_max=args.embedding_history_max)
+    if args.embedding_ann is not None:
+        settings = replace(settings, embedding_ann_enabled=args.embedding_ann)
+    if args.crew_concurrency is not None:
+        settings = replace(settings, crew_concurrency=max(1, args.crew_concurrency))
+    if args.crew_group_size is not None:
+        settings = replace(settings, crew_group_size=max(1, args.crew_group_size))
+    if args.ladder_speculation is not None:
+        settings = replace(settings, ladder_speculation=max(1, args.ladder_speculation))
+    if args.local_poster is not None:
+        settings = replace(settings, local_poster=args.local_poster)
+    if args.hybrid_review is not None:
+        settings = replace(settings, hybrid_review=args.hybrid_review)
+    if args.llm_cache:
+        settings = replace(settings, llm_cache_mode=args.llm_cache)
+    if args.llm_hedging is not None:
+        settings = replace(settings, llm_hedging=args.llm_hedging)
+    if args.max_wall_time is not None:
+        settings = replace(settings, max_wall_time_seconds=max(0.0, args.max_wall_time))
+    if args.history_backend:
+        settings = replace(settings, history_backend=args.history_backend)
     if args.log_json is not None:
         settings = replace(settings, log_json=args.log_json)
     if args.log_dir:
@@ -179,6 +344,32 @@ def _format_history_output(changed: int, *, output_json: bool) -> str:
     return f"Updated {changed} history entries"
 
 
+def _format_migrate_output(added: int, path: str, *, output_json: bool) -> str:
+    if output_json:
+        return json.dumps({"imported": added, "path": path}, ensure_ascii=False)
+    return f"Imported {added} history entries into {path}"
+
+
+def _format_bench_output(
+    results: dict, regressions: list[dict], path: str, *, output_json: bool
+) -> str:
+    if output_json:
+        return json.dumps(
+            {"path": path, "results": results["results"], "regressions": regressions},
+            ensure_ascii=False,
+        )
+    lines = [
+        f"{name:<36} {case['median_ms']:>12.3f} ms" for name, case in results["results"].items()
+    ]
+    for regression in regressions:
+        lines.append(
+            f"REGRESSION {regression['case']}: {regression['baseline_ms']:.3f} ms -> "
+            f"{regression['current_ms']:.3f} ms (x{regression['ratio']})"
+        )
+    lines.append(f"Wrote {path}")
+    return "\n".join(lines)
+
+
 def main() -> int:
     parser = _build_parser()
     args = parser.parse_args()
@@ -189,11 +380,55 @@ def main() -> int:
 
     if args.command == "fix-history":
         settings = load_settings()
-        out_dir = args.out_dir or settings.out_dir
-        changed = fix_history_unknown_types(out_dir, fallback_type=args.fallback_type)
+        if args.history_backend:
+            settings = replace(settings, history_backend=args.history_backend)
+        history = open_history_store(settings, args.out_dir)
+        try:
+            changed = history.fix_unknown_types(args.fallback_type, full=args.full)
+        finally:
+            history.close()
         print(_format_history_output(changed, output_json=args.output_json))
         return EXIT_OK
 
+    if args.command == "migrate-history":
+        settings = load_settings()
+        out_dir = Path(args.out_dir or settings.out_dir)
+        store = SqliteHistoryStore(out_dir / SQLITE_FILE)
+        try:
+            added = store.migrate_from_jsonl(out_dir / JSONL_FILE)
+        finally:
+            store.close()
+        print(_format_migrate_output(added, str(store.path), output_json=args.output_json))
+        return EXIT_OK
+
+    if args.command == "stub-server":
+        config = StubConfig(
+            latency=args.latency,
+            rate_limit_rate=args.rate_limit_rate,
+            retry_after=args.retry_after,
+            drop_rate=args.drop_rate,
+            truncate_rate=args.truncate_rate,
+            seed=args.seed,
+        )
+        server = StubServer(config, host=args.host, port=args.port)
+        print(f"Stub server listening on {server.base_url}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return EXIT_OK
+
+    if args.command == "bench":
+        results = run_benchmarks(quick=args.quick, only=args.only, repeat=max(1, args.repeat))
+        save_results(args.out, results)
+        regressions = (
+            compare_results(load_results(args.baseline), results, threshold=args.threshold)
+            if args.baseline
+            else []
+        )
+        print(_format_bench_output(results, regressions, args.out, output_json=args.output_json))
+        return EXIT_REGRESSION if regressions else EXIT_OK
+
     if args.command == "run":
         settings = _apply_run_overrides(load_settings(), args)
         result = run_generate_tweets_crewai(settings, dry_run=args.dry_run)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from crewx.config import Settings
+
+# One text per active bucket so every generated tweet can pass the batch filters.
+_BUCKET_TEXTS = {
+    "boarding_gate": "Wenn am Gate 12 das Boarding startet, halte den Pass bereit.",
+    "gepaeck_handgepaeck": "Vor dem Flug den Koffer wiegen: 23 kg sind oft das Limit.",
+    "checkin_sitzplatz": "Beim Check-in 24 Stunden vor dem Flug den Sitzplatz sichern.",
+    "wetter_irrops": "Wenn Gewitter den Flug verzögern, frag nach 2 Stunden nach Essen.",
+    "streik": "Bei Streik am Flughafen den Flugstatus 3 Stunden vorher prüfen.",
+}
+
+
+@pytest.fixture
+def bucket_texts() -> dict[str, str]:
+    """Canned tweet text per active bucket, keyed by bucket name."""
+    return dict(_BUCKET_TEXTS)
+
+
+@pytest.fixture
+def make_settings(tmp_path):
+    """Builds ``Settings`` for an offline run under ``tmp_path``; keywords override fields."""
+
+    def _make(**overrides) -> Settings:
+        values = dict(
+            openai_api_base="http://localhost:9",
+            openai_api_key="test",
+            openai_model_name="gpt-4.1-mini",
+            out_dir=str(tmp_path / "out"),
+            n_tweets=4,
+            embedding_model_name=None,
+            forced_tweet_types=("educational", "fun_fact", "travel_hack", "faq"),
+            log_json=False,
+        )
+        values.update(overrides)
+        return Settings(**values)
+
+    return _make
+
+
+@pytest.fixture
+def pipeline_events(caplog, monkeypatch):
+    """Structured log events by name; setup_logging stops ``crewx`` from propagating."""
+    logger = logging.getLogger("crewx")
+    monkeypatch.setattr(logger, "propagate", False)
+    logger.addHandler(caplog.handler)
+    caplog.set_level("INFO", logger="crewx")
+    yield lambda name: [r.extra_data for r in caplog.records if r.getMessage() == name]
+    logger.removeHandler(caplog.handler)
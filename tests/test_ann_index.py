@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+import numpy as np
+
+from crewx import embedding_cache
+from crewx.ann_index import HistoryAnnIndex, sync_history_index
+
+
+def _random_vectors(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def test_ann_index_finds_near_duplicates_across_reloads(tmp_path):
+    data = _random_vectors(3000, 32)
+    index = HistoryAnnIndex(tmp_path, model="m", n_tables=12, n_bits=8)
+    index.add(data[:2000])
+    index.save()
+    index.add(data[2000:])
+
+    rng = np.random.default_rng(1)
+    near = data[123] + 0.05 * rng.standard_normal(32).astype(np.float32)
+    assert index.any_above(near, 0.9)
+    assert index.any_above(data[2500], 0.99)
+    assert not index.any_above(rng.standard_normal(32), 0.9)
+
+    index.save()
+    reloaded = HistoryAnnIndex(tmp_path, model="m", n_tables=12, n_bits=8)
+    assert len(reloaded) == 3000
+    assert reloaded.any_above(near, 0.9)
+    assert reloaded.any_above(data[2999], 0.99)
+
+    other_model = HistoryAnnIndex(tmp_path, model="other", n_tables=12, n_bits=8)
+    assert len(other_model) == 0
+
+
+def test_sync_history_index_is_incremental(tmp_path, monkeypatch):
+    calls: list[list[str]] = []
+
+    def fake_embedding(*, model, input, api_key, api_base, client=None):
+        calls.append(list(input))
+        return {"data": [{"embedding": [float(len(t)), 1.0, 0.5]} for t in input]}
+
+    monkeypatch.setattr("crewx.embeddings.litellm_embedding", fake_embedding)
+    monkeypatch.setattr(embedding_cache, "_caches", {})
+    settings = SimpleNamespace(
+        out_dir=str(tmp_path),
+        embedding_model_name="m",
+        embedding_api_key="k",
+        embedding_api_base="http://localhost",
+        openai_api_key="k",
+        openai_api_base="http://localhost",
+        embedding_cache_max=0,
+    )
+    history = tmp_path / "history.jsonl"
+    history.write_text(
+        "\n".join(json.dumps({"text": t}) for t in ["eins", "zwei", ""]) + "\n",
+        encoding="utf-8",
+    )
+    index = HistoryAnnIndex(tmp_path / "ann", model="m")
+    assert sync_history_index(index, history, settings) == 2
+
+    with history.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps({"text": "drei"}) + "\n")
+    reloaded = HistoryAnnIndex(tmp_path / "ann", model="m")
+    assert sync_history_index(reloaded, history, settings) == 1
+    assert calls[-1] == ["drei"]
+    assert len(reloaded) == 3
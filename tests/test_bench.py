@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from crewx.bench import compare_results, run_benchmarks, synthetic_candidates
+
+
+def test_synthetic_data_is_seeded():
+    assert synthetic_candidates(5) == synthetic_candidates(5)
+
+
+def test_run_benchmarks_filters_cases():
+    results = run_benchmarks(quick=True, only="filter.10x", repeat=1)
+    assert set(results["results"]) == {"filter.10x50", "filter.10x1000"}
+    assert results["results"]["filter.10x50"]["median_ms"] >= 0
+
+
+def test_compare_results_flags_slowdowns_only():
+    baseline = {"results": {"a": {"median_ms": 1.0}, "b": {"median_ms": 2.0}}}
+    current = {
+        "results": {"a": {"median_ms": 1.5}, "b": {"median_ms": 2.1}, "new": {"median_ms": 9.0}}
+    }
+    regressions = compare_results(baseline, current, threshold=0.25)
+    assert [r["case"] for r in regressions] == ["a"]
+    assert regressions[0]["ratio"] == 1.5
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+
+import pytest
+
+from crewx import crew_pipeline
+from crewx.errors import CircuitOpenError
+from crewx.retry import kickoff_with_retry
+
+
+class FakeKickoff:
+    """Stands in for ``kickoff_with_retry``: answers each crew with one tweet per type."""
+
+    def __init__(
+        self, bucket_texts: dict[str, str], delay: float = 0.0, *, stall_first: float = 0.0
+    ) -> None:
+        self.delay = delay
+        self.stall_first = stall_first
+        self.release = threading.Event()
+        self.calls = 0
+        self.task_counts: list[int] = []
+        self.kwargs: list[dict] = []
+        self.crews: list = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._buckets = iter(bucket_texts.items())
+
+    def __call__(self, crew, **kwargs) -> str:
+        with self._lock:
+            self.calls += 1
+            self.task_counts.append(len(crew.tasks))
+            self.kwargs.append(kwargs)
+            self.crews.append(crew)
+            call = self.calls
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if call == 1 and self.stall_first:
+                # The first crew hangs until released (at most ``stall_first`` seconds) and
+                # then answers with something unparseable.
+                self.release.wait(self.stall_first)
+                return "no json here"
+            time.sleep(self.delay)
+            prompt = crew.tasks[0].description
+            types = re.search(r"REQUIRED TYPES: (.+)", prompt).group(1).split(", ")
+            tweets = []
+            with self._lock:
+                for tweet_type in types:
+                    bucket, text = next(self._buckets)
+                    tweets.append(
+                        {
+                            "tweet_type": tweet_type.strip(),
+                            "opening_style": "tip",
+                            "text": text,
+                            "language": "de",
+                            "tags": [bucket],
+                        }
+                    )
+            return json.dumps(tweets, ensure_ascii=False)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def test_concurrent_sub_crews_merge_results(make_settings, bucket_texts, monkeypatch):
+    fake = FakeKickoff(bucket_texts, delay=0.2)
+    monkeypatch.setattr(crew_pipeline, "kickoff_with_retry", fake)
+    settings = make_settings(crew_concurrency=4, crew_group_size=1)
+
+    result = crew_pipeline.run_generate_tweets_crewai(settings, dry_run=True)
+
+    assert fake.calls == 4
+    assert fake.max_active > 1
+    assert result["output_count"] == 4
+
+
+def test_local_poster_drops_the_poster_task(make_settings, bucket_texts, monkeypatch):
+    fake = FakeKickoff(bucket_texts)
+    monkeypatch.setattr(crew_pipeline, "kickoff_with_retry", fake)
+
+    result = crew_pipeline.run_generate_tweets_crewai(
+        make_settings(local_poster=True), dry_run=True
+    )
+
+    assert fake.task_counts == [2]
+    assert result["output_count"] == 4
+
+
+def test_each_role_draws_from_its_own_models_rate_limit(
+    make_settings, bucket_texts, tmp_path, monkeypatch
+):
+    fake = FakeKickoff(bucket_texts)
+    monkeypatch.setattr(crew_pipeline, "kickoff_with_retry", fake)
+    settings = make_settings(
+        reviewer_model="gpt-4.1-nano", rate_limit_rpm=500, rate_limit_tpm=200_000
+    )
+
+    result = crew_pipeline.run_generate_tweets_crewai(settings, dry_run=True)
+
+    (crew,) = fake.crews
+    limits = {task.agent.llm.model: task.agent.llm.rate_limit for task in crew.tasks}
+    assert set(limits) == {"gpt-4.1-mini", "gpt-4.1-nano"}
+    assert all(limit.model == model and limit.tpm == 200_000 for model, limit in limits.items())
+    # The LLM calls charge the limiter themselves, so the kickoff does not charge it again.
+    assert "rate_limit" not in fake.kwargs[0]
+    assert (tmp_path / "out" / "rate_limit.sqlite3").exists()
+    assert result["output_count"] == 4
+
+
+def test_open_circuit_aborts_the_run_with_retry_stats(make_settings, monkeypatch, pipeline_events):
+    class DownCrew:
+        tasks = ["generate"]
+        calls = 0
+
+        def kickoff(self):
+            DownCrew.calls += 1
+            raise Exception("Connection error")
+
+    monkeypatch.setattr("crewx.retry.time.sleep", lambda _: None)
+    monkeypatch.setattr(
+        crew_pipeline,
+        "kickoff_with_retry",
+        lambda crew, **kwargs: kickoff_with_retry(DownCrew(), **kwargs),
+    )
+    closed: list[bool] = []
+    open_history_store = crew_pipeline.open_history_store
+
+    def tracking_open(settings):
+        store = open_history_store(settings)
+        close = store.close
+
+        def tracking_close():
+            closed.append(True)
+            close()
+
+        store.close = tracking_close
+        return store
+
+    monkeypatch.setattr(crew_pipeline, "open_history_store", tracking_open)
+    with pytest.raises(CircuitOpenError):
+        crew_pipeline.run_generate_tweets_crewai(
+            make_settings(circuit_breaker_threshold=2), dry_run=True
+        )
+
+    # The breaker opened inside the first level; no later level reached the provider.
+    assert DownCrew.calls == 2
+    (aborted,) = pipeline_events("run_aborted")
+    assert aborted["circuit_open"] is True
+    assert aborted["connection_errors"] == 2
+    assert closed == [True]
+
+
+def test_roles_route_to_their_own_models(make_settings, bucket_texts, tmp_path, monkeypatch):
+    roles_md = tmp_path / "crew_roles.md"
+    roles_md.write_text(
+        "# Crew Roles\n\n## reviewer\n\nRole: Reviewer\nModel: gpt-4o\n\nGoal:\nReview.\n\n"
+        "Backstory:\nStrict.\n\n## poster\n\nRole: Poster\nModel: gpt-4o\n",
+        encoding="utf-8",
+    )
+    models: list[list[str]] = []
+    fake = FakeKickoff(bucket_texts)
+
+    def kickoff(crew, **kwargs):
+        models.append([agent.llm.model for agent in crew.agents])
+        return fake(crew, **kwargs)
+
+    monkeypatch.setattr(crew_pipeline, "kickoff_with_retry", kickoff)
+    settings = make_settings(crew_roles_md_path=str(roles_md), poster_model="gpt-4o-mini")
+
+    result = crew_pipeline.run_generate_tweets_crewai(settings, dry_run=True)
+
+    assert models == [["gpt-4.1-mini", "gpt-4o", "gpt-4o-mini"]]
+    assert crew_pipeline._parse_roles_md(roles_md.read_text())["reviewer"]["backstory"] == "Strict."
+    assert result["output_count"] == 4
+
+
+def test_speculative_ladder_takes_the_first_accepted_level(
+    make_settings, bucket_texts, monkeypatch
+):
+    fake = FakeKickoff(bucket_texts, stall_first=60.0)
+    monkeypatch.setattr(crew_pipeline, "kickoff_with_retry", fake)
+    settings = make_settings(ladder_speculation=2)
+
+    result = crew_pipeline.run_generate_tweets_crewai(settings, dry_run=True)
+
+    # The run returned while the first level's kickoff was still stalled.
+    assert fake.active == 1
+    assert result["output_count"] == 4
+    # Once released, the losing level finishes its kickoff but starts no review-only fallback.
+    fake.release.set()
+    deadline = time.monotonic() + 5
+    while fake.active and time.monotonic() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.1)
+    assert fake.calls == 2
+    assert all(kwargs["cancel"].is_set() for kwargs in fake.kwargs)
+
+
+def test_split_type_groups_shares_out_tweets():
+    types = [crew_pipeline.TweetType(name=f"t{i}", goal="", style=[], rules=[]) for i in range(5)]
+    groups = crew_pipeline._split_type_groups(types, 5, 2)
+    assert [len(g) for g, _ in groups] == [2, 2, 1]
+    assert [n for _, n in groups] == [2, 2, 1]
+    assert crew_pipeline._split_type_groups(types, 5, 10) == [(types, 5)]
+
+
+def test_hybrid_review_skips_reviewer_when_all_pass(make_settings, bucket_texts, monkeypatch):
+    fake = FakeKickoff(bucket_texts)
+    monkeypatch.setattr(crew_pipeline, "kickoff_with_retry", fake)
+
+    result = crew_pipeline.run_generate_tweets_crewai(
+        make_settings(hybrid_review=True), dry_run=True
+    )
+
+    assert fake.task_counts == [1]
+    assert result["output_count"] == 4
+
+
+def test_hybrid_review_sends_only_violators(make_settings, bucket_texts, monkeypatch):
+    fake = FakeKickoff(bucket_texts)
+    prompts: list[str] = []
+
+    def kickoff(crew, **kwargs):
+        prompt = crew.tasks[0].description
+        if "REQUIRED TYPES" not in prompt:
+            prompts.append(prompt)
+            fixed = json.loads(prompt.splitlines()[-1])
+            fixed["text"] = fixed["text"].replace(" #Reisen", "")
+            fixed.pop("problems")
+            return json.dumps([fixed], ensure_ascii=False)
+        tweets = json.loads(fake(crew, **kwargs))
+        tweets[0]["text"] += " #Reisen"
+        return json.dumps(tweets, ensure_ascii=False)
+
+    monkeypatch.setattr(crew_pipeline, "kickoff_with_retry", kickoff)
+
+    result = crew_pipeline.run_generate_tweets_crewai(
+        make_settings(hybrid_review=True), dry_run=True
+    )
+
+    assert len(prompts) == 1
+    assert "#Reisen" in prompts[0]
+    assert "hashtag outside a marketing tweet" in prompts[0]
+    assert sum(line.startswith("{") for line in prompts[0].splitlines()) == 1
+    assert result["output_count"] == 4
+
+
+def test_token_budget_sizes_max_tokens_and_falls_back_to_smallest_level(
+    make_settings, bucket_texts, monkeypatch, pipeline_events
+):
+    fake = FakeKickoff(bucket_texts)
+    max_tokens: list[int] = []
+
+    def kickoff(crew, **kwargs):
+        max_tokens.append(crew.agents[0].llm.max_tokens)
+        return fake(crew, **kwargs)
+
+    monkeypatch.setattr(crew_pipeline, "kickoff_with_retry", kickoff)
+
+    result = crew_pipeline.run_generate_tweets_crewai(
+        make_settings(llm_context_window=500), dry_run=True
+    )
+
+    budget = pipeline_events("token_budget")[0]
+    assert budget["fitting"] == 0
+    assert budget["context_window"] == 500
+    assert max_tokens == [crew_pipeline.output_tokens_for(4)]
+    assert result["output_count"] == 4
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from crewx import embedding_cache
+from crewx.embedding_cache import EmbeddingCache, text_key
+from crewx.embeddings import embed_texts
+
+
+def _settings(out_dir, *, cache_max=100):
+    return SimpleNamespace(
+        out_dir=str(out_dir),
+        embedding_model_name="test-embed",
+        embedding_api_key="key",
+        embedding_api_base="http://localhost",
+        openai_api_key="key",
+        openai_api_base="http://localhost",
+        embedding_cache_max=cache_max,
+    )
+
+
+def test_text_key_normalizes_whitespace():
+    assert text_key("Wenn  dein\nFlug ") == text_key("Wenn dein Flug")
+    assert text_key("Wenn dein Flug") != text_key("wenn dein flug")
+
+
+def test_cache_roundtrip_and_lru_eviction(tmp_path):
+    cache = EmbeddingCache(tmp_path, "m", max_entries=2)
+    cache.put_many(["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+    cache.save()
+    assert cache.get_many(["a"])[0] is not None
+    cache.put_many(["c"], [[0.5, 0.5]])
+    cache.save()
+
+    reloaded = EmbeddingCache(tmp_path, "m", max_entries=2)
+    found = reloaded.get_many(["a", "b", "c"])
+    assert found[1] is None
+    assert np.allclose(found[0], [1.0, 0.0])
+    assert np.allclose(found[2], [0.5, 0.5])
+    assert any(tmp_path.glob("*/vectors.npy"))
+
+
+def test_embed_texts_only_requests_misses(tmp_path, monkeypatch):
+    calls: list[list[str]] = []
+
+    def fake_embedding(*, model, input, api_key, api_base, client=None):
+        calls.append(list(input))
+        return {"data": [{"embedding": [float(len(t)), 1.0]} for t in input]}
+
+    monkeypatch.setattr("crewx.embeddings.litellm_embedding", fake_embedding)
+    monkeypatch.setattr(embedding_cache, "_caches", {})
+    settings = _settings(tmp_path)
+
+    first = embed_texts(["eins", "zwei", "eins"], settings)
+    assert calls == [["eins", "zwei"]]
+    assert first[0] == first[2] == [4.0, 1.0]
+
+    # A fresh process (empty in-memory registry) reads the on-disk store.
+    monkeypatch.setattr(embedding_cache, "_caches", {})
+    second = embed_texts(["zwei", "drei"], settings)
+    assert calls[1:] == [["drei"]]
+    assert second == [[4.0, 1.0], [4.0, 1.0]]
+
+
+def test_saves_append_shards_and_compact_only_on_eviction(tmp_path):
+    cache = EmbeddingCache(tmp_path, "m", max_entries=3)
+    cache.put_many(["a"], [[1.0, 0.0]])
+    cache.save()
+    cache.put_many(["b"], [[0.0, 1.0]])
+    cache.save()
+    assert len(list(tmp_path.glob("*/shard-*.npy"))) == 2
+    assert not any(tmp_path.glob("*/vectors.npy"))
+
+    reloaded = EmbeddingCache(tmp_path, "m", max_entries=3)
+    assert np.allclose(reloaded.get_many(["b"])[0], [0.0, 1.0])
+    reloaded.put_many(["c", "d"], [[0.5, 0.5], [0.2, 0.8]])
+    reloaded.save()
+    assert not any(tmp_path.glob("*/shard-*.npy"))
+
+    compacted = EmbeddingCache(tmp_path, "m", max_entries=3)
+    assert len(compacted) == 3
+    assert compacted.get_many(["a"]) == [None]
+
+
+def test_corrupt_index_starts_empty(tmp_path):
+    cache = EmbeddingCache(tmp_path, "m")
+    cache.put_many(["a"], [[1.0, 0.0]])
+    cache.save()
+    (cache.path / "index.json").write_text("[1, 2]", encoding="utf-8")
+
+    assert len(EmbeddingCache(tmp_path, "m")) == 0
+
+
+def test_embed_texts_without_store_does_not_cache(tmp_path, monkeypatch):
+    calls: list[list[str]] = []
+
+    def fake_embedding(*, model, input, api_key, api_base, client=None):
+        calls.append(list(input))
+        return {"data": [{"embedding": [float(len(t)), 1.0]} for t in input]}
+
+    monkeypatch.setattr("crewx.embeddings.litellm_embedding", fake_embedding)
+    monkeypatch.setattr(embedding_cache, "_caches", {})
+    settings = _settings(tmp_path)
+
+    embed_texts(["eins"], settings)
+    assert embed_texts(["eins", "kandidat"], settings, store=False) == [[4.0, 1.0], [8.0, 1.0]]
+    embed_texts(["kandidat"], settings, store=False)
+    assert calls == [["eins"], ["kandidat"], ["kandidat"]]
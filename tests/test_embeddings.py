@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from crewx.embeddings import (
+    HashedNgramEmbeddingBackend,
+    SimilarityIndex,
+    cosine_similarity,
+    embed_texts,
+    get_embedding_backend,
+)
+
+
+def test_similarity_index_matches_cosine_similarity():
+    rng = random.Random(7)
+    history = [[rng.uniform(-1, 1) for _ in range(32)] for _ in range(50)]
+    query = [rng.uniform(-1, 1) for _ in range(32)]
+    index = SimilarityIndex(history)
+    expected = max(cosine_similarity(query, h) for h in history)
+    assert index.max_similarity(query) == pytest.approx(expected, abs=1e-5)
+
+
+def test_similarity_index_grows_and_ignores_bad_vectors():
+    index = SimilarityIndex()
+    assert index.max_similarity([1.0, 0.0]) == 0.0
+    for i in range(40):
+        index.add([1.0, float(i)])
+    index.add([0.0, 0.0])
+    index.add([1.0, 0.0, 0.0])
+    assert len(index) == 40
+    assert index.any_above([1.0, 0.0], 0.99)
+    assert not index.any_above([1.0, 0.0, 0.0], 0.5)
+
+
+def _local_settings(model="local:ngram-256"):
+    return SimpleNamespace(embedding_model_name=model, out_dir="unused", embedding_cache_max=100)
+
+
+def test_local_ngram_backend_is_deterministic_and_offline(monkeypatch):
+    def fail(**_kwargs):
+        raise AssertionError("local backend must not call the provider")
+
+    monkeypatch.setattr("crewx.embeddings.litellm_embedding", fail)
+    texts = [
+        "Wenn dein Flug am Gate verspätet ist, frag nach Betreuung.",
+        "Wenn dein Flug am Gate verspätet ist, frag nach der Betreuung!",
+        "Streik am Flughafen: Umbuchung früh anfragen.",
+    ]
+    first = embed_texts(texts, _local_settings())
+    assert first == embed_texts(texts, _local_settings())
+    assert len(first[0]) == 256
+    assert cosine_similarity(first[0], first[1]) > 0.85
+    assert cosine_similarity(first[0], first[2]) < 0.5
+
+
+def test_get_embedding_backend_parses_local_spec():
+    backend = get_embedding_backend(_local_settings("local:ngram"))
+    assert isinstance(backend, HashedNgramEmbeddingBackend)
+    assert backend.dim == 512
+    with pytest.raises(ValueError):
+        get_embedding_backend(_local_settings("local:unknown"))
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import socket
+
+from crewx.endpoints import EndpointHealth, FailoverLLM, is_endpoint_failure
+from crewx.llm import build_llm
+from crewx.stub_server import StubConfig, StubServer
+
+_MESSAGES = [{"role": "user", "content": "Write one tweet.\nREQUIRED TYPES: faq"}]
+
+
+def _dead_endpoint() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/v1"
+
+
+def test_endpoint_health_cools_down_failing_endpoints():
+    now = [0.0]
+    health = EndpointHealth(cooldown=30.0, clock=lambda: now[0])
+    endpoints = ["a", "b", "c"]
+
+    health.mark_down("a")
+    now[0] = 5.0
+    health.mark_down("b")
+    assert health.order(endpoints) == ["c", "a", "b"]
+    now[0] = 31.0
+    assert health.order(endpoints) == ["a", "c", "b"]
+    assert is_endpoint_failure(Exception("Error code: 503 - Service Unavailable"))
+    assert not is_endpoint_failure(Exception("Error code: 400 - bad request"))
+
+
+def test_failover_skips_a_dead_endpoint_until_it_cools_down(make_settings):
+    dead = _dead_endpoint()
+    with StubServer(StubConfig()) as server:
+        settings = make_settings(
+            openai_api_base=dead,
+            openai_api_bases=(server.base_url,),
+            endpoint_cooldown_seconds=123.0,
+        )
+        llm = build_llm(settings)
+        assert isinstance(llm, FailoverLLM)
+        failovers = llm.health.failovers
+
+        assert "faq" in llm.call(_MESSAGES)
+        assert "faq" in build_llm(settings).call(_MESSAGES)
+
+        assert llm.health.is_down(dead)
+        # Only the first call paid for the dead endpoint.
+        assert llm.health.failovers - failovers == 1
+        assert server.stats["completions"] == 2
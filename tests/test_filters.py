@@ -1,6 +1,11 @@
 from __future__ import annotations
 
-from crewx.filters import accept_relaxed_candidate, filter_crewai_tweets, normalize_candidate_fields
+from crewx.filters import (
+    accept_relaxed_candidate,
+    filter_crewai_tweets,
+    normalize_candidate_fields,
+    prescreen_candidates,
+)
 
 
 def test_normalize_candidate_fields_adds_defaults():
@@ -30,6 +35,19 @@ def test_accept_relaxed_candidate_allows_valid():
     assert accept_relaxed_candidate(tweet, allowed_types=None, type_limits=None) is True
 
 
+def test_prescreen_candidates_splits_local_violations():
+    clean = {"tweet_type": "faq", "text": "Wenn du am Gate bist, frag nach Betreuung."}
+    long = {"tweet_type": "faq", "text": "Am Gate warten. " * 20}
+    opening = {"tweet_type": "faq", "text": "Wussten Sie, dass das Gate wechseln kann?"}
+    tagged = {"tweet_type": "marketing", "text": "Gate prüfen #a #b #c"}
+    passed, failing = prescreen_candidates([clean, long, opening, tagged, {"text": ""}])
+    assert passed == [clean]
+    assert [t for t, _ in failing] == [long, opening, tagged]
+    assert failing[0][1] == ["longer than 240 characters"]
+    assert failing[1][1] == ["banned opening"]
+    assert failing[2][1] == ["more than 2 hashtags"]
+
+
 def test_filter_crewai_tweets_bucket_dedupe_and_cta_rules():
     tweets = [
         {
@@ -141,3 +159,39 @@ def test_filter_crewai_tweets_doc_tip_blocked_by_recent():
 
     assert len(filtered) == 1
     assert filtered[0]["text"].startswith("Wenn dein Flug wegen Streik")
+
+
+def test_filter_crewai_tweets_embedding_dedupe():
+    tweets = [
+        {
+            "tweet_type": "service",
+            "text": "Wenn dein Flug am Gate ist, frag nach Betreuung.",
+            "tags": ["boarding_gate"],
+        },
+        {
+            "tweet_type": "service",
+            "text": "Wenn dein Flug wegen Streik ausfällt, frag nach Ersatz.",
+            "tags": ["streik"],
+        },
+        {
+            "tweet_type": "fun_fact",
+            "text": "Wenn dein Koffer nach dem Flug fehlt, geh zum Schalter.",
+            "tags": ["gepaeck_handgepaeck"],
+        },
+    ]
+    candidate_embeddings = {
+        tweets[0]["text"]: [1.0, 0.0, 0.0],
+        tweets[1]["text"]: [0.0, 1.0, 0.0],
+        tweets[2]["text"]: [0.0, 0.9, 0.1],
+    }
+
+    filtered = filter_crewai_tweets(
+        tweets,
+        recent_texts=[],
+        max_travel_hack=1,
+        embedding_threshold=0.9,
+        recent_embeddings=[[0.99, 0.05, 0.0]],
+        candidate_embeddings=candidate_embeddings,
+    )
+
+    assert [t["text"] for t in filtered] == [tweets[1]["text"]]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import time
+
+from crewx import crew_pipeline
+from crewx.hedging import MIN_LATENCY_SAMPLES, HedgeTracker, get_hedge_tracker
+from crewx.llm import build_llm
+from crewx.rate_limiter import chat_rate_limit
+from crewx.stub_server import StubConfig, StubServer
+
+_MESSAGES = [{"role": "user", "content": "Write one tweet.\nREQUIRED TYPES: educational"}]
+
+
+def test_hedge_delay_follows_the_latency_percentile():
+    tracker = HedgeTracker(percentile=0.9, initial_delay=3.0)
+    assert tracker.hedge_delay() == 3.0
+    for seconds in [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 5.0]:
+        tracker.record_latency(seconds)
+    assert MIN_LATENCY_SAMPLES <= 10
+    assert tracker.hedge_delay() == 0.9
+
+
+def _hedge_settings(make_settings, slow: StubServer, fast: StubServer, **overrides):
+    values = dict(
+        openai_api_base=slow.base_url,
+        llm_hedging=True,
+        llm_hedge_delay=0.05,
+        llm_hedge_percentile=0.5,
+        llm_hedge_api_base=fast.base_url,
+    )
+    values.update(overrides)
+    return make_settings(**values)
+
+
+def test_slow_primary_is_hedged_to_the_secondary(make_settings):
+    with (
+        StubServer(StubConfig(latency="0.6")) as slow,
+        StubServer(StubConfig(latency="0")) as fast,
+    ):
+        settings = _hedge_settings(make_settings, slow, fast)
+        tracker = get_hedge_tracker(settings)
+        before = tracker.stats()
+
+        response = build_llm(settings).call(_MESSAGES)
+
+        # The fast secondary answered while the primary was still sleeping.
+        assert slow.stats["completions"] == 0
+        assert json.loads(response)[0]["tweet_type"] == "educational"
+        # The abandoned primary still finishes and reports how much time the hedge saved.
+        deadline = time.monotonic() + 5
+        while slow.stats["completions"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.05)
+        after = tracker.stats()
+        assert fast.stats["completions"] == 1
+    assert after["hedged"] - before["hedged"] == 1
+    assert after["hedge_wins"] - before["hedge_wins"] == 1
+    assert after["hedge_latency_saved_seconds"] - before["hedge_latency_saved_seconds"] > 0.3
+
+
+def test_hedge_is_skipped_when_the_shared_rate_limit_is_spent(make_settings):
+    with (
+        StubServer(StubConfig(latency="0.3")) as slow,
+        StubServer(StubConfig(latency="0")) as fast,
+    ):
+        settings = _hedge_settings(
+            make_settings, slow, fast, llm_hedge_model="gpt-4.1-nano", rate_limit_rpm=1
+        )
+        # The hedge model's only request this minute is already taken by another call.
+        assert chat_rate_limit(settings, "gpt-4.1-nano").try_acquire()
+        tracker = get_hedge_tracker(settings)
+        before = tracker.stats()
+
+        response = build_llm(settings).call(_MESSAGES)
+
+        after = tracker.stats()
+        assert json.loads(response)[0]["tweet_type"] == "educational"
+        assert fast.stats["requests"] == 0
+    assert after["hedged"] == before["hedged"]
+    assert after["hedges_rate_limited"] - before["hedges_rate_limited"] == 1
+
+
+def test_pipeline_reports_hedging_in_run_metrics(make_settings, monkeypatch, pipeline_events):
+    monkeypatch.setenv("CREWAI_DISABLE_TELEMETRY", "true")
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    with (
+        StubServer(StubConfig(latency="0.5")) as slow,
+        StubServer(StubConfig(latency="0", seed=1)) as fast,
+    ):
+        settings = _hedge_settings(make_settings, slow, fast, llm_hedge_delay=0.1)
+        result = crew_pipeline.run_generate_tweets_crewai(settings, dry_run=True)
+
+    (metrics,) = pipeline_events("run_metrics")
+    assert result["output_count"] == 4
+    assert metrics["hedge_calls"] == 3
+    assert metrics["hedged"] == 3
+    assert metrics["hedge_wins"] == 3
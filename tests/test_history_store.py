@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+from crewx.history_store import (
+    JsonlHistoryStore,
+    SqliteHistoryStore,
+    fix_history_unknown_types,
+    open_history_store,
+)
+
+
+def _line(text: str, tweet_type: str) -> str:
+    return json.dumps({"text": text, "tweet_type": tweet_type}, ensure_ascii=False) + "\n"
+
+
+def test_fix_history_rewrites_only_unknown_lines_and_keeps_watermark(tmp_path):
+    path = tmp_path / "history.jsonl"
+    kept = '{"text":  "spacing kept", "tweet_type": "fun_fact"}\n'
+    path.write_text(kept + _line("Koffer fehlt", "unknown") + "not json\n", encoding="utf-8")
+
+    assert fix_history_unknown_types(str(tmp_path)) == 1
+    lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    assert lines[0] == kept
+    assert json.loads(lines[1])["tweet_type"] == "educational"
+    assert lines[2] == "not json\n"
+
+    # Clean history: nothing is rewritten.
+    before = path.stat().st_mtime_ns
+    assert fix_history_unknown_types(str(tmp_path)) == 0
+    assert path.stat().st_mtime_ns == before
+
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write(_line("Gate geändert", "unknown"))
+    assert fix_history_unknown_types(str(tmp_path), fallback_type="fun_fact") == 1
+    assert json.loads(path.read_text(encoding="utf-8").splitlines()[-1])["tweet_type"] == "fun_fact"
+
+
+def test_fix_history_rechecks_a_rewritten_file(tmp_path):
+    path = tmp_path / "history.jsonl"
+    path.write_text(_line("a", "fun_fact"), encoding="utf-8")
+    assert fix_history_unknown_types(str(tmp_path)) == 0
+
+    # Rewritten under the watermark: the stored digest no longer matches.
+    path.write_text(_line("b", "unknown"), encoding="utf-8")
+    assert fix_history_unknown_types(str(tmp_path)) == 1
+    assert fix_history_unknown_types(str(tmp_path), full=True) == 0
+
+
+def test_sqlite_store_matches_jsonl_reads_and_migrates(tmp_path):
+    jsonl = JsonlHistoryStore(tmp_path)
+    entries = [
+        {"text": "Koffer fehlt am Band", "tweet_type": "unknown", "tags": ["gepaeck"]},
+        {"text": "Gate geändert", "tweet_type": "fun_fact"},
+        {"text": "", "tweet_type": "fun_fact"},
+    ]
+    jsonl.append(entries)
+
+    store = SqliteHistoryStore(tmp_path / "history.sqlite3")
+    assert store.migrate_from_jsonl(jsonl.path) == 3
+    assert store.migrate_from_jsonl(jsonl.path) == 0
+    assert store.count() == jsonl.count() == 3
+    assert (
+        store.recent_texts(5) == jsonl.recent_texts(5) == ["Gate geändert", "Koffer fehlt am Band"]
+    )
+
+    assert store.fix_unknown_types("educational") == 1
+    assert store.fix_unknown_types("educational") == 0
+    stored = [json.loads(row[0]) for row in store._conn.execute("SELECT data FROM history")]
+    assert stored[0]["tweet_type"] == "educational"
+
+    jsonl.append([{"text": "Neu", "tweet_type": "fun_fact"}])
+    assert store.migrate_from_jsonl(jsonl.path) == 1
+    assert [text for _, text in store.iter_texts_after(3)] == ["Neu"]
+    store.close()
+
+
+def test_open_history_store_migrates_into_a_new_sqlite_store(tmp_path):
+    JsonlHistoryStore(tmp_path).append([{"text": "eins"}, {"text": "zwei"}])
+    settings = SimpleNamespace(out_dir=str(tmp_path), history_backend="sqlite")
+
+    store = open_history_store(settings)
+    assert isinstance(store, SqliteHistoryStore)
+    assert store.recent_texts(1) == ["zwei"]
+    store.append([{"text": "drei", "tweet_type": "Fun_Fact"}])
+    assert store.count() == 3
+    store.close()
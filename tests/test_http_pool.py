@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from crewx.embeddings import embed_texts
+from crewx.http_pool import get_http_client, http_pool_stats
+from crewx.llm import build_llm
+from crewx.stub_server import StubConfig, StubServer
+
+_MESSAGES = [{"role": "user", "content": "Write one tweet.\nREQUIRED TYPES: educational"}]
+
+
+def test_completions_and_embeddings_share_one_keep_alive_pool(make_settings):
+    with StubServer(StubConfig(latency="0")) as stub:
+        settings = make_settings(
+            openai_api_base=stub.base_url,
+            embedding_model_name="text-embedding-3-small",
+            embedding_cache_max=0,
+            http_pool_size=4,
+            http_keepalive_expiry=17.0,
+        )
+        client = get_http_client(settings)
+        assert client is not None
+        before = http_pool_stats(settings)
+
+        llm = build_llm(settings)
+        assert llm._client._client is client
+        for _ in range(3):
+            llm.call(_MESSAGES)
+        for i in range(3):
+            assert embed_texts([f"text {i}"], settings)
+
+        stats = http_pool_stats(settings)
+        # The closing no-op keeps the pool alive for the next client that shares it.
+        client.close()
+        assert get_http_client(settings) is client
+    assert stub.stats["completions"] == 3
+    assert stub.stats["embeddings"] == 3
+    assert stats["http_requests"] - before["http_requests"] == 6
+    assert stats["http_connections_opened"] - before["http_connections_opened"] == 1
+    assert stats["http_connections_reused"] - before["http_connections_reused"] == 5
+
+
+def test_pool_size_zero_disables_the_shared_client(make_settings):
+    settings = make_settings(http_pool_size=0)
+    assert get_http_client(settings) is None
+    assert http_pool_stats(settings) == {}
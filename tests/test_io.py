@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import json
+
+from crewx.io import count_non_empty_lines, iter_lines_reversed, list_recent_tweet_texts
+
+
+def _write_history(path, texts):
+    with path.open("a", encoding="utf-8") as handle:
+        for text in texts:
+            handle.write(json.dumps({"text": text}, ensure_ascii=False) + "\n")
+
+
+def test_iter_lines_reversed_across_block_boundaries(tmp_path):
+    path = tmp_path / "history.jsonl"
+    lines = [f"zeile {i} " + "ä" * (i % 7) for i in range(200)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    reversed_lines = [line for line in iter_lines_reversed(path, block_size=16) if line]
+    assert reversed_lines == lines[::-1]
+
+
+def test_list_recent_tweet_texts_reads_newest_first(tmp_path):
+    _write_history(tmp_path / "history.jsonl", [f"tweet {i}" for i in range(100)])
+    assert list_recent_tweet_texts(str(tmp_path), limit=3) == ["tweet 99", "tweet 98", "tweet 97"]
+
+
+def test_count_non_empty_lines_tracks_appends_and_rewrites(tmp_path):
+    path = tmp_path / "history.jsonl"
+    _write_history(path, ["a", "b"])
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write("\n")
+    assert count_non_empty_lines(path) == 2
+
+    _write_history(path, ["c"])
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write('{"text": "partial"}')
+    assert count_non_empty_lines(path) == 4
+    assert json.loads((tmp_path / "history.jsonl.count.json").read_text())["lines"] == 3
+
+    path.write_text('{"text": "x"}\n', encoding="utf-8")
+    assert count_non_empty_lines(path) == 1
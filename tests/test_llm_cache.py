@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+from crewai.llms.base_llm import BaseLLM
+
+from crewx import crew_pipeline
+from crewx import llm as llm_module
+from crewx.errors import LLMCacheMissError
+from crewx.llm_cache import LLMResponseCache, request_key
+
+
+class FakeProvider(BaseLLM):
+    """Answers every request with one valid tweet per forced type."""
+
+    bucket_texts: dict[str, str] = {}
+    calls: int = 0
+
+    def call(self, messages, *args, **kwargs):
+        self.calls += 1
+        types = ("educational", "fun_fact", "travel_hack", "faq")
+        tweets = [
+            {"tweet_type": t, "opening_style": "tip", "text": text, "language": "de", "tags": [b]}
+            for t, (b, text) in zip(types, self.bucket_texts.items(), strict=False)
+        ]
+        return json.dumps(tweets, ensure_ascii=False)
+
+
+def test_response_cache_ttl_and_lru_eviction(tmp_path, monkeypatch):
+    cache = LLMResponseCache(tmp_path / "cache.sqlite3", max_entries=2, ttl_seconds=60)
+    key = request_key("m", 0.7, [{"role": "user", "content": "a"}])
+    assert key != request_key("m", 0.2, [{"role": "user", "content": "a"}])
+
+    cache.put(key, "m", "antwort")
+    cache.put("b", "m", "b")
+    assert cache.get(key) == "antwort"
+    cache.put("c", "m", "c")  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    assert cache.get(key) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_replay_runs_the_pipeline_offline(make_settings, bucket_texts, monkeypatch):
+    monkeypatch.setenv("CREWAI_DISABLE_TELEMETRY", "true")
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    providers: list[FakeProvider] = []
+
+    def fake_llm(**kwargs):
+        providers.append(
+            FakeProvider(
+                model=kwargs["model"],
+                temperature=kwargs["temperature"],
+                bucket_texts=bucket_texts,
+            )
+        )
+        return providers[-1]
+
+    monkeypatch.setattr(llm_module, "LLM", fake_llm)
+
+    recorded = crew_pipeline.run_generate_tweets_crewai(
+        make_settings(llm_cache_mode="record"), dry_run=True
+    )
+    live_calls = sum(p.calls for p in providers)
+    assert live_calls > 0
+
+    replayed = crew_pipeline.run_generate_tweets_crewai(
+        make_settings(llm_cache_mode="replay"), dry_run=True
+    )
+    assert sum(p.calls for p in providers) == live_calls
+    assert replayed["output_count"] == recorded["output_count"] == 4
+
+    with pytest.raises(LLMCacheMissError):
+        crew_pipeline.run_generate_tweets_crewai(
+            make_settings(llm_cache_mode="replay", temperature=0.1), dry_run=True
+        )
@@ -4,7 +4,7 @@ import json
 
 import pytest
 
-from crewx.parsing import parse_tweet_types_md, parse_tweets_response
+from crewx.parsing import parse_tweet_types_md, parse_tweets_response, prepare_post_queue
 
 
 def test_parse_tweet_types_md_basic():
@@ -87,3 +87,85 @@ def test_parse_tweets_response_mixed_types_and_default_type():
     assert parsed["tweets"][0]["tweet_type"] == "service"
     assert parsed["tweets"][0]["language"] == "de"
     assert parsed["tweets"][1]["tweet_type"] == "service"
+
+
+def test_parse_tweets_response_skips_stray_brackets_and_quotes():
+    tweet = {"tweet_type": "service", "text": 'Er sagte "Gate [B12]" und ging.', "tags": []}
+    raw = (
+        'Thought: check [the rules] and {draft} first. [Note: "quoted] text" ] [1, oops]\n'
+        + "Final Answer: "
+        + json.dumps([tweet], ensure_ascii=False)
+        + "\n} trailing ]"
+    )
+    parsed = parse_tweets_response(raw, n_tweets=1)
+    assert parsed["tweets"][0]["text"] == tweet["text"]
+
+
+@pytest.mark.parametrize("trailer", ["Note: max [2] retries", '["x"]'])
+def test_parse_tweets_response_prefers_tweets_object_over_later_array(trailer):
+    raw = json.dumps({"tweets": [{"text": "Wenn dein Flug am Gate ist."}]}) + "\n" + trailer
+    parsed = parse_tweets_response(raw, n_tweets=5)
+    assert [t["text"] for t in parsed["tweets"]] == ["Wenn dein Flug am Gate ist."]
+
+
+def test_parse_tweets_response_long_noisy_output():
+    noise = "see ] and [ and } and { [x] {y} " * 5000
+    raw = noise + json.dumps([{"tweet_type": "service", "text": "Wenn dein Flug ..."}])
+    parsed = parse_tweets_response(raw, n_tweets=1)
+    assert parsed["tweets"][0]["tweet_type"] == "service"
+
+
+def test_parse_tweets_response_salvages_truncated_array():
+    complete = [
+        {"tweet_type": "service", "text": "Wenn dein Flug am Gate ist, frag nach Betreuung."},
+        {"tweet_type": "fun_fact", "text": "Am Gate [B12] wird oft umgebucht.", "tags": []},
+    ]
+    raw = "Final Answer: " + json.dumps(complete)[:-1] + ', {"tweet_type": "marketing", "te'
+    with pytest.raises(ValueError):
+        parse_tweets_response(raw, n_tweets=5)
+
+    parsed = parse_tweets_response(raw, n_tweets=5, allow_truncated=True)
+    assert parsed["truncated"] is True
+    assert [t["text"] for t in parsed["tweets"]] == [t["text"] for t in complete]
+
+
+def test_parse_tweets_response_salvages_truncated_tweets_key():
+    raw = '[draft] {"tweets": [{"text": "Wenn dein Flug am Gate ist."}, {"text": "Wenn'
+    parsed = parse_tweets_response(raw, n_tweets=5, allow_truncated=True)
+    assert parsed["truncated"] is True
+    assert len(parsed["tweets"]) == 1
+
+
+def test_parse_tweets_response_cut_off_after_tags_is_truncated():
+    raw = '[{"text":"A.","tags":["gate"]}, {"text":"B.","tags":["boarding_gate","delay"]'
+    with pytest.raises(ValueError):
+        parse_tweets_response(raw, n_tweets=5)
+
+    parsed = parse_tweets_response(raw, n_tweets=5, allow_truncated=True)
+    assert parsed["truncated"] is True
+    assert [t["text"] for t in parsed["tweets"]] == ["A."]
+    assert parsed["tweets"][0]["tags"] == ["gate"]
+
+
+def test_parse_tweets_response_complete_output_not_truncated():
+    raw = json.dumps([{"text": "Wenn dein Flug am Gate ist."}])
+    parsed = parse_tweets_response(raw, n_tweets=5, allow_truncated=True)
+    assert parsed["truncated"] is False
+
+
+def test_prepare_post_queue_keeps_text_and_drops_repeats():
+    raw = json.dumps(
+        [
+            {
+                "tweet_type": "faq",
+                "text": "Gate 12 schließt  um 9 Uhr.",
+                "tags": ["#boarding_gate"],
+            },
+            {"tweet_type": "faq", "text": "gate 12 schließt um 9 uhr."},
+            {"tweet_type": "fun_fact", "text": "Koffer wiegen 23 kg."},
+        ]
+    )
+    parsed = parse_tweets_response(raw, n_tweets=5)
+    queue = prepare_post_queue(parsed["tweets"])
+    assert [t["text"] for t in queue] == ["Gate 12 schließt  um 9 Uhr.", "Koffer wiegen 23 kg."]
+    assert queue[0]["tags"] == parsed["tweets"][0]["tags"]
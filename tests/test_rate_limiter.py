@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import pytest
+
+from crewx.llm import build_llm
+from crewx.rate_limiter import ModelRateLimit, RateLimiter, chat_rate_limit
+from crewx.retry import is_rate_limit_error
+from crewx.stub_server import StubConfig, StubServer
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _limiter(path, clock: FakeClock) -> RateLimiter:
+    return RateLimiter(path, clock=clock, sleep=clock.sleep)
+
+
+def test_acquire_waits_exactly_for_the_missing_allowance(tmp_path):
+    clock = FakeClock()
+    limiter = _limiter(tmp_path / "rl.sqlite3", clock)
+
+    for _ in range(60):
+        assert limiter.acquire("m", rpm=60) == 0.0
+    waited = limiter.acquire("m", rpm=60)
+
+    assert clock.sleeps == [1.0]
+    assert waited == 1.0
+
+
+def test_token_limit_and_oversized_calls(tmp_path):
+    clock = FakeClock()
+    limiter = _limiter(tmp_path / "rl.sqlite3", clock)
+
+    limiter.acquire("m", tpm=600, tokens=500)
+    limiter.acquire("m", tpm=600, tokens=300)
+    # 100 tokens left, 200 missing at 10 tokens/s.
+    assert clock.sleeps == [20.0]
+    # A call above a minute's allowance waits for a full bucket instead of forever.
+    limiter.acquire("m", tpm=600, tokens=5000)
+    assert clock.sleeps[-1] == 60.0
+
+
+def test_penalize_blocks_until_retry_after_and_shares_state(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "rl.sqlite3"
+    first = _limiter(path, clock)
+    second = _limiter(path, clock)
+
+    ModelRateLimit(first, "m", rpm=6000).penalize(2.5)
+    second.acquire("other", rpm=6000)
+    assert clock.sleeps == []
+    waited = ModelRateLimit(second, "m", rpm=6000).acquire()
+
+    assert waited == 2.5
+    assert second.waited_seconds == 2.5
+
+
+def test_a_429_blocks_only_the_model_that_was_called(make_settings):
+    with StubServer(StubConfig(rate_limit_rate=1.0, retry_after=0.5)) as stub:
+        settings = make_settings(openai_api_base=stub.base_url, rate_limit_rpm=500)
+        with pytest.raises(Exception) as rate_limited:
+            build_llm(settings, model="gpt-4.1-nano").call("Write one tweet.")
+    assert is_rate_limit_error(rate_limited.value)
+
+    assert not chat_rate_limit(settings, "gpt-4.1-nano").try_acquire()
+    assert chat_rate_limit(settings).try_acquire()
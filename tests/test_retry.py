@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import threading
 from pathlib import Path
 
 import pytest
 
-from crewx.retry import RateLimitHit, kickoff_with_retry, parse_retry_after_seconds
+from crewx.errors import CircuitOpenError, DeadlineExceededError
+from crewx.retry import (
+    KickoffCancelled,
+    RateLimitHit,
+    RetryPolicy,
+    kickoff_with_retry,
+    parse_retry_after_seconds,
+)
 
 
 class DummyCrew:
@@ -25,6 +33,20 @@ def test_kickoff_with_retry_rate_limit(monkeypatch):
     assert result == "ok"
 
 
+def test_kickoff_with_retry_stops_once_cancelled():
+    cancel = threading.Event()
+
+    class CancellingCrew(DummyCrew):
+        def kickoff(self):
+            cancel.set()
+            return super().kickoff()
+
+    crew = CancellingCrew([ConnectionError("Connection error."), "ok"])
+    with pytest.raises(KickoffCancelled):
+        kickoff_with_retry(crew, max_retries=3, base_delay=0.0, cancel=cancel)
+    assert crew.outcomes == ["ok"]
+
+
 def test_kickoff_with_retry_rate_limit_fail_fast(monkeypatch):
     crew = DummyCrew([Exception("rate_limit"), "ok"])
     monkeypatch.setattr("crewx.retry.time.sleep", lambda *_: None)
@@ -52,3 +74,77 @@ def test_parse_retry_after_seconds_units():
     assert parse_retry_after_seconds("Try again in 500 ms") == 0.5
     assert parse_retry_after_seconds("try again in 2 s") == 2.0
     assert parse_retry_after_seconds("no hint") is None
+
+
+def test_kickoff_with_retry_uses_shared_rate_limit(monkeypatch):
+    class RecordingLimit:
+        def __init__(self):
+            self.calls = []
+
+        def acquire(self, *, requests=1, tokens=0):
+            self.calls.append(("acquire", requests, tokens))
+            return 0.0
+
+        def penalize(self, retry_after):
+            self.calls.append(("penalize", retry_after))
+
+    sleeps = []
+    monkeypatch.setattr("crewx.retry.time.sleep", sleeps.append)
+    crew = DummyCrew([Exception("Rate limit, try again in 3s"), "ok"])
+    crew.tasks = ["generate", "review"]
+    limit = RecordingLimit()
+
+    result = kickoff_with_retry(crew, max_retries=1, rate_limit=limit, tokens=900)
+
+    assert result == "ok"
+    assert limit.calls == [("acquire", 2, 900), ("penalize", 3.0), ("acquire", 2, 900)]
+    assert sleeps == []
+
+
+def test_retry_policy_uses_decorrelated_jitter():
+    sleeps = []
+    policy = RetryPolicy(max_retries=5, base_delay=1.0, max_delay=10.0, seed=7, sleep=sleeps.append)
+    crew = DummyCrew([Exception("Connection error")] * 5 + ["ok"])
+
+    assert kickoff_with_retry(crew, policy=policy) == "ok"
+
+    assert len(sleeps) == 5
+    previous = 1.0
+    for delay in sleeps:
+        assert 1.0 <= delay <= min(10.0, 3 * previous)
+        previous = delay
+    assert len(set(sleeps)) == 5
+    stats = policy.stats()
+    assert stats["retries"] == 5
+    assert stats["connection_errors"] == 5
+    assert stats["circuit_open"] is False
+
+
+def test_circuit_breaker_opens_and_fails_fast():
+    policy = RetryPolicy(max_retries=6, base_delay=0.0, breaker_threshold=3, sleep=lambda _: None)
+    crew = DummyCrew([Exception("Connection error")] * 3 + ["ok"])
+
+    with pytest.raises(CircuitOpenError):
+        kickoff_with_retry(crew, policy=policy)
+    # Later kickoffs never reach the provider.
+    with pytest.raises(CircuitOpenError):
+        kickoff_with_retry(crew, policy=policy)
+    assert crew.outcomes == ["ok"]
+    assert policy.stats()["circuit_open"] is True
+
+
+def test_deadline_stops_retries_that_would_overrun_it():
+    now = [0.0]
+
+    def _sleep(seconds):
+        now[0] += seconds
+
+    policy = RetryPolicy(base_delay=5.0, max_wall_time=8.0, clock=lambda: now[0], sleep=_sleep)
+    crew = DummyCrew([Exception("Rate limit, try again in 6s"), Exception("rate limit"), "ok"])
+
+    with pytest.raises(DeadlineExceededError):
+        kickoff_with_retry(crew, policy=policy)
+
+    assert now[0] == 6.25
+    assert policy.stats()["deadline_exceeded"] is True
+    assert policy.stats()["rate_limit_retries"] == 1
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+
+from crewx.rules import (
+    BRAND_TERMS,
+    CTA_TERMS,
+    DETAIL_KEYWORDS,
+    DOCUMENT_PATTERNS,
+    TIP_LANGUAGE,
+    TOPIC_BUCKETS,
+    TOPIC_KEYWORDS,
+    HistoryFeatureIndex,
+    NeedleMatcher,
+    infer_bucket_from_text,
+    load_compiled_rules,
+    text_features,
+    violates_hard_rules,
+)
+
+
+def test_needle_matcher_reports_overlapping_and_prefix_needles():
+    matcher = NeedleMatcher({"a": ["gepäck"], "b": ["gepäckband"], "c": ["band", "xyz"]})
+    assert matcher.scan("am gepäckband") == {"a", "b", "c"}
+    assert matcher.scan("gepäc") == frozenset()
+
+
+def test_text_features_match_naive_substring_scans():
+    groups = {
+        "topic": TOPIC_KEYWORDS,
+        "tip": TIP_LANGUAGE,
+        "document": DOCUMENT_PATTERNS,
+        "brand": BRAND_TERMS,
+        "cta": CTA_TERMS,
+        "detail": DETAIL_KEYWORDS,
+    }
+    groups.update({f"bucket:{b}": needles for b, needles in TOPIC_BUCKETS.items()})
+    vocabulary = sorted({n for needles in groups.values() for n in needles}) + ["xx", " ", "Ä"]
+    rng = random.Random(3)
+    for _ in range(300):
+        text = "".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 6))).upper()
+        lower = text.lower()
+        features = text_features(text)
+        for group, needles in groups.items():
+            assert features.has(group) == any(n in lower for n in needles), (group, text)
+
+
+def test_hard_rules_and_bucket_inference():
+    assert violates_hard_rules("Ab 3 Stunden Verspätung gibt es Geld.")
+    assert violates_hard_rules("Laut EU261 steht dir etwas zu.")
+    assert not violates_hard_rules("Wenn dein Flug am Gate wartet, frag nach Betreuung.")
+    assert infer_bucket_from_text("Der Koffer kam nicht aufs Gepäckband") == "gepaeck_handgepaeck"
+    assert infer_bucket_from_text("Nichts Passendes hier") is None
+
+
+def test_compiled_rules_cache_round_trip_and_invalidation(tmp_path):
+    rules_path = tmp_path / "rules.yaml"
+    cache_path = tmp_path / "cache" / "rules.json"
+    rules_path.write_text("topic_keywords: [koffer, kofferband]\n", encoding="utf-8")
+
+    first = load_compiled_rules(rules_path, cache_path=cache_path)
+    assert first.matcher.scan("am kofferband") == frozenset({"topic"})
+    assert json.loads(cache_path.read_text(encoding="utf-8"))["data"] == first.data
+
+    warm = load_compiled_rules(rules_path, cache_path=cache_path)
+    assert warm.data == first.data
+    assert warm.matcher.scan("am kofferband") == frozenset({"topic"})
+
+    # Touching the file without changing it is served from the content hash.
+    stat = rules_path.stat()
+    os.utime(rules_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert load_compiled_rules(rules_path, cache_path=cache_path).data == first.data
+
+    rules_path.write_text("topic_keywords: [gate]\n", encoding="utf-8")
+    changed = load_compiled_rules(rules_path, cache_path=cache_path)
+    assert changed.data == {"topic_keywords": ["gate"]}
+    assert changed.matcher.scan("am kofferband") == frozenset()
+
+
+def test_compiled_rules_cache_rebuilds_when_hard_banned_phrases_change(tmp_path, monkeypatch):
+    rules_path = tmp_path / "rules.yaml"
+    cache_path = tmp_path / "cache" / "rules.json"
+    rules_path.write_text("topic_keywords: [gate]\n", encoding="utf-8")
+    assert load_compiled_rules(rules_path, cache_path=cache_path).matcher.scan("ab 4h") == set()
+
+    monkeypatch.setattr("crewx.rules.HARD_BANNED_PHRASES", ["4h"])
+    warm = load_compiled_rules(rules_path, cache_path=cache_path)
+    assert warm.matcher.scan("ab 4h") == frozenset({"forbidden"})
+
+
+def test_history_feature_index_matches_window_rescans():
+    rng = random.Random(7)
+    words = TOPIC_KEYWORDS[:5] + DOCUMENT_PATTERNS[:3] + ["lorem", "ipsum"]
+    for needles in TOPIC_BUCKETS.values():
+        words.extend(needles[:2])
+    history = [" ".join(rng.choice(words) for _ in range(4)) for _ in range(40)]
+
+    index = HistoryFeatureIndex(history[:5], window=12, bucket_window=4)
+    recent = list(history[:5])
+    for text in history[5:]:
+        index.push(text)
+        recent.insert(0, text)
+        for group in ("topic", "document"):
+            rescan = sum(group in text_features(t).hits for t in recent[:12])
+            assert index.group_hits(group) == rescan
+        for bucket in TOPIC_BUCKETS:
+            rescan = sum(infer_bucket_from_text(t) == bucket for t in recent[:4])
+            assert index.bucket_hits(bucket) == rescan
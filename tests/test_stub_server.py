@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from crewx import crew_pipeline
+from crewx.embeddings import embed_texts
+from crewx.retry import is_connection_error, is_rate_limit_error, parse_retry_after_seconds
+from crewx.stub_server import StubConfig, StubServer, parse_latency
+
+
+def test_parse_latency_specs():
+    rng = random.Random(0)
+    assert parse_latency("0.25")(rng) == 0.25
+    assert 0.1 <= parse_latency("uniform:0.1:0.2")(rng) <= 0.2
+    assert parse_latency("exp:0.3")(rng) >= 0
+    assert parse_latency("lognormal:0.3:0.5")(rng) > 0
+    with pytest.raises(ValueError):
+        parse_latency("gamma:1")
+
+
+def _embedding_settings(make_settings, server: StubServer):
+    return make_settings(
+        embedding_model_name="text-embedding-3-small",
+        embedding_api_base=server.base_url,
+        embedding_cache_max=0,
+    )
+
+
+def test_stub_serves_embeddings_and_injects_faults(make_settings):
+    with StubServer(StubConfig(embedding_dim=64)) as server:
+        vectors = embed_texts(["Gate 12", "Koffer"], _embedding_settings(make_settings, server))
+    assert [len(v) for v in vectors] == [64, 64]
+
+    with StubServer(StubConfig(rate_limit_rate=1.0, retry_after=0.05)) as server:
+        with pytest.raises(Exception) as rate_limited:
+            embed_texts(["Gate 12"], _embedding_settings(make_settings, server))
+    assert is_rate_limit_error(rate_limited.value)
+    assert parse_retry_after_seconds(str(rate_limited.value)) == 0.05
+
+    with StubServer(StubConfig(drop_rate=1.0)) as server:
+        with pytest.raises(Exception) as dropped:
+            embed_texts(["Gate 12"], _embedding_settings(make_settings, server))
+        assert server.stats["dropped"] >= 1
+    assert is_connection_error(dropped.value)
+
+
+def test_pipeline_runs_against_stub(make_settings, monkeypatch):
+    monkeypatch.setenv("CREWAI_DISABLE_TELEMETRY", "true")
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    with StubServer(StubConfig(latency="0.01", seed=1)) as server:
+        settings = make_settings(openai_api_base=server.base_url)
+        result = crew_pipeline.run_generate_tweets_crewai(settings, dry_run=True)
+        stats = server.stats
+    assert result["output_count"] == 4
+    assert stats["completions"] == 3  # generator, reviewer, poster
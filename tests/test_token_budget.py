@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from crewx.token_budget import (
+    DEFAULT_CONTEXT_WINDOW,
+    DEFAULT_MAX_TOKENS,
+    context_window_for,
+    estimate_tokens,
+    output_tokens_for,
+    plan_crew_budget,
+)
+
+
+def test_estimate_tokens_counts_words_and_punctuation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Gate 12") == 2
+    assert estimate_tokens('{"a": 1}') == 7
+    assert estimate_tokens("Flugverspätung") == 4
+
+
+def test_output_tokens_grow_with_n_tweets():
+    assert output_tokens_for(1) == DEFAULT_MAX_TOKENS
+    assert output_tokens_for(10) > 5 * output_tokens_for(1)
+
+
+def test_context_window_lookup():
+    assert context_window_for("gpt-4o-mini") == 128_000
+    assert context_window_for("groq/llama-3.1-8b-instant") == 131_072
+    assert context_window_for("some-local-model") == DEFAULT_CONTEXT_WINDOW
+    assert context_window_for("gpt-4o-mini", override=6000) == 6000
+
+
+def test_plan_crew_budget_counts_previous_output_as_context():
+    prompt = "wort " * 1000
+    single = plan_crew_budget([prompt], n_tweets=5, context_window=8192)
+    chained = plan_crew_budget(["kurz", prompt], n_tweets=5, context_window=8192)
+    assert chained.input_tokens == single.input_tokens + single.max_tokens
+    assert single.fits
+    assert not plan_crew_budget([prompt], n_tweets=5, context_window=1000).fits